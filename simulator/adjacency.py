@@ -0,0 +1,157 @@
+# Compressed sparse row (CSR) storage for the edges of a logical graph. Nodes
+# are referred to by their position in the simulated list of logical nodes;
+# the out-neighbors of node i are indices[indptr[i]:indptr[i + 1]], so each
+# edge takes 4 bytes in each direction instead of a list slot holding an
+# object reference in each of two per-node lists.
+#
+# An Adjacency is either built from the existing in/out neighbor lists
+# (Adjacency.from_lnodes) or directly from edges with an AdjacencyBuilder.
+# simulate(..., adjacency=...) uses it to fan out completed nodes' outputs;
+# attach() additionally replaces the neighbor lists of the nodes with
+# read-only views of the CSR arrays, so the lists can be freed.
+
+from simulator.nodes import LogicalNode
+import numpy as np
+
+class Adjacency:
+    '''
+        Out-edges of `n` logical nodes in CSR form, plus the transposed
+        in-edges. `indptr` has n + 1 entries and `indices` one per edge;
+        the out-neighbors of a node keep the order their edges were added in
+    '''
+    def __init__(self, n, sources, targets):
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if len(sources) != len(targets):
+            raise ValueError('Got {} edge sources but {} targets'.format(len(sources), len(targets)))
+        if len(sources) > 0 and (min(sources.min(), targets.min()) < 0 or max(sources.max(), targets.max()) >= n):
+            raise ValueError('Edge endpoints must be positions of the {} logical nodes'.format(n))
+        self.n = n
+        self.indptr, self.indices = Adjacency.compress(n, sources, targets)
+        self.in_indptr, self.in_indices = Adjacency.compress(n, targets, sources)
+
+    # Return the CSR arrays of the given edges, keeping the order of the edges
+    # of each source
+    @staticmethod
+    def compress(n, sources, targets):
+        order = np.argsort(sources, kind='stable')
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=indptr[1:])
+        return indptr, targets[order].astype(np.int32)
+
+    @staticmethod
+    def from_lnodes(lnodes: list[LogicalNode]):
+        '''
+            Build the adjacency of the out_neighbors of `lnodes`, which must
+            all be in `lnodes` themselves
+        '''
+        position = {id(lnode): i for i, lnode in enumerate(lnodes)}
+        sources = []
+        targets = []
+        for i, lnode in enumerate(lnodes):
+            for node in lnode.out_neighbors:
+                j = position.get(id(node))
+                if j is None:
+                    raise ValueError('{} has out-neighbor {}, which is not being simulated'.format(lnode.id, node.id))
+                sources.append(i)
+                targets.append(j)
+        return Adjacency(len(lnodes), sources, targets)
+
+    def out(self, i):
+        '''
+            Return the positions of the out-neighbors of node `i`
+        '''
+        return self.indices[self.indptr[i]:self.indptr[i + 1]].tolist()
+
+    def ins(self, i):
+        '''
+            Return the positions of the in-neighbors of node `i`
+        '''
+        return self.in_indices[self.in_indptr[i]:self.in_indptr[i + 1]].tolist()
+
+    @property
+    def nedges(self):
+        return len(self.indices)
+
+    def attach(self, lnodes: list[LogicalNode]):
+        '''
+            Replace the in_neighbors and out_neighbors lists of `lnodes` with
+            read-only views of this adjacency
+        '''
+        if len(lnodes) != self.n:
+            raise ValueError('Adjacency has {} nodes, got {}'.format(self.n, len(lnodes)))
+        for i, lnode in enumerate(lnodes):
+            lnode.in_neighbors = NeighborView(lnodes, self.in_indptr, self.in_indices, i)
+            lnode.out_neighbors = NeighborView(lnodes, self.indptr, self.indices, i)
+
+class NeighborView:
+    '''
+        Read-only sequence of the neighbors of one node, stored in CSR arrays
+    '''
+    __slots__ = ('lnodes', 'indptr', 'indices', 'row')
+
+    def __init__(self, lnodes, indptr, indices, row):
+        self.lnodes = lnodes
+        self.indptr = indptr
+        self.indices = indices
+        self.row = row
+
+    def __len__(self):
+        return int(self.indptr[self.row + 1] - self.indptr[self.row])
+
+    def __getitem__(self, index):
+        positions = self.indices[self.indptr[self.row]:self.indptr[self.row + 1]][index]
+        if isinstance(index, slice):
+            return [self.lnodes[j] for j in positions.tolist()]
+        return self.lnodes[positions]
+
+    def __iter__(self):
+        lnodes = self.lnodes
+        for j in self.indices[self.indptr[self.row]:self.indptr[self.row + 1]].tolist():
+            yield lnodes[j]
+
+class AdjacencyBuilder:
+    '''
+        Collects edges between positions of logical nodes, one at a time or
+        in bulk, and builds an Adjacency from them
+    '''
+    def __init__(self, n):
+        self.n = n
+        self.sources = []
+        self.targets = []
+        # Edges added one at a time, not yet turned into arrays
+        self.pending_sources = []
+        self.pending_targets = []
+
+    def add_edge(self, source, target):
+        self.pending_sources.append(source)
+        self.pending_targets.append(target)
+
+    def add_edges(self, sources, targets):
+        '''
+            Add an edge from each of `sources` to the matching one of `targets`
+        '''
+        self.flush()
+        self.sources.append(np.asarray(sources, dtype=np.int64))
+        self.targets.append(np.asarray(targets, dtype=np.int64))
+
+    def flush(self):
+        if self.pending_sources:
+            self.sources.append(np.array(self.pending_sources, dtype=np.int64))
+            self.targets.append(np.array(self.pending_targets, dtype=np.int64))
+            self.pending_sources = []
+            self.pending_targets = []
+
+    def connect_all(self, sources, targets):
+        '''
+            Add an edge from every one of `sources` to every one of `targets`
+        '''
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        self.add_edges(np.repeat(sources, len(targets)), np.tile(targets, len(sources)))
+
+    def build(self):
+        self.flush()
+        if not self.sources:
+            return Adjacency(self.n, [], [])
+        return Adjacency(self.n, np.concatenate(self.sources), np.concatenate(self.targets))
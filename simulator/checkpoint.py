@@ -0,0 +1,140 @@
+# Checkpoints of a running simulation, taken at the start of a timestep.
+#
+# A checkpoint holds everything the simulator changes as it runs: the state,
+# times, physical node and input queue of every logical node, which physical
+# nodes failed or are busy, the timer, the pending wakeups and failures, the
+# state of `random` and of the straggler batches used by the computation length
+# functions, and the state of the scheduler it cannot work out again from the
+# nodes (see Scheduler.state). Nodes and physical nodes are referred to by
+# their position in the simulated lists, and the whole thing is pickled and
+# zlib-compressed.
+#
+# The graph itself (edges, computation and output length functions) is not
+# saved: to resume, build the same graph again and hand it to simulate along
+# with the checkpoint, which then overwrites its state.
+
+from simulator.nodes import LogicalNodeState, Input, StragglerBatch
+from simulator.timer import Timer
+import pickle
+import random
+import zlib
+import os
+
+VERSION = 4
+
+# The straggler batches captured by the computation length functions of the
+# logical nodes, in the order they are first found. Rebuilding the graph the
+# same way finds the corresponding batches in the same order
+def straggler_batches(lnodes):
+    batches = {}
+    for lnode in lnodes:
+        for function in (lnode.comp_length, lnode.output_length):
+            for cell in getattr(function, '__closure__', None) or ():
+                try:
+                    contents = cell.cell_contents
+                except ValueError:
+                    continue
+                if isinstance(contents, StragglerBatch):
+                    batches.setdefault(id(contents), contents)
+    return list(batches.values())
+
+def capture(lnodes, pnodes, event_driven, timer, completed_lnodes, failed_lnodes, wakeups, failures, fail_count,
+            scheduler):
+    '''
+        Function to return a checkpoint of the simulation state as a dict of
+        plain Python values
+    '''
+    if any(lnode.stage_outputs is not None or lnode.stage_inputs is not None for lnode in lnodes):
+        raise ValueError('Checkpoints of graphs with stage edges are not supported')
+    if any(lnode.input_summary is not None for lnode in lnodes):
+        raise ValueError('Checkpoints of aggregated inputs are not supported')
+    position = {id(lnode): i for i, lnode in enumerate(lnodes)}
+    pnode_position = {id(pnode): i for i, pnode in enumerate(pnodes)}
+
+    def pnode_index(pnode):
+        return pnode_position[id(pnode)] if pnode is not None else -1
+
+    return {
+        'version': VERSION,
+        'event_driven': event_driven,
+        'continuous_time': timer.continuous,
+        'time': timer.time,
+        'last_time': timer.last_time,
+        'lnodes': [(lnode.state.value, pnode_index(lnode.pnode), lnode.schedule_time,
+                    lnode.comp_start_time, lnode.comp_end_time,
+                    [(inp.size, inp.timestamp, pnode_index(inp.source)) for inp in lnode.input_q])
+                   for lnode in lnodes],
+        'pnodes': [(pnode.failed, [position[id(lnode)] for lnode in pnode.lnodes]) for pnode in pnodes],
+        'completed': [position[id(lnode)] for lnode in completed_lnodes],
+        'failed': [position[id(lnode)] for lnode in failed_lnodes],
+        'wakeups': list(wakeups),
+        'failures': list(failures),
+        'fail_count': fail_count,
+        'random': random.getstate(),
+        'scheduler': scheduler.state(),
+        'stragglers': [(batch.count, batch.next, batch.straggles, batch.rng.bit_generator.state)
+                       for batch in straggler_batches(lnodes)],
+    }
+
+def save(path, checkpoint):
+    '''
+        Function to write a checkpoint to `path`, replacing any previous file
+        only once the new one is complete
+    '''
+    data = zlib.compress(pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL))
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+
+def load(path):
+    '''
+        Function to read a checkpoint written by `save`
+    '''
+    with open(path, 'rb') as f:
+        checkpoint = pickle.loads(zlib.decompress(f.read()))
+    if checkpoint.get('version') != VERSION:
+        raise ValueError('Unsupported checkpoint version: {}'.format(checkpoint.get('version')))
+    return checkpoint
+
+def restore(checkpoint, lnodes, pnodes):
+    '''
+        Function to overwrite the state of a freshly built graph with a
+        checkpoint. Returns the timer, completed and failed logical nodes,
+        wakeups, failures, failure count and scheduler state (see
+        Scheduler.restore_state) to continue the simulation with
+    '''
+    batches = straggler_batches(lnodes)
+    if (len(checkpoint['lnodes']) != len(lnodes) or len(checkpoint['pnodes']) != len(pnodes)
+            or len(checkpoint['stragglers']) != len(batches)):
+        raise ValueError('Checkpoint does not match the graph being resumed')
+
+    def pnode_at(index):
+        return pnodes[index] if index >= 0 else None
+
+    for lnode, (state, pnode, schedule_time, comp_start_time, comp_end_time, inputs) in zip(lnodes, checkpoint['lnodes']):
+        lnode.state = LogicalNodeState(state)
+        lnode.pnode = pnode_at(pnode)
+        lnode.schedule_time = schedule_time
+        lnode.comp_start_time = comp_start_time
+        lnode.comp_end_time = comp_end_time
+        lnode.input_q = [Input(size, timestamp, pnode_at(source)) for size, timestamp, source in inputs]
+    for pnode, (failed, running) in zip(pnodes, checkpoint['pnodes']):
+        pnode.failed = failed
+        pnode.lnodes = [lnodes[i] for i in running]
+    for batch, (count, next, straggles, state) in zip(batches, checkpoint['stragglers']):
+        batch.count = count
+        batch.next = next
+        batch.straggles = straggles
+        batch.rng.bit_generator.state = state
+    random.setstate(checkpoint['random'])
+
+    timer = Timer(checkpoint['continuous_time'])
+    timer.time = checkpoint['time']
+    timer.last_time = checkpoint['last_time']
+    return (timer,
+            [lnodes[i] for i in checkpoint['completed']],
+            [lnodes[i] for i in checkpoint['failed']],
+            checkpoint['wakeups'],
+            checkpoint['failures'],
+            checkpoint['fail_count'],
+            checkpoint['scheduler'])
@@ -0,0 +1,226 @@
+# Flow-level network contention, used by simulate(..., contention=True).
+#
+# Without it, every input is sent at the full bandwidth between its source and
+# destination (see nodes.bandwidth), however many other inputs are on the way
+# at the same time. Here every input in transit is instead a flow through a
+# set of shared links: the sender's outgoing NIC, the receiver's incoming NIC
+# and, with a TopologyNetwork, the uplink and downlink of the racks (or pods)
+# it leaves and enters. Flows through a link share its bandwidth max-min
+# fairly, and no flow goes faster than it would on its own.
+#
+# Rates are only recomputed when flows start, finish or are cancelled (their
+# destination failed), at most once per timestep; in between, every flow keeps
+# its rate and the timestamp of its input is the time it finishes at that
+# rate. With whole timesteps, flows finishing within a timestep hand their
+# bandwidth on at the end of it; in continuous time, exactly when they finish.
+#
+# NIC bandwidths are PhysicalNode.bandwidth for physical nodes in a
+# TopologyNetwork, and 1 / Config.BANDWIDTH_MULTIPLIER otherwise.
+
+from simulator.nodes import Config, bandwidth
+from simulator.network import TopologyNetwork
+import numpy as np
+
+# Most links a flow goes through: two NICs and two rack or pod links
+MAX_LINKS = 4
+
+def max_min_rates(links, capacity, caps):
+    '''
+        Function to return the max-min fair rates of flows
+        links: array of the indices of the links each flow goes through, one
+            row per flow, padded with -1
+        capacity: array of the bandwidth of every link
+        caps: array of the most each flow can get on its own
+    '''
+    nlinks = len(capacity)
+    rates = np.zeros(len(caps))
+    # Padding points at an extra link of unlimited bandwidth
+    links = np.where(links < 0, nlinks, links)
+    left = np.append(np.asarray(capacity, dtype=float), np.inf)
+    active = np.ones(len(caps), dtype=bool)
+
+    # Progressive filling: raise every unfrozen flow's rate together until a
+    # link (or a flow's own cap) is saturated, and freeze the flows through it
+    while active.any():
+        counts = np.bincount(links[active].ravel(), minlength=nlinks + 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = left / counts
+        share[counts == 0] = np.inf
+        share[nlinks] = np.inf
+        flow_share = np.minimum(share[links].min(axis=1), caps)
+        level = flow_share[active].min()
+        frozen = active & (flow_share <= level * (1 + 1e-9))
+        rates[frozen] = level
+        active &= ~frozen
+        if not np.isfinite(level):
+            rates[active] = np.inf
+            break
+        used = np.bincount(links[frozen].ravel(), minlength=nlinks + 1) * level
+        left = np.maximum(left - used, 0)
+    return rates
+
+class FlowNetwork:
+    '''
+        Inputs in transit to physical nodes, as flows sharing the links they
+        go through
+    '''
+    def __init__(self):
+        # Link keys -> index, and the bandwidth of every link
+        self.link_index = {}
+        self.capacity = []
+        # Index of the incoming and outgoing NIC link of each physical node, by id
+        self.in_link = {}
+        self.out_link = {}
+        # Flows in transit: their inputs, the positions of the logical nodes
+        # they are sent to, their links, caps, data left and rates, and the
+        # time the data left was last updated
+        self.inputs = []
+        self.targets = np.zeros(0, dtype=np.int64)
+        self.links = np.zeros((0, MAX_LINKS), dtype=np.int64)
+        self.caps = np.zeros(0)
+        self.left = np.zeros(0)
+        self.rates = np.zeros(0)
+        self.finish = np.zeros(0)
+        self.last_time = 0
+        # Flows started since rates were last computed
+        self.pending = []
+        self.changed = False
+
+    # Return the index of the link `key` of bandwidth `capacity`
+    def link(self, key, capacity):
+        index = self.link_index.get(key)
+        if index is None:
+            index = self.link_index[key] = len(self.capacity)
+            self.capacity.append(capacity)
+        return index
+
+    # Return the NIC bandwidth of a physical node
+    @staticmethod
+    def nic(pnode):
+        network = pnode.network
+        if isinstance(network, TopologyNetwork):
+            return float(network.nic[network.position[id(pnode)]])
+        multiplier = Config.BANDWIDTH_MULTIPLIER
+        return 1 / multiplier if multiplier > 0 else np.inf
+
+    # Return the links a flow from `source` (or None, from outside) to
+    # `target` goes through
+    def route(self, source, target):
+        link = self.in_link.get(id(target))
+        if link is None:
+            link = self.in_link[id(target)] = self.link(('in', id(target)), FlowNetwork.nic(target))
+        links = [link]
+        if source is None:
+            return links
+        link = self.out_link.get(id(source))
+        if link is None:
+            link = self.out_link[id(source)] = self.link(('out', id(source)), FlowNetwork.nic(source))
+        links.append(link)
+        network = target.network
+        if isinstance(network, TopologyNetwork) and source.network is network:
+            i = network.position[id(source)]
+            j = network.position[id(target)]
+            if network.pod[i] != network.pod[j]:
+                links.append(self.link(('pod up', id(network), int(network.pod[i])), network.links[2]))
+                links.append(self.link(('pod down', id(network), int(network.pod[j])), network.links[2]))
+            elif network.rack[i] != network.rack[j]:
+                links.append(self.link(('rack up', id(network), int(network.rack[i])), network.links[1]))
+                links.append(self.link(('rack down', id(network), int(network.rack[j])), network.links[1]))
+        return links
+
+    def start(self, inp, pnode, position, timer):
+        '''
+            Function to start sending `inp` to the physical node `pnode` of the
+            logical node at `position`. Its timestamp is set once rates are
+            next computed, except for inputs that arrive right away
+        '''
+        multiplier = bandwidth(inp.source, pnode)
+        if multiplier == 0 or inp.size == 0:
+            inp.update_time(timer, pnode)
+            return
+        inp.timestamp = None
+        links = self.route(inp.source, pnode)
+        self.pending.append((inp, position, links + [-1] * (MAX_LINKS - len(links)), 1 / multiplier))
+        self.changed = True
+
+    def cancel(self, position):
+        '''
+            Function to drop the flows to the logical node at `position`, whose
+            physical node failed
+        '''
+        self.pending = [flow for flow in self.pending if flow[1] != position]
+        dropped = self.targets == position
+        if dropped.any():
+            self.keep(~dropped)
+
+    # Keep only the flows in `mask`
+    def keep(self, mask):
+        self.inputs = [inp for inp, kept in zip(self.inputs, mask.tolist()) if kept]
+        self.targets = self.targets[mask]
+        self.links = self.links[mask]
+        self.caps = self.caps[mask]
+        self.left = self.left[mask]
+        self.rates = self.rates[mask]
+        self.finish = self.finish[mask]
+        self.changed = True
+
+    def advance(self, time):
+        '''
+            Function to move the flows on to `time`, dropping those that are
+            done (their inputs have arrived)
+        '''
+        if time == self.last_time:
+            return
+        self.left -= self.rates * (time - self.last_time)
+        self.last_time = time
+        done = self.finish <= time
+        if done.any():
+            self.keep(~done)
+
+    def update(self, timer):
+        '''
+            Function to recompute the rates of the flows if any started,
+            finished or were cancelled. Returns (wakeup time, position) for
+            every logical node whose inputs' arrival time changed, waking it
+            up when the last of its flows finishes
+        '''
+        self.advance(timer.now())
+        if not self.changed:
+            return []
+        self.changed = False
+        if self.pending:
+            inputs, targets, links, caps = zip(*self.pending)
+            self.pending = []
+            self.inputs.extend(inputs)
+            self.targets = np.concatenate([self.targets, np.array(targets, dtype=np.int64)])
+            self.links = np.concatenate([self.links, np.array(links, dtype=np.int64)])
+            self.caps = np.concatenate([self.caps, np.array(caps, dtype=float)])
+            self.left = np.concatenate([self.left, np.array([inp.size for inp in inputs], dtype=float)])
+            self.rates = np.concatenate([self.rates, np.zeros(len(inputs))])
+            self.finish = np.concatenate([self.finish, np.full(len(inputs), np.nan)])
+        if len(self.inputs) == 0:
+            return []
+
+        self.rates = max_min_rates(self.links, self.capacity, self.caps)
+        with np.errstate(divide='ignore'):
+            finish = timer.now() + self.left / self.rates
+        moved = np.flatnonzero(finish != self.finish)
+        self.finish = finish
+        inputs = self.inputs
+        for k, time in zip(moved.tolist(), finish[moved].tolist()):
+            inputs[k].timestamp = time
+
+        targets, flow_target = np.unique(self.targets, return_inverse=True)
+        latest = np.full(len(targets), -np.inf)
+        np.maximum.at(latest, flow_target, finish)
+        woken = np.isin(targets, self.targets[moved])
+        return [(timer.first_passed(time), position)
+                for time, position in zip(latest[woken].tolist(), targets[woken].tolist())]
+
+    def next_time(self):
+        '''
+            Function to return the time the next flow finishes, or None
+        '''
+        if len(self.finish) == 0:
+            return None
+        return float(self.finish.min())
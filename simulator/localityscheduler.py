@@ -0,0 +1,149 @@
+from simulator.nodes import LogicalNode, PhysicalNode, LogicalNodeState, LogicalNodeType
+from simulator.mrscheduler import MRScheduler
+from simulator.network import TopologyNetwork
+from simulator.state import InputLocality, PhysicalNodePool
+
+class LocalityScheduler(MRScheduler):
+    '''
+        MRScheduler placing each ready logical node where its inputs are: on
+        the free physical node that produced the most of its input data, or
+        failing that on a free physical node of the rack (see
+        TopologyNetwork) holding the most of it, or failing that on the first
+        free physical node.
+        The sizes come from an InputLocality kept up to date from the
+        notifications, so placing a node only looks at the physical nodes its
+        inputs come from, largest first, not at the whole cluster.
+        With delay scheduling (MAX_DELAY > 0, see with_delay), a node whose
+        physical nodes with input data are all busy is skipped for up to
+        MAX_DELAY scheduling rounds (calls to assign() in which it was
+        considered) waiting for one of them to free up, before being placed
+        elsewhere. In the event-driven simulator a round happens at every
+        visited timestep, i.e. whenever something happens
+    '''
+    # Scheduling rounds a logical node may be skipped waiting for a local physical node
+    MAX_DELAY = 0
+
+    @classmethod
+    def with_delay(cls, max_delay):
+        '''
+            Function to return a subclass of this scheduler with MAX_DELAY
+            set to `max_delay`, to pass to simulate
+        '''
+        return type('{}(MAX_DELAY={})'.format(cls.__name__, max_delay), (cls,), {'MAX_DELAY': max_delay})
+
+    def __init__(self, logical_nodes: list[LogicalNode], physical_nodes: list[PhysicalNode]):
+        super().__init__(logical_nodes, physical_nodes)
+        self.locality = InputLocality(physical_nodes)
+        for lnode in self.ready:
+            self.locality.add(lnode)
+        # Rack key of every physical node, or None outside of a TopologyNetwork,
+        # and a pool of the free physical nodes of every rack
+        self.rack = {}
+        racks = {}
+        for pnode in physical_nodes:
+            network = pnode.network
+            if isinstance(network, TopologyNetwork):
+                key = (id(network), int(network.rack[network.position[id(pnode)]]))
+                self.rack[id(pnode)] = key
+                racks.setdefault(key, []).append(pnode)
+        self.rack_pools = {key: PhysicalNodePool(members) for key, members in racks.items()}
+        # Rounds each waiting logical node was skipped for, by position
+        self.skips = {}
+
+    def find_best_physical_node(self, logical_node: LogicalNode):
+        '''
+            Function to find the free physical node closest to the inputs of
+            the logical node
+            logical_node: logical node to place
+        '''
+        ranked = self.locality.ranked(logical_node)
+        pnode = self.first_local(ranked)
+        if pnode is not None:
+            return pnode
+
+        if self.MAX_DELAY > 0 and any(not self.physical_nodes[i].failed for _, i in ranked):
+            position = self.ready.position[id(logical_node)]
+            skips = self.skips.get(position, 0)
+            if skips < self.MAX_DELAY:
+                self.skips[position] = skips + 1
+                return None
+
+        return self.nearest(ranked)
+
+    def candidate_pnode(self, logical_node: LogicalNode):
+        '''
+            Function to find the free physical node closest to the inputs of
+            the logical node, which need not be ready, without skipping it
+            logical_node: logical node to place
+        '''
+        ranked = self.locality.ranked_inputs(logical_node)
+        pnode = self.first_local(ranked)
+        return pnode if pnode is not None else self.nearest(ranked)
+
+    # Return the free physical node that produced the most of the inputs
+    # ranked (see InputLocality.ranked), or None
+    def first_local(self, ranked):
+        for _, i in ranked:
+            pnode = self.physical_nodes[i]
+            if pnode in self.free_pnodes:
+                return pnode
+        return None
+
+    # Return a free physical node of the rack holding the most of the inputs
+    # ranked, or else the first free physical node
+    def nearest(self, ranked):
+        if self.rack_pools and ranked:
+            rack_sizes = {}
+            for size, i in ranked:
+                key = self.rack.get(id(self.physical_nodes[i]))
+                if key is not None:
+                    rack_sizes[key] = rack_sizes.get(key, 0) + size
+            for key in sorted(rack_sizes, key=rack_sizes.get, reverse=True):
+                pnode = self.first_in_rack(key)
+                if pnode is not None:
+                    return pnode
+
+        return self.free_pnodes.first()
+
+    # Return the free physical node with the lowest position in the rack
+    # `key`, or None. Rack pools learn of nodes taken by assign() only here
+    def first_in_rack(self, key):
+        pool = self.rack_pools[key]
+        while True:
+            pnode = pool.first()
+            if pnode is None or pnode in self.free_pnodes:
+                return pnode
+            pool.discard(pnode)
+
+    def state(self):
+        state = super().state()
+        state['skips'] = dict(self.skips)
+        return state
+
+    def restore_state(self, state):
+        super().restore_state(state)
+        self.skips = dict(state['skips'])
+
+    def node_ready(self, lnode: LogicalNode):
+        super().node_ready(lnode)
+        self.locality.add(lnode)
+
+    def node_assigned(self, lnode: LogicalNode, pnode: PhysicalNode):
+        super().node_assigned(lnode, pnode)
+        self.locality.discard(lnode)
+        self.skips.pop(self.ready.position[id(lnode)], None)
+        key = self.rack.get(id(pnode))
+        if key is not None:
+            self.rack_pools[key].release(pnode)
+
+    def pnode_freed(self, pnode: PhysicalNode):
+        super().pnode_freed(pnode)
+        key = self.rack.get(id(pnode))
+        if key is not None:
+            self.rack_pools[key].release(pnode)
+
+    def pnode_lost(self, pnode: PhysicalNode):
+        super().pnode_lost(pnode)
+        key = self.rack.get(id(pnode))
+        if key is not None:
+            self.rack_pools[key].discard(pnode)
@@ -0,0 +1,141 @@
+from simulator.nodes import LogicalNode, PhysicalNode, LogicalNodeState, LogicalNodeType
+from simulator.mrscheduler import MRScheduler
+from bisect import bisect_left, insort
+import math
+
+class MemoryScheduler(MRScheduler):
+    '''
+        MRScheduler placing each ready logical node on the free physical node
+        with the least memory left that still fits what the node needs (see
+        LogicalNode.memory_size), keeping larger physical nodes for larger
+        nodes. Physical nodes without a memory have unlimited memory; the
+        memory left of a physical node with several slots is its memory less
+        that of the logical nodes running on it.
+        Free physical nodes are kept sorted by memory left, so finding the
+        best fit is a binary search. A logical node that fits some live
+        physical node waits for one to have enough memory free; one that fits
+        none is placed on the free physical node with the most memory left,
+        where it spills to disk (see nodes.spill_time), and is added to
+        `spilled`
+    '''
+    def __init__(self, logical_nodes: list[LogicalNode], physical_nodes: list[PhysicalNode]):
+        super().__init__(logical_nodes, physical_nodes)
+        # Sorted (memory left, position) of the free physical nodes, the
+        # (memory left, free slots) in the entry of each, and the sorted
+        # memory of the live physical nodes
+        self.free_memory = []
+        self.entries = {}
+        for pnode in physical_nodes:
+            self.add_free(pnode)
+        self.live_memory = sorted(MemoryScheduler.memory(pnode) for pnode in physical_nodes if not pnode.failed)
+        # Memory left on each physical node if the logical node it was last
+        # picked for is assigned to it
+        self.picked = {}
+        # Logical nodes placed on a physical node with too little memory
+        self.spilled = []
+
+    @staticmethod
+    def memory(pnode: PhysicalNode):
+        return pnode.memory if pnode.memory is not None else math.inf
+
+    # Return the memory of a physical node not used by the logical nodes running on it
+    @staticmethod
+    def memory_left(pnode: PhysicalNode):
+        return MemoryScheduler.memory(pnode) - sum(lnode.memory_size for lnode in pnode.lnodes)
+
+    def find_best_physical_node(self, logical_node: LogicalNode):
+        '''
+            Function to find the free physical node with the least memory
+            left that fits the logical node
+            logical_node: logical node to place
+        '''
+        pnode, memory, spills = self.best_fit(logical_node)
+        if pnode is not None:
+            if spills:
+                self.spilled.append(logical_node)
+            self.picked[self.free_pnodes.position[id(pnode)]] = max(memory - logical_node.memory_size, 0)
+        return pnode
+
+    def candidate_pnode(self, logical_node: LogicalNode):
+        '''
+            Function to find the free physical node with the least memory
+            left that fits the logical node, without recording it as picked
+            or spilled
+            logical_node: logical node to place
+        '''
+        return self.best_fit(logical_node)[0]
+
+    # Return the free physical node that fits the logical node best, or None,
+    # its memory left, and whether the node spills wherever it goes
+    def best_fit(self, logical_node: LogicalNode):
+        demand = logical_node.memory_size
+        spills = not self.live_memory or demand > self.live_memory[-1]
+        free_memory = self.free_memory
+        k = len(free_memory) - 1 if spills else bisect_left(free_memory, (demand, -1))
+        # Entries of physical nodes taken since the last notification are
+        # dropped on the way, or moved down by the memory of the logical node
+        # they were picked for if they have free slots left
+        while 0 <= k < len(free_memory):
+            memory, i = free_memory[k]
+            pnode = self.physical_nodes[i]
+            slots = self.free_pnodes.slots(pnode)
+            if slots == self.entries[i][1]:
+                return pnode, memory, spills
+            self.remove_free(pnode)
+            if slots > 0:
+                self.insert(i, self.picked[i], slots)
+                k = len(free_memory) - 1 if spills else bisect_left(free_memory, (demand, -1))
+            elif spills:
+                k -= 1
+        return None, None, spills
+
+    def insert(self, i, memory, slots):
+        insort(self.free_memory, (memory, i))
+        self.entries[i] = (memory, slots)
+
+    # Remove the entry of a physical node from the sorted free memory, if there
+    def remove_free(self, pnode: PhysicalNode):
+        i = self.free_pnodes.position[id(pnode)]
+        entry = self.entries.pop(i, None)
+        if entry is not None:
+            del self.free_memory[bisect_left(self.free_memory, (entry[0], i))]
+
+    # Add the entry of a physical node with its memory left, if it is free
+    def add_free(self, pnode: PhysicalNode):
+        if pnode in self.free_pnodes:
+            self.insert(self.free_pnodes.position[id(pnode)], MemoryScheduler.memory_left(pnode),
+                        self.free_pnodes.slots(pnode))
+
+    def state(self):
+        state = super().state()
+        state['spilled'] = [self.ready.position[id(lnode)] for lnode in self.spilled]
+        state['picked'] = dict(self.picked)
+        return state
+
+    def restore_state(self, state):
+        super().restore_state(state)
+        self.spilled = [self.logical_nodes[i] for i in state['spilled']]
+        self.picked = dict(state['picked'])
+
+    def node_assigned(self, lnode: LogicalNode, pnode: PhysicalNode):
+        super().node_assigned(lnode, pnode)
+        self.remove_free(pnode)
+        self.add_free(pnode)
+
+    def backup_assigned(self, lnode: LogicalNode, pnode: PhysicalNode):
+        super().backup_assigned(lnode, pnode)
+        self.remove_free(pnode)
+        self.add_free(pnode)
+
+    def pnode_freed(self, pnode: PhysicalNode):
+        super().pnode_freed(pnode)
+        self.remove_free(pnode)
+        self.add_free(pnode)
+
+    def pnode_lost(self, pnode: PhysicalNode):
+        super().pnode_lost(pnode)
+        self.remove_free(pnode)
+        memory = MemoryScheduler.memory(pnode)
+        k = bisect_left(self.live_memory, memory)
+        if k < len(self.live_memory) and self.live_memory[k] == memory:
+            del self.live_memory[k]
@@ -0,0 +1,80 @@
+# Runs many independent, seeded replicas of a stochastic simulation (failures,
+# stragglers) in parallel worker processes and summarizes the distribution of
+# their total times.
+#
+# Each replica builds its own graph in the worker that runs it, so nothing
+# larger than the arguments below crosses process boundaries. `build_graph`
+# must therefore be picklable, i.e. a module-level function (or a
+# functools.partial of one), and return a (logical nodes, physical nodes) pair.
+
+from simulator.nodes import Config
+from simulator.simulator import simulate
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+import numpy as np
+import os
+import random
+
+# Run a single replica; `replica` is a tuple so it can be sent to a worker.
+# The Config it finds is put back afterwards, as replicas run in the caller's
+# process with workers=1
+def run_replica(replica):
+    build_graph, scheduler_class, overrides, seed, simulate_args = replica
+    saved = Config.values()
+    try:
+        Config.apply(overrides)
+        random.seed(seed)
+        lnodes, pnodes = build_graph()
+        return simulate(lnodes, pnodes, scheduler_class, verbose=False, **simulate_args)
+    finally:
+        Config.apply(saved)
+
+class ReplicaStats:
+    '''
+        Summary of the total times of a set of replicas: mean, standard
+        deviation, min/max, the requested percentiles and a normal
+        approximation confidence interval for the mean
+    '''
+    def __init__(self, times, percentiles=(50, 90, 99), confidence=0.95):
+        self.times = list(times)
+        values = np.array(self.times, dtype=float)
+        self.replicas = len(values)
+        self.mean = float(values.mean())
+        self.std = float(values.std(ddof=1)) if self.replicas > 1 else 0.0
+        self.min = float(values.min())
+        self.max = float(values.max())
+        self.percentiles = {p: float(np.percentile(values, p)) for p in percentiles}
+        self.confidence = confidence
+        half_width = NormalDist().inv_cdf(0.5 + confidence / 2) * self.std / np.sqrt(self.replicas)
+        self.ci = (self.mean - half_width, self.mean + half_width)
+
+    def __repr__(self):
+        return 'ReplicaStats(replicas={}, mean={:.3f}, std={:.3f}, ci{:.0f}={}, percentiles={})'.format(
+            self.replicas, self.mean, self.std, self.confidence * 100,
+            tuple(round(x, 3) for x in self.ci), self.percentiles)
+
+def run_replicas(build_graph, scheduler_class, replicas, config=None, seed=0,
+                 workers=None, percentiles=(50, 90, 99), confidence=0.95, **simulate_args):
+    '''
+        Function to simulate independent replicas of a graph in parallel
+        build_graph: picklable function returning (logical nodes, physical nodes)
+        scheduler_class: scheduler to simulate with
+        replicas: number of replicas to run
+        config: dict of Config fields to override in every replica
+        seed: replica i is seeded with seed + i, so results are reproducible
+        workers: number of worker processes (default: one per core); 1 runs in this process
+        simulate_args: extra keyword arguments for simulate
+    '''
+    config = config if config is not None else {}
+    workers = workers if workers is not None else os.cpu_count()
+    jobs = [(build_graph, scheduler_class, config, seed + i, simulate_args) for i in range(replicas)]
+
+    if workers == 1:
+        times = [run_replica(job) for job in jobs]
+    else:
+        # A few chunks per worker keeps them all busy without a round trip per replica
+        chunksize = max(1, replicas // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            times = list(pool.map(run_replica, jobs, chunksize=chunksize))
+
+    return ReplicaStats(times, percentiles, confidence)
@@ -0,0 +1,101 @@
+# Network models, giving the time it takes to send one unit of data from a
+# physical node to another (see nodes.bandwidth).
+#
+# Without a network model, every pair of different physical nodes is
+# Config.BANDWIDTH_MULTIPLIER apart. A TopologyNetwork instead places the
+# physical nodes in racks, and racks in pods, with a bandwidth for links within
+# a rack, between racks of a pod and between pods, on top of each physical
+# node's own (NIC) bandwidth, PhysicalNode.bandwidth. A transfer goes as fast
+# as the slowest of the sender's NIC, the link it crosses and the receiver's
+# NIC. Bandwidths are in units of data per timestep.
+#
+# The model is attached to the physical nodes it covers, so every transfer
+# time computed for them (Input.update_time, input summaries, stage edges)
+# goes through it.
+
+import numpy as np
+
+class TopologyNetwork:
+    '''
+        Racks and pods of physical nodes. `racks` gives the rack index of
+        every physical node in `pnodes`, and `pods` the pod index of every
+        rack (default: all racks in one pod). Bandwidths that are None are
+        unlimited. Inputs that do not come from a physical node (e.g. the
+        initial inputs, when resent after a failure) arrive over a link of
+        bandwidth `external`
+    '''
+    def __init__(self, pnodes, racks, pods=None, intra_rack=None, inter_rack=None, inter_pod=None, external=None):
+        racks = np.asarray(racks, dtype=np.int32)
+        if len(racks) != len(pnodes):
+            raise ValueError('Got {} rack indices for {} physical nodes'.format(len(racks), len(pnodes)))
+        nracks = int(racks.max()) + 1 if len(racks) > 0 else 0
+        pods = np.zeros(nracks, dtype=np.int32) if pods is None else np.asarray(pods, dtype=np.int32)
+        if len(pods) < nracks:
+            raise ValueError('Got {} pod indices for {} racks'.format(len(pods), nracks))
+
+        self.position = {id(pnode): i for i, pnode in enumerate(pnodes)}
+        # Group indices of every physical node
+        self.rack = racks
+        self.pod = pods[racks]
+        self.nic = np.array([TopologyNetwork.limit(pnode.bandwidth) for pnode in pnodes], dtype=float)
+        # Bandwidth of the links within a rack, between racks and between pods
+        self.links = (TopologyNetwork.limit(intra_rack), TopologyNetwork.limit(inter_rack), TopologyNetwork.limit(inter_pod))
+        self.external = TopologyNetwork.limit(external)
+        for pnode in pnodes:
+            pnode.network = self
+
+    @staticmethod
+    def limit(bandwidth):
+        return float(bandwidth) if bandwidth is not None else np.inf
+
+    @staticmethod
+    def evenly(pnodes, rack_size, racks_per_pod=None, **bandwidths):
+        '''
+            Function to create a TopologyNetwork with `rack_size` consecutive
+            physical nodes per rack and `racks_per_pod` consecutive racks per
+            pod (default: one pod)
+        '''
+        racks = np.arange(len(pnodes)) // rack_size
+        pods = None
+        if racks_per_pod is not None:
+            pods = np.arange(racks[-1] + 1 if len(racks) > 0 else 0) // racks_per_pod
+        return TopologyNetwork(pnodes, racks, pods, **bandwidths)
+
+    def multiplier(self, source, target):
+        '''
+            Function to return the time per unit of data sent from physical
+            node `source` (or None, for external data) to `target`
+        '''
+        if source is target:
+            return 0
+        j = self.position[id(target)]
+        if source is None:
+            return 1 / float(min(self.external, self.nic[j]))
+        i = self.position[id(source)]
+        if self.rack[i] == self.rack[j]:
+            link = self.links[0]
+        elif self.pod[i] == self.pod[j]:
+            link = self.links[1]
+        else:
+            link = self.links[2]
+        return 1 / float(min(link, self.nic[i], self.nic[j]))
+
+    def positions(self, pnodes):
+        '''
+            Function to return the positions of `pnodes` in this network, as
+            used by multipliers
+        '''
+        return np.array([self.position[id(pnode)] for pnode in pnodes], dtype=np.int64)
+
+    def multipliers(self, source, targets):
+        '''
+            Function to return the times per unit of data sent from physical
+            node `source` to each of the physical nodes at positions `targets`
+            (see positions), as an array
+        '''
+        i = self.position[id(source)]
+        link = np.where(self.rack[targets] == self.rack[i], self.links[0],
+                        np.where(self.pod[targets] == self.pod[i], self.links[1], self.links[2]))
+        row = 1 / np.minimum(np.minimum(link, self.nic[targets]), self.nic[i])
+        row[targets == i] = 0
+        return row
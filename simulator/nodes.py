@@ -1,6 +1,8 @@
 from simulator.timer import Timer
 from enum import Enum
 import random
+import math
+import numpy as np
 
 # Constants that should later be configurable
 
@@ -11,6 +13,8 @@ class Config:
     OUTPUT_LENGTH_MULTIPLIER = 1
     FAILURE_PROBABILITY = 0.001
     STRAGGLER_PROBABILITY = 0.001
+    MEMORY_MULTIPLIER = 0
+    SPILL_LENGTH_MULTIPLIER = 1
 
     @staticmethod
     def reset():
@@ -23,13 +27,63 @@ class Config:
         Config.OUTPUT_LENGTH_MULTIPLIER = 1
         Config.FAILURE_PROBABILITY = 0.001
         Config.STRAGGLER_PROBABILITY = 0.001
+        Config.MEMORY_MULTIPLIER = 0
+        Config.SPILL_LENGTH_MULTIPLIER = 1
 
-# Return the bandwidth multiplier from physical node1 to node2
-# For now, assume uniform bandwidth
+    @staticmethod
+    def fields():
+        '''
+            Function to return the names of the config fields
+        '''
+        return [name for name in vars(Config) if name.isupper()]
+
+    @staticmethod
+    def values():
+        '''
+            Function to return the current value of every config field, as a
+            dict that apply() takes
+        '''
+        return {name: getattr(Config, name) for name in Config.fields()}
+
+    @staticmethod
+    def apply(overrides):
+        '''
+            Function to reset the config and then set the fields in `overrides`
+        '''
+        Config.reset()
+        for name, value in overrides.items():
+            if name not in Config.fields():
+                raise ValueError('Unknown Config field: {}'.format(name))
+            setattr(Config, name, value)
+
+# Return the bandwidth multiplier (time per unit of data) from physical node1,
+# or None for data from outside, to node2
+# Uniform bandwidth unless node2 has a network model (see network.py)
 # Latency is 0 from a node to itself
 def bandwidth(node1, node2):
+    if node2.network is not None:
+        return node2.network.multiplier(node1, node2)
     return Config.BANDWIDTH_MULTIPLIER if node1 is not node2 else 0
 
+# Return how many units of computation length each logical node on the
+# physical node gets through per timestep. Physical nodes without a
+# compute_power compute at speed 1. With share_compute, the compute_power is
+# that of the whole node, split evenly between its slots. Only used with
+# simulate(..., compute_speeds=True)
+def compute_speed(node):
+    speed = node.compute_power if node.compute_power is not None else 1
+    if node.share_compute:
+        return speed / node.slots
+    return speed
+
+# Return the extra computation time of logical node `lnode` on physical node
+# `pnode` from spilling to disk the memory it needs beyond the physical node's
+# memory. Physical nodes without a memory never spill
+def spill_time(lnode, pnode):
+    if pnode.memory is None:
+        return 0
+    return Config.SPILL_LENGTH_MULTIPLIER * max(lnode.memory_size - pnode.memory, 0)
+
 
 # Logical Node state enum
 class LogicalNodeState(Enum):
@@ -60,11 +114,59 @@ def straggler_time(size):
 # 1 - (1 - FAILURE_PROBABILITY) ** t.
 # For example, if FAILURE_PROBABILITY = 0.001 and t = 100, then approximately
 # 10% of the physical nodes will fail at some point.
-# TODO actually use `time`; I believe it may be random.random() <
-# (1 - Config.FAILURE_PROBABILITY) ** time, but I'm not sure
+# `time` may span several timesteps, in which case each node fails with
+# probability 1 - (1 - FAILURE_PROBABILITY) ** time
 def failure(pnodes, time):
+    probability = 1 - (1 - Config.FAILURE_PROBABILITY) ** time
     return [pn for pn in pnodes
-            if (not pn.failed) and random.random() < Config.FAILURE_PROBABILITY]
+            if (not pn.failed) and random.random() < probability]
+
+# Return a NumPy random generator seeded from `random`, so that seeding
+# `random` also makes the vectorized sampling below reproducible
+def numpy_rng():
+    return np.random.default_rng(random.getrandbits(64))
+
+# Sample, for `count` live physical nodes at once, how many timesteps from now
+# each one fails. This follows the same per-timestep coin flip as `failure`
+# (a geometric distribution). With `continuous`, the times are exact instead:
+# exponentially distributed, with the same chance (1-p)^t of a node lasting
+# past time t. Returns None if physical nodes never fail
+def failure_times(count, rng=None, continuous=False):
+    if Config.FAILURE_PROBABILITY <= 0:
+        return None
+    if Config.FAILURE_PROBABILITY >= 1:
+        if continuous:
+            return np.zeros(count)
+        return np.ones(count, dtype=np.int64)
+    rng = rng if rng is not None else numpy_rng()
+    if continuous:
+        return rng.exponential(-1 / math.log1p(-Config.FAILURE_PROBABILITY), size=count)
+    return rng.geometric(Config.FAILURE_PROBABILITY, size=count)
+
+# Straggler coin flips pre-drawn for a whole stage (or all nodes of a type) in
+# one vectorized call. Calling the batch with a size returns the extra time for
+# the next task, exactly like `straggler_time`, and draws a fresh batch of the
+# same length once it runs out
+class StragglerBatch:
+    __slots__ = ('count', 'rng', 'straggles', 'next')
+
+    def __init__(self, count, rng=None):
+        self.count = max(count, 1)
+        self.rng = rng if rng is not None else numpy_rng()
+        self.draw()
+
+    def draw(self):
+        self.straggles = (self.rng.random(self.count) < Config.STRAGGLER_PROBABILITY).tolist()
+        self.next = 0
+
+    def __call__(self, size):
+        if self.next == self.count:
+            self.draw()
+        straggles = self.straggles[self.next]
+        self.next += 1
+        if straggles:
+            return Config.STRAGGLER_LENGTH_MULTIPLIER * size
+        return 0
 
 # Default functions for computation time and output size (just the size for now)
 
@@ -74,24 +176,99 @@ def default_comp_length(size):
 def comp_length_with_straggler(size):
     return Config.COMP_LENGTH_MULTIPLIER * size + straggler_time(size)
 
+# Return a computation length function like `default_comp_length` whose
+# straggler times come from a batch drawn for `count` logical nodes
+def batched_comp_length(count):
+    stragglers = StragglerBatch(count)
+
+    def comp_length(size):
+        return Config.COMP_LENGTH_MULTIPLIER * size + stragglers(size)
+
+    return comp_length
+
 def default_output_length(size):
     return Config.OUTPUT_LENGTH_MULTIPLIER * size
 
+# Memory a logical node needs to compute, from its input size. Nothing by
+# default, so that physical node memory only matters once it is set
+def default_memory_length(size):
+    return Config.MEMORY_MULTIPLIER * size
+
+# A list of inputs that tells the logical node owning it whenever it changes,
+# so the node can cache sizes derived from its inputs
+class InputQueue(list):
+    __slots__ = ('owner',)
+
+    def __init__(self, inputs, owner):
+        super().__init__(inputs)
+        self.owner = owner
+
+    def append(self, inp):
+        super().append(inp)
+        self.owner.inputs_changed()
+
+    def extend(self, inputs):
+        super().extend(inputs)
+        self.owner.inputs_changed()
+
+    def insert(self, index, inp):
+        super().insert(index, inp)
+        self.owner.inputs_changed()
+
+    def pop(self, index=-1):
+        inp = super().pop(index)
+        self.owner.inputs_changed()
+        return inp
+
+    def remove(self, inp):
+        super().remove(inp)
+        self.owner.inputs_changed()
+
+    def clear(self):
+        super().clear()
+        self.owner.inputs_changed()
+
+    def __setitem__(self, index, inp):
+        super().__setitem__(index, inp)
+        self.owner.inputs_changed()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self.owner.inputs_changed()
+
+    def __iadd__(self, inputs):
+        super().__iadd__(inputs)
+        self.owner.inputs_changed()
+        return self
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self.owner.inputs_changed()
+        return self
+
 class LogicalNode:
     lnode_count = 0
+    __slots__ = ('id', 'comp_length', '_output_length', 'memory_length', 'pnode', '_input_q',
+                 'in_neighbors', 'out_neighbors', 'state', 'type',
+                 'schedule_time', 'comp_start_time', 'comp_end_time',
+                 '_input_size', '_output_size', '_table', '_row',
+                 'stage_inputs', 'stage_outputs', 'input_summary')
+
     def __init__(self, ninputs=None, pnode=None, input_q=None,
                 comp_length=default_comp_length,
                 output_length=default_output_length,
                 in_neighbors=None, out_neighbors=None,
                 state=LogicalNodeState.NOT_SCHEDULED,
                 type=LogicalNodeType.OTHER,
-                id = None):
+                id = None,
+                memory_length=default_memory_length):
         self.id = id
         if id is None:
             self.id = 'lnode_' + str(LogicalNode.lnode_count)
             LogicalNode.lnode_count += 1
         self.comp_length = comp_length
         self.output_length = output_length
+        self.memory_length = memory_length
         self.pnode = pnode
         self.input_q = input_q if input_q is not None else []
         self.in_neighbors = in_neighbors if in_neighbors is not None else []
@@ -101,22 +278,80 @@ class LogicalNode:
         self.schedule_time = None
         self.comp_start_time = None
         self.comp_end_time = None
+        # Stage edges (see stages.StageEdge) into and out of this node, if any
+        self.stage_inputs = None
+        self.stage_outputs = None
+        # InputSummary standing for the inputs from in_neighbors, if they are
+        # aggregated (see simulate)
+        self.input_summary = None
+
+    @property
+    def input_q(self):
+        return self._input_q
+
+    @input_q.setter
+    def input_q(self, inputs):
+        self._input_q = InputQueue(inputs, self)
+        self.inputs_changed()
+
+    @property
+    def output_length(self):
+        return self._output_length
+
+    @output_length.setter
+    def output_length(self, output_length):
+        self._output_length = output_length
+        self._output_size = None
+
+    # Forget the sizes cached from the previous contents of `input_q`
+    def inputs_changed(self):
+        self._input_size = None
+        self._output_size = None
 
+    # Inputs from stage edges grow without the node being told, so their sizes
+    # are not cached
     @property
     def input_size(self):
-        return sum([x.size for x in self.input_q])
+        if self._input_size is None:
+            input_size = sum([x.size for x in self._input_q])
+            if self.stage_inputs is not None:
+                return input_size
+            self._input_size = input_size
+        return self._input_size
 
+    # Number of inputs received, counting every input an InputSummary stands for
+    @property
+    def input_count(self):
+        summary = self.input_summary
+        if summary is not None and summary.count > 0:
+            return len(self._input_q) - 1 + summary.count
+        return len(self._input_q)
+
+    # Each stage edge into the node counts as a single input
     @property
     def ninputs(self):
+        if self.stage_inputs is not None:
+            return len(self.in_neighbors) + len(self.stage_inputs)
         return len(self.in_neighbors)
 
+    # Not cached, since comp_length may add a random straggler time on each call
     @property
     def comp_time(self):
         return self.comp_length(self.input_size)
 
     @property
     def output_size(self):
-        return self.output_length(self.input_size)
+        if self._output_size is None:
+            output_size = self._output_length(self.input_size)
+            if self.stage_inputs is not None:
+                return output_size
+            self._output_size = output_size
+        return self._output_size
+
+    # Memory needed to compute on the inputs received so far
+    @property
+    def memory_size(self):
+        return self.memory_length(self.input_size)
 
     # Can this logical node be scheduled?
     def schedulable(self):
@@ -124,10 +359,14 @@ class LogicalNode:
 
     # Are all the inputs present for this logical node (not necessarily arrived)
     def inputs_present(self):
-        return len(self.input_q) == self.ninputs
+        if self.stage_inputs is not None and not all(inp.complete() for inp in self.stage_inputs):
+            return False
+        return self.input_count == self.ninputs
 
 class MapNode(LogicalNode):
     map_count = 0
+    __slots__ = ()
+
     def __init__(self, ninputs=None, pnode=None, input_q=None,
                 comp_length=default_comp_length,
                 output_length=default_output_length,
@@ -143,6 +382,8 @@ class MapNode(LogicalNode):
 
 class ReduceNode(LogicalNode):
     reduce_count = 0
+    __slots__ = ()
+
     def __init__(self, ninputs=None, pnode=None, input_q=None,
                 comp_length=default_comp_length,
                 output_length=default_output_length,
@@ -154,6 +395,8 @@ class ReduceNode(LogicalNode):
 
 class ShuffleNode(LogicalNode):
     shuffle_count = 0
+    __slots__ = ()
+
     def __init__(self, ninputs=None, pnode=None, input_q=None,
                 comp_length=default_comp_length,
                 output_length=default_output_length,
@@ -164,27 +407,52 @@ class ShuffleNode(LogicalNode):
         super().__init__(ninputs, pnode, input_q, comp_length, output_length, in_neighbors, out_neighbors, state, LogicalNodeType.SHUFFLE, nid)
 
     def schedulable(self):
-        return (self.state is LogicalNodeState.NOT_SCHEDULED or self.state is LogicalNodeState.FAILED) and len(self.input_q) > 0
+        return (self.state is LogicalNodeState.NOT_SCHEDULED or self.state is LogicalNodeState.FAILED) and self.input_count > 0
 
 
 
 class PhysicalNode:
     pnode_count = 0
+    __slots__ = ('id', 'compute_power', 'memory', 'bandwidth', 'lnodes', 'failed', 'network', 'slots', 'share_compute')
+
     def __init__(self, compute_power=None, memory=None,
-                bandwidth=None, lnode=None, failed=False):
+                bandwidth=None, lnode=None, failed=False, slots=1, share_compute=False):
         self.id = 'pnode_' + str(PhysicalNode.pnode_count)
         PhysicalNode.pnode_count += 1
         self.compute_power = compute_power
         self.memory = memory
         self.bandwidth = bandwidth
-        self.lnode = lnode
+        # Logical nodes running on the node, at most one per slot
+        self.lnodes = [lnode] if lnode is not None else []
         self.failed = failed
+        # Network model the node is part of, set by the model (see network.py)
+        self.network = None
+        # Number of logical nodes the node can run at the same time, and
+        # whether they split its compute_power between them (see compute_speed)
+        self.slots = slots
+        self.share_compute = share_compute
+
+    # The logical node running on the node, or the first of them with several
+    # slots. Setting it replaces every logical node running on the node
+    @property
+    def lnode(self):
+        return self.lnodes[0] if self.lnodes else None
+
+    @lnode.setter
+    def lnode(self, lnode):
+        self.lnodes = [lnode] if lnode is not None else []
+
+    # Number of logical nodes the node can still be assigned
+    def free_slots(self):
+        return 0 if self.failed else max(self.slots - len(self.lnodes), 0)
 
     # Can this physical node be scheduled?
     def schedulable(self):
-        return self.lnode is None and not self.failed
+        return len(self.lnodes) < self.slots and not self.failed
 
 class Input:
+    __slots__ = ('size', 'timestamp', 'source')
+
     def __init__(self, size=None, timestamp=None, source=None):
         self.size = size
         self.timestamp = timestamp
@@ -193,3 +461,69 @@ class Input:
     # Update the timestamp of this input to arrive at the physical node `pnode`
     def update_time(self, timer, pnode):
         self.timestamp = timer.delta(self.size * bandwidth(self.source, pnode))
+
+class InputSummary(Input):
+    '''
+        Many inputs of a logical node seen as a single Input: how many were
+        received, their total size, and the time by which all of them will
+        have arrived (None while the node has no physical node). For inputs
+        received while the node has no physical node, only the largest one
+        from each source physical node is kept, which is all that is needed
+        to work out when they arrive once it gets one.
+        It is added to the node's input queue with the first input it stands for
+    '''
+    __slots__ = ('owner', 'count', 'total', 'largest', 'pnode', 'arrival')
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.count = 0
+        self.total = 0
+        # id of source physical node -> (source physical node, largest size)
+        self.largest = {}
+        self.pnode = None
+        self.arrival = None
+
+    @property
+    def size(self):
+        return self.total
+
+    @property
+    def source(self):
+        return None
+
+    @property
+    def timestamp(self):
+        return self.arrival if self.pnode is not None else None
+
+    @timestamp.setter
+    def timestamp(self, timestamp):
+        if timestamp is not None:
+            raise ValueError('The timestamp of an InputSummary can only be reset to None')
+        self.pnode = None
+        self.arrival = None
+
+    # Receive an input of `size` from `source`, a physical node, at the current
+    # time; `pnode` is the physical node the owner is assigned to and waiting
+    # for its inputs on, if any (not the failed one of a failed owner)
+    def receive(self, size, source, timer, pnode):
+        self.count += 1
+        self.total += size
+        largest = self.largest.get(id(source))
+        if largest is None or size > largest[1]:
+            self.largest[id(source)] = (source, size)
+        if pnode is not None:
+            if self.pnode is not pnode:
+                # Every input received so far is sent to the new physical node
+                self.update_time(timer, pnode)
+            else:
+                self.arrival = max(self.arrival, timer.delta(size * bandwidth(source, pnode)))
+        if self.count == 1:
+            self.owner.input_q.append(self)
+        else:
+            self.owner.inputs_changed()
+
+    def update_time(self, timer, pnode):
+        self.pnode = pnode
+        self.arrival = timer.now()
+        for source, size in self.largest.values():
+            self.arrival = max(self.arrival, timer.delta(size * bandwidth(source, pnode)))
@@ -0,0 +1,199 @@
+# Struct-of-arrays storage for the state of logical nodes. Instead of one
+# Python object per node holding its state and timestamps, every field is a
+# NumPy array indexed by the node's position in the simulated list, so the
+# simulator can answer questions like "which computing nodes are done by now"
+# with a single vectorized mask. While bound, the LogicalNode objects stay
+# usable as before and simply read and write their row of the table.
+
+from simulator.nodes import LogicalNode, PhysicalNode, LogicalNodeState
+import math
+import numpy as np
+
+# Codes stored in the state array, indexed by LogicalNodeState.value
+STATES = [None] + sorted(LogicalNodeState, key=lambda x: x.value)
+NEED_INPUT = LogicalNodeState.NEED_INPUT.value
+COMPUTING = LogicalNodeState.COMPUTING.value
+
+# The parts of a logical node the simulator updates as it runs
+FIELDS = ['state', 'pnode', 'schedule_time', 'comp_start_time', 'comp_end_time']
+TIMES = ['schedule_time', 'comp_start_time', 'comp_end_time']
+
+# Property reading and writing field `name` of a bound node's row. state and
+# pnode are read straight from their arrays since the simulator reads them most
+def table_field(name):
+    if name == 'state':
+        def get(self):
+            return STATES[self._table.state[self._row]]
+
+        def set(self, value):
+            self._table.state[self._row] = value.value
+            self._table.dirty.append(self._row)
+    elif name == 'pnode':
+        def get(self):
+            position = self._table.pnode[self._row]
+            return self._table.pnodes[position] if position >= 0 else None
+
+        def set(self, value):
+            self._table.pnode[self._row] = self._table.pnode_position[id(value)] if value is not None else -1
+    else:
+        def get(self):
+            return self._table.get(name, self._row)
+
+        def set(self, value):
+            self._table.set(name, self._row, value)
+
+    return property(get, set)
+
+# While bound to a table, a logical node's class is swapped for a subclass that
+# reads and writes FIELDS and its input size from the table, so nodes that are
+# not bound keep plain attributes and pay nothing for this. The subclass is
+# named after the node's class with a View suffix, so a bound MapNode shows up
+# as a MapNodeView in reprs and tracebacks
+view_classes = {}
+
+def view_class(cls):
+    if cls not in view_classes:
+        members = {name: table_field(name) for name in FIELDS}
+        members['__slots__'] = ()
+        members['input_size'] = property(lambda self: float(self._table.input_size[self._row]))
+        view_classes[cls] = type(cls.__name__ + 'View', (cls,), members)
+    return view_classes[cls]
+
+class LogicalNodeTable:
+    '''
+        Arrays holding the state, schedule/start/end times, assigned physical
+        node and input size of every logical node. Times are stored as floats,
+        with NaN for times that are not set yet (None on the objects), and a
+        flag per time telling whether it was set as an int, so it reads back
+        as one. Unassigned physical nodes are stored as -1.
+        arrival_time holds the time by which every input of a node will have
+        arrived, or NaN if that is not known yet; the simulator keeps it up to
+        date through set_arrival for nodes waiting for inputs.
+        pending holds the rows that are computing or waiting for inputs with a
+        known time, so finished, arrived and next_time only look at those;
+        rows whose state or times changed are queued in dirty and sorted in or
+        out of pending on the next of these calls
+    '''
+    def __init__(self, lnodes: list[LogicalNode], pnodes: list[PhysicalNode]):
+        self.lnodes = lnodes
+        self.pnodes = pnodes
+        self.pnode_position = {id(pnode): i for i, pnode in enumerate(pnodes)}
+
+        n = len(lnodes)
+        self.state = np.array([lnode.state.value for lnode in lnodes], dtype=np.int8)
+        self.pnode = np.array([self.pnode_position[id(lnode.pnode)] if lnode.pnode is not None else -1
+                               for lnode in lnodes], dtype=np.int32)
+        self.integral = {}
+        for name in TIMES:
+            times = [getattr(lnode, name) for lnode in lnodes]
+            self.integral[name] = np.array([type(time) is int for time in times], dtype=bool)
+            setattr(self, name, np.array([time if time is not None else np.nan for time in times], dtype=float))
+        self.arrival_time = np.full(n, np.nan)
+        self.input_size = np.array([lnode.input_size for lnode in lnodes], dtype=float)
+        self.pending = np.empty(0, dtype=np.intp)
+        self.dirty = list(range(n))
+
+    def bind(self):
+        '''
+            Make the logical nodes views onto this table. Their own copies of
+            FIELDS are cleared, so the table is the only place holding them
+        '''
+        for row, lnode in enumerate(self.lnodes):
+            for name in FIELDS:
+                delattr(lnode, name)
+            lnode._table = self
+            lnode._row = row
+            lnode.__class__ = view_class(type(lnode))
+
+    def unbind(self):
+        '''
+            Copy the table back into the logical nodes and detach them from it
+        '''
+        columns = {name: self.column(name) for name in FIELDS}
+        for row, lnode in enumerate(self.lnodes):
+            lnode.__class__ = type(lnode).__bases__[0]
+            del lnode._table
+            del lnode._row
+            for name in FIELDS:
+                setattr(lnode, name, columns[name][row])
+
+    def column(self, name):
+        '''
+            Return the values of field `name` of every row, as the logical nodes hold them
+        '''
+        if name == 'state':
+            return [STATES[value] for value in self.state.tolist()]
+        if name == 'pnode':
+            return [self.pnodes[value] if value >= 0 else None for value in self.pnode.tolist()]
+        return [None if math.isnan(value) else int(value) if integral else value
+                for value, integral in zip(getattr(self, name).tolist(), self.integral[name].tolist())]
+
+    def get(self, name, row):
+        value = getattr(self, name)[row]
+        if name == 'state':
+            return STATES[value]
+        if name == 'pnode':
+            return self.pnodes[value] if value >= 0 else None
+        if math.isnan(value):
+            return None
+        return int(value) if self.integral[name][row] else float(value)
+
+    def set(self, name, row, value):
+        if name == 'state':
+            value = value.value
+            self.dirty.append(row)
+        elif name == 'pnode':
+            value = self.pnode_position[id(value)] if value is not None else -1
+        else:
+            self.integral[name][row] = type(value) is int
+            if value is None:
+                value = np.nan
+            if name == 'comp_end_time':
+                self.dirty.append(row)
+        getattr(self, name)[row] = value
+
+    def set_arrival(self, row, time):
+        '''
+            Set the time by which every input of the node in `row` will have
+            arrived, None if that is not known yet
+        '''
+        self.arrival_time[row] = time if time is not None else np.nan
+        self.dirty.append(row)
+
+    def pending_rows(self):
+        '''
+            Return the rows that are computing or waiting for inputs with a
+            known time, after sorting the dirty rows in or out of them
+        '''
+        if self.dirty:
+            rows = np.unique(np.array(self.dirty, dtype=np.intp))
+            self.dirty = []
+            state = self.state[rows]
+            timed = (((state == COMPUTING) & ~np.isnan(self.comp_end_time[rows]))
+                     | ((state == NEED_INPUT) & ~np.isnan(self.arrival_time[rows])))
+            self.pending = np.concatenate((self.pending[~np.isin(self.pending, rows)], rows[timed]))
+        return self.pending
+
+    def finished(self, now):
+        '''
+            Return the rows of the computing nodes that are done by `now`
+        '''
+        rows = self.pending_rows()
+        return rows[(self.state[rows] == COMPUTING) & (self.comp_end_time[rows] <= now)]
+
+    def arrived(self, now):
+        '''
+            Return the rows of the nodes waiting for inputs that all arrived by `now`
+        '''
+        rows = self.pending_rows()
+        return rows[(self.state[rows] == NEED_INPUT) & (self.arrival_time[rows] <= now)]
+
+    def next_time(self):
+        '''
+            Return the earliest time a computing node finishes or the inputs of
+            a waiting node all arrive, or None if there is no such node
+        '''
+        rows = self.pending_rows()
+        if len(rows) == 0:
+            return None
+        return float(np.where(self.state[rows] == COMPUTING, self.comp_end_time[rows], self.arrival_time[rows]).min())
@@ -0,0 +1,83 @@
+# Options of a simulation, used by simulate(..., options=SimulationOptions()).
+#
+# SimulationOptions holds the switches picking how the simulator runs and
+# checks that they can be used together when it is built, so simulate and the
+# run itself only read them. Checks that need the graph, such as physical
+# nodes sharing their compute power, are done by check once simulate has it.
+
+# Options each feature cannot be combined with. 'checkpoints' stands for
+# checkpoint_path or resume_from
+UNSUPPORTED = {
+    'speculation': ('node_table', 'contention', 'checkpoints'),
+    'contention': ('node_table', 'aggregate_inputs', 'checkpoints'),
+}
+
+class SimulationOptions:
+    '''
+        Switches of a simulation (see simulate for what each does):
+        event_driven: only visit the timesteps at which something can happen
+        node_table: keep the state of the logical nodes in a LogicalNodeTable
+        checkpoint_path, checkpoint_every: where and how often to checkpoint
+        resume_from: checkpoint file, or loaded checkpoint, to resume from
+        trace: Trace to record events into
+        adjacency: Adjacency of the logical nodes to send outputs along
+        aggregate_inputs: give logical nodes an InputSummary of their inputs
+        continuous_time: do not round times up to whole timesteps
+        compute_speeds: divide computation lengths by compute_power
+        contention: share the bandwidth between inputs in transit
+        speculation: Speculation launching backups of stragglers
+    '''
+    def __init__(self, event_driven=True, node_table=False, checkpoint_path=None, checkpoint_every=None,
+                 resume_from=None, trace=None, adjacency=None, aggregate_inputs=False, continuous_time=False,
+                 compute_speeds=False, contention=False, speculation=None):
+        self.event_driven = event_driven
+        self.node_table = node_table
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.resume_from = resume_from
+        self.trace = trace
+        self.adjacency = adjacency
+        self.aggregate_inputs = aggregate_inputs
+        self.continuous_time = continuous_time
+        self.compute_speeds = compute_speeds
+        self.contention = contention
+        self.speculation = speculation
+        self.validate()
+
+    @property
+    def checkpoints(self):
+        return self.checkpoint_path is not None or self.resume_from is not None
+
+    def enabled(self, name):
+        '''
+            Function to tell whether option `name` is switched on
+        '''
+        value = getattr(self, name)
+        return value is not None and value is not False
+
+    def validate(self):
+        '''
+            Function to raise a ValueError if some options cannot be used together
+        '''
+        if self.continuous_time and not self.event_driven:
+            raise ValueError('Continuous time needs the event-driven simulator')
+        for feature, others in UNSUPPORTED.items():
+            if not self.enabled(feature):
+                continue
+            clashing = [name for name in others if self.enabled(name)]
+            if clashing:
+                raise ValueError('{} is not supported with {}'.format(feature, ', '.join(clashing)))
+        if self.checkpoint_path is not None and self.checkpoint_every is None:
+            raise ValueError('checkpoint_path needs checkpoint_every')
+
+    def check(self, lnodes, pnodes):
+        '''
+            Function to raise a ValueError if the options cannot be used with
+            logical nodes `lnodes` and physical nodes `pnodes`
+        '''
+        if not self.compute_speeds and any(pnode.share_compute for pnode in pnodes):
+            raise ValueError('Physical nodes sharing their compute power need compute_speeds')
+        if self.contention and any(lnode.stage_inputs is not None for lnode in lnodes):
+            raise ValueError('contention is not supported with stage edges')
+        if self.adjacency is not None and self.adjacency.n != len(lnodes):
+            raise ValueError('Adjacency has {} nodes, got {}'.format(self.adjacency.n, len(lnodes)))
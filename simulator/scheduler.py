@@ -0,0 +1,175 @@
+# Stateful schedulers. A scheduler is created once per simulation with the
+# logical and physical nodes, and from then on the simulator tells it about
+# every change as it happens: a logical node becoming ready, being assigned,
+# completing or failing, a backup copy of it being started, and a physical
+# node being freed or lost. Each visited
+# timestep the simulator asks it for new assignments with assign(), so a
+# scheduler only has to look at what changed since the last call instead of
+# rescanning the graph and the cluster.
+#
+# The base class keeps the ready logical nodes in a ReadySet and the free
+# physical nodes in a PhysicalNodePool; subclasses that keep other structures
+# (priority queues, indexes) override the notifications, calling the base
+# class versions to keep those two up to date.
+#
+# Schedulers written as a class with a static schedule(logical_nodes,
+# physical_nodes, completed_nodes, failed_nodes, ready_nodes, free_pnodes)
+# function can still be passed to simulate; they are wrapped in a
+# StaticScheduler.
+
+from simulator.nodes import LogicalNode, PhysicalNode
+from simulator.state import ReadySet, PhysicalNodePool
+
+class Scheduler:
+    '''
+        Base class of stateful schedulers. Subclasses implement assign(), and
+        optionally override the notifications and find_best_physical_node
+    '''
+    def __init__(self, logical_nodes: list[LogicalNode], physical_nodes: list[PhysicalNode]):
+        self.logical_nodes = logical_nodes
+        self.physical_nodes = physical_nodes
+        self.ready = ReadySet(logical_nodes)
+        self.free_pnodes = PhysicalNodePool(physical_nodes)
+
+    @classmethod
+    def schedule(cls, logical_nodes: list[LogicalNode], physical_nodes: list[PhysicalNode], completed_nodes: list[LogicalNode] = (), failed_nodes: list[LogicalNode] = ()):
+        '''
+            Function to schedule the logical nodes to physical nodes once, from
+            scratch, with a new scheduler
+            logical_nodes: list of logical nodes to schedule
+            physical_nodes: list of physical nodes to schedule to
+            completed_nodes: list of logical nodes that completed in the last loop iteration
+            failed_nodes: list of logical nodes that failed in the last loop iteration
+        '''
+        scheduler = cls(logical_nodes, physical_nodes)
+        for lnode in failed_nodes:
+            scheduler.node_failed(lnode)
+        for lnode in completed_nodes:
+            scheduler.node_completed(lnode)
+        return scheduler.assign()
+
+    def assign(self):
+        '''
+            Function to return the list of (logical node, physical node) pairs
+            to assign now. A physical node with several free slots may be
+            handed out once per slot; each slot handed out is taken from the
+            pool
+        '''
+        raise NotImplementedError
+
+    def find_best_physical_node(self, logical_node: LogicalNode):
+        '''
+            Function to find the best free physical node for the logical node,
+            or None if there is none
+            logical_node: logical node to place
+        '''
+        # Every free physical node is equally good, so take the first one in the pool
+        return self.free_pnodes.first()
+
+    def candidate_pnode(self, logical_node: LogicalNode):
+        '''
+            Function to return the free physical node find_best_physical_node
+            would pick for the logical node, or None, without changing any
+            state of the scheduler. Used to place backups (see
+            speculation.py); override it along with find_best_physical_node
+            when the latter keeps track of what it picked
+            logical_node: logical node to place
+        '''
+        return self.find_best_physical_node(logical_node)
+
+    def state(self):
+        '''
+            Function to return, as a dict of plain Python values, the state
+            of the scheduler that cannot be worked out again from the logical
+            and physical nodes, to save in checkpoints (see checkpoint.py).
+            Logical nodes are referred to by their position
+        '''
+        return {}
+
+    def restore_state(self, state):
+        '''
+            Function to take back the state returned by state(), once the
+            scheduler was created for the restored nodes and told about the
+            completed and failed ones
+        '''
+        pass
+
+    # Notifications from the simulator
+
+    def node_ready(self, lnode: LogicalNode):
+        '''
+            The logical node can be scheduled: it got an input, or its
+            physical node failed
+        '''
+        self.ready.add(lnode)
+
+    def node_assigned(self, lnode: LogicalNode, pnode: PhysicalNode):
+        '''
+            The logical node was assigned to the physical node
+        '''
+        self.ready.discard(lnode)
+        self.free_pnodes.release(pnode)
+
+    def backup_assigned(self, lnode: LogicalNode, pnode: PhysicalNode):
+        '''
+            A backup copy of the computing logical node was started on the
+            physical node (see speculation.py). The physical node is freed
+            (see pnode_freed) once either copy finishes
+        '''
+        self.free_pnodes.release(pnode)
+
+    def node_completed(self, lnode: LogicalNode):
+        '''
+            The logical node finished computing; its physical node is freed
+            (see pnode_freed) just before
+        '''
+
+    def node_failed(self, lnode: LogicalNode):
+        '''
+            The physical node of the logical node failed (see pnode_lost) and
+            it has to be scheduled again
+        '''
+
+    def pnode_freed(self, pnode: PhysicalNode):
+        '''
+            A logical node running on the physical node completed, freeing
+            one of its slots
+        '''
+        self.free_pnodes.release(pnode)
+
+    def pnode_lost(self, pnode: PhysicalNode):
+        '''
+            The physical node failed
+        '''
+        self.free_pnodes.discard(pnode)
+
+class StaticScheduler(Scheduler):
+    '''
+        Scheduler calling the static schedule function of `scheduler_class`
+        with the nodes completed and failed since the last call
+    '''
+    def __init__(self, scheduler_class, logical_nodes: list[LogicalNode], physical_nodes: list[PhysicalNode]):
+        super().__init__(logical_nodes, physical_nodes)
+        self.scheduler_class = scheduler_class
+        self.completed = []
+        self.failed = []
+
+    def assign(self):
+        assignments = self.scheduler_class.schedule(self.logical_nodes, self.physical_nodes, self.completed,
+                                                    self.failed, self.ready, self.free_pnodes)
+        self.completed.clear()
+        self.failed.clear()
+        return assignments
+
+    def node_completed(self, lnode: LogicalNode):
+        self.completed.append(lnode)
+
+    def node_failed(self, lnode: LogicalNode):
+        self.failed.append(lnode)
+
+# Return a scheduler for a simulation: a new instance of `scheduler_class` if
+# it is a Scheduler, otherwise a StaticScheduler calling its schedule function
+def create_scheduler(scheduler_class, logical_nodes: list[LogicalNode], physical_nodes: list[PhysicalNode]):
+    if isinstance(scheduler_class, type) and issubclass(scheduler_class, Scheduler):
+        return scheduler_class(logical_nodes, physical_nodes)
+    return StaticScheduler(scheduler_class, logical_nodes, physical_nodes)
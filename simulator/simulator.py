@@ -9,83 +9,509 @@
 # timestep, the simulator observes the current state of the
 # system and determines the next state.
 
-from simulator.nodes import LogicalNode, PhysicalNode, Input, LogicalNodeState, LogicalNodeType, MapNode, ReduceNode, ShuffleNode, failure
+from simulator.nodes import LogicalNode, PhysicalNode, Input, InputSummary, LogicalNodeState, LogicalNodeType, MapNode, ReduceNode, ShuffleNode, failure, failure_times, compute_speed, spill_time
 from simulator.timer import Timer
+from simulator.scheduler import create_scheduler
+from simulator import checkpoint
+from simulator.tracing import Trace, PrintWriter, EventType
+from simulator.flows import FlowNetwork
+from simulator.options import SimulationOptions
+from heapq import heappush, heappop
+from itertools import chain
+import numpy as np
 
-def simulate(lnodes, pnodes, scheduler_class, verbose=True):
-    fail_count = 0
-    timer = Timer()
-    completed_lnodes = []
-    failed_lnodes = []
-    while True:
-        if verbose:
-            print('Current time: {}'.format(timer.now()))
-        node_assignments = scheduler_class.schedule(lnodes, pnodes, completed_lnodes, failed_lnodes)
-        completed_lnodes.clear()
-        failed_lnodes.clear()
+# Return the time by which every input of `lnode` will have arrived, or None if
+# some inputs are still missing or not yet on their way
+def arrival_time(lnode):
+    if not lnode.inputs_present():
+        return None
+    latest = 0
+    for inp in lnode.input_q:
+        if inp.timestamp is None:
+            return None
+        latest = max(latest, inp.timestamp)
+    return latest
+
+# `scheduler_class` is a Scheduler subclass (see scheduler.py), created once
+# and told about every change, or a class with a static schedule function.
+# The other switches below are fields of a SimulationOptions (see options.py),
+# which checks that they can be used together; they are passed either as
+# `options` or as keyword arguments.
+# With `event_driven`, the simulator only visits the timesteps at which
+# something can happen (an input arrives, a computation ends, a physical node
+# fails, or the scheduler has something new to look at) and jumps over the
+# rest. Otherwise it visits every timestep, as the simulator originally did.
+# Both visit logical nodes in the order of `lnodes` within a timestep, so they
+# produce the same schedule; only how failures are sampled differs.
+# With `node_table`, the state of the logical nodes is kept in a
+# LogicalNodeTable for the duration of the simulation and finished or
+# arrived nodes are found with vectorized masks over the nodes computing or
+# waiting for inputs, instead of a heap.
+# With `checkpoint_path` and `checkpoint_every`, the state of the simulation is
+# written to `checkpoint_path` (formatted with the current `time`, if it
+# contains {time}) at the start of the first timestep visited every
+# `checkpoint_every` timesteps. `resume_from` is such a file, or a checkpoint
+# already loaded with checkpoint.load; `lnodes` and `pnodes` must then be the
+# same graph built anew, and the simulation carries on exactly as the
+# checkpointed one would have.
+# Events are recorded into `trace` (see tracing.Trace), if given.
+# With an `adjacency` (see adjacency.Adjacency) of `lnodes`, outputs of
+# completed nodes are sent along its edges instead of the out_neighbors lists.
+# With `aggregate_inputs`, each logical node with in-neighbors gets an
+# InputSummary for the inputs they send it, instead of an Input per edge.
+# With `continuous_time` (event-driven only), times are not rounded up to whole
+# timesteps: the simulator goes straight to the exact time of the next event,
+# and physical nodes fail at exponentially distributed times.
+# With `compute_speeds`, a logical node's computation length is divided by the
+# compute_power of the physical node it runs on (see nodes.compute_speed).
+# A physical node runs up to `slots` logical nodes at the same time; inputs
+# sent between them arrive right away. Physical nodes with share_compute
+# split their compute_power evenly between their slots, which needs
+# `compute_speeds`, the only mode in which compute_power counts.
+# A logical node needing more memory than its physical node has computes for
+# longer, spilling to disk (see nodes.spill_time).
+# With `contention`, inputs in transit at the same time share the bandwidth of
+# the NICs and links they go through (see flows.py) instead of each getting
+# the full bandwidth. Not supported with node_table, aggregate_inputs, stage
+# edges or checkpoints.
+# With a `speculation` (see speculation.Speculation), stragglers get a backup
+# copy on a free physical node and the copy that finishes first is kept; the
+# Speculation counts the backups launched and how they ended. Not supported
+# with node_table, contention or checkpoints.
+# Events are printed as they are recorded with `verbose`.
+def simulate(lnodes, pnodes, scheduler_class, verbose=True, options=None, **switches):
+    if options is None:
+        options = SimulationOptions(**switches)
+    elif switches:
+        raise TypeError('Got both options and {}'.format(', '.join(switches)))
+    options.check(lnodes, pnodes)
+    if options.speculation is not None:
+        options.speculation.reset()
+    resumed = None
+    resume_from = options.resume_from
+    if resume_from is not None:
+        if isinstance(resume_from, str):
+            resume_from = checkpoint.load(resume_from)
+        for name in ('event_driven', 'continuous_time'):
+            if resume_from[name] != getattr(options, name):
+                raise ValueError('Checkpoint was taken with {}={}'.format(name, resume_from[name]))
+        resumed = checkpoint.restore(resume_from, lnodes, pnodes)
+    trace = options.trace
+    if verbose:
+        trace = Trace(PrintWriter(), *(trace.writers if trace is not None else []))
+    if options.aggregate_inputs:
+        for lnode in lnodes:
+            if lnode.input_summary is None and len(lnode.in_neighbors) > 0:
+                lnode.input_summary = InputSummary(lnode)
+
+    table = None
+    if options.node_table:
+        from simulator.nodetable import LogicalNodeTable
+        table = LogicalNodeTable(lnodes, pnodes)
+        table.bind()
+    try:
+        return Simulation(lnodes, pnodes, scheduler_class, options, trace, table, resumed).run()
+    finally:
+        if table is not None:
+            table.unbind()
+        if trace is not None:
+            trace.flush()
+
+class Simulation:
+    '''
+        State of one run of simulate: the scheduler, the heaps of logical
+        nodes to wake up and of upcoming physical node failures, and the
+        logical nodes completed and failed in the current timestep.
+        run() is the tick loop; each timestep it hands the physical nodes
+        that failed to fail(), the scheduler's assignments to assign(), and
+        every logical node due to update(), which sends the outputs of the
+        nodes that complete with send_outputs()
+    '''
+    def __init__(self, lnodes, pnodes, scheduler_class, options, trace, table, resumed):
+        self.lnodes = lnodes
+        self.pnodes = pnodes
+        self.options = options
+        self.trace = trace
+        self.table = table
+        self.flows = FlowNetwork() if options.contention else None
+        self.speculation = options.speculation
+        self.fail_count = 0
+        self.timer = Timer(options.continuous_time)
+        self.completed_lnodes = []
+        self.failed_lnodes = []
+
+        # The scheduler keeps track of the ready logical nodes and free physical
+        # nodes from the changes it is told about
+        self.scheduler = create_scheduler(scheduler_class, lnodes, pnodes)
+        self.position = {id(lnode): i for i, lnode in enumerate(lnodes)}
+        self.remaining = sum(1 for lnode in lnodes if lnode.state is not LogicalNodeState.COMPLETED)
+        self.alive = sum(1 for pnode in pnodes if not pnode.failed)
+        stage_edges = {id(edge): edge for lnode in lnodes for edge in lnode.stage_outputs or ()}
+        for edge in stage_edges.values():
+            edge.bind(pnodes)
+
+        # Heap of (timestep, position) for logical nodes that may change state at
+        # that timestep. Entries are re-checked when popped, so stale ones are fine
+        self.wakeups = [(0, i) for i, lnode in enumerate(lnodes)
+                        if lnode.state is LogicalNodeState.NEED_INPUT or lnode.state is LogicalNodeState.COMPUTING]
+
+        # Heap of (timestep, index) of upcoming physical node failures, sampled
+        # for all physical nodes at once
+        self.failures = []
+        if options.event_driven and resumed is None:
+            live = np.flatnonzero([not pnode.failed for pnode in pnodes])
+            fail_times = failure_times(len(live), continuous=options.continuous_time)
+            if fail_times is not None:
+                order = np.argsort(fail_times, kind='stable')
+                # A sorted list is already a heap
+                self.failures = list(zip(fail_times[order].tolist(), live[order].tolist()))
+
+        if resumed is not None:
+            (self.timer, self.completed_lnodes, self.failed_lnodes, self.wakeups, self.failures,
+             self.fail_count, scheduler_state) = resumed
+            for lnode in self.failed_lnodes:
+                self.scheduler.node_failed(lnode)
+            for lnode in self.completed_lnodes:
+                self.scheduler.node_completed(lnode)
+            self.scheduler.restore_state(scheduler_state)
+            if table is not None:
+                for i, lnode in enumerate(lnodes):
+                    if lnode.state is LogicalNodeState.NEED_INPUT:
+                        table.set_arrival(i, arrival_time(lnode))
+        self.next_checkpoint = None
+        if options.checkpoint_path is not None:
+            self.next_checkpoint = self.timer.now() + options.checkpoint_every
+
+    def run(self):
+        '''
+            Function to simulate timesteps until every logical node completed,
+            and return the time it took
+        '''
+        timer = self.timer
+        trace = self.trace
+        table = self.table
+        flows = self.flows
+        speculation = self.speculation
+        wakeups = self.wakeups
+        while True:
+            if self.next_checkpoint is not None and timer.passed(self.next_checkpoint):
+                self.save_checkpoint()
+
+            if trace is not None:
+                trace.record(EventType.TIME, timer.now())
+            if flows is not None:
+                flows.advance(timer.now())
+
+            self.fail(self.failed_pnodes())
+            node_assignments = self.scheduler.assign()
+            self.completed_lnodes.clear()
+            self.failed_lnodes.clear()
+
+            # Heap of positions of the logical nodes to update in this timestep
+            due = self.assign(node_assignments)
+            if speculation is not None:
+                for i in speculation.launch(self.lnodes, self.scheduler, timer, self.options.compute_speeds):
+                    backup = speculation.backups[i]
+                    if trace is not None:
+                        trace.record(EventType.BACKUP, timer.now(), self.lnodes[i].id, backup.pnode.id)
+                    heappush(wakeups, (timer.first_passed(backup.end), i))
+            while wakeups and timer.passed(wakeups[0][0]):
+                heappush(due, heappop(wakeups)[1])
+            if table is not None:
+                for i in table.finished(timer.now()):
+                    heappush(due, int(i))
+                for i in table.arrived(timer.now()):
+                    heappush(due, int(i))
+
+            previous = None
+            while due:
+                i = heappop(due)
+                if i != previous:
+                    self.update(i, due)
+                previous = i
+
+            if flows is not None:
+                for wakeup, j in flows.update(timer):
+                    heappush(wakeups, (max(wakeup, timer.next()), j))
+
+            if self.remaining == 0:
+                if trace is not None:
+                    trace.record(EventType.DONE, timer.now())
+                return timer.now()
+            if self.alive == 0:
+                raise RuntimeError('All physical nodes failed with {} logical nodes left'.format(self.remaining))
+            self.step()
+
+    def save_checkpoint(self):
+        '''
+            Function to write a checkpoint of the current timestep and schedule the next one
+        '''
+        timer = self.timer
+        checkpoint.save(self.options.checkpoint_path.format(time=timer.now()),
+                        checkpoint.capture(self.lnodes, self.pnodes, self.options.event_driven, timer,
+                                           self.completed_lnodes, self.failed_lnodes, self.wakeups,
+                                           self.failures, self.fail_count, self.scheduler))
+        self.next_checkpoint = timer.now() + self.options.checkpoint_every
+
+    def step(self):
+        '''
+            Function to move the timer on to the next timestep to visit
+        '''
+        # Give the scheduler a chance to react to completions right away
+        timer = self.timer
+        if self.options.event_driven:
+            upcoming = [queue[0][0] for queue in (self.wakeups, self.failures) if queue]
+            for model in (self.table, self.flows, self.speculation):
+                next_time = model.next_time() if model is not None else None
+                if next_time is not None:
+                    upcoming.append(timer.first_passed(next_time))
+            timer.step(len(self.completed_lnodes) > 0, min(upcoming) if upcoming else None)
+        else:
+            timer.step(len(self.completed_lnodes) > 0)
+
+    def failed_pnodes(self):
+        '''
+            Function to return the physical nodes failing in the current timestep
+        '''
+        timer = self.timer
+        if self.options.event_driven:
+            failed_nodes = []
+            while self.failures and timer.passed(self.failures[0][0]):
+                failed_nodes.append(self.pnodes[heappop(self.failures)[1]])
+            return failed_nodes
+        if timer.elapsed() > 0:
+            return failure(self.pnodes, timer.elapsed())
+        return []
+
+    def fail(self, failed_nodes):
+        '''
+            Function to mark physical nodes `failed_nodes` as failed and abort
+            the logical nodes running on them
+        '''
+        trace = self.trace
+        for pnode in failed_nodes:
+            if pnode.failed:
+                continue
+            pnode.failed = True
+            self.scheduler.pnode_lost(pnode)
+            self.fail_count += 1
+            self.alive -= 1
+            if trace is not None:
+                trace.record(EventType.FAILED, self.timer.now(), pnode=pnode.id)
+            for lnode in list(pnode.lnodes):
+                if trace is not None:
+                    trace.record(EventType.ABORTED, self.timer.now(), lnode.id, pnode.id)
+                self.abort(lnode, pnode)
+
+    def abort(self, lnode, pnode):
+        '''
+            Function to abort logical node `lnode` running on failed physical
+            node `pnode`, unless a backup copy of it carries on
+        '''
+        i = self.position[id(lnode)]
+        speculation = self.speculation
+        backup = speculation.backups.pop(i, None) if speculation is not None else None
+        if backup is not None:
+            # The other copy of the logical node carries on alone
+            pnode.lnodes.remove(lnode)
+            if backup.pnode is pnode:
+                speculation.lost += 1
+            else:
+                speculation.promoted += 1
+                lnode.pnode = backup.pnode
+                lnode.comp_start_time = backup.start
+                lnode.comp_end_time = backup.end
+            return
+        for inp in lnode.input_q:
+            inp.timestamp = None
+        if self.flows is not None:
+            self.flows.cancel(i)
+        lnode.state = LogicalNodeState.FAILED
+        self.failed_lnodes.append(lnode)
+        self.scheduler.node_failed(lnode)
+        if lnode.schedulable():
+            self.scheduler.node_ready(lnode)
+
+    def assign(self, node_assignments):
+        '''
+            Function to place the logical nodes of `node_assignments` on their
+            physical nodes and send them their inputs, and return a heap of
+            their positions
+        '''
+        timer = self.timer
+        flows = self.flows
+        due = []
         for lnode, pnode in node_assignments:
             assert lnode.schedulable()
             assert pnode.schedulable()
-            if verbose:
-                print('Assigned {} to {}; now waiting'.format(lnode.id, pnode.id))
+            if self.trace is not None:
+                self.trace.record(EventType.ASSIGNED, timer.now(), lnode.id, pnode.id)
+            i = self.position[id(lnode)]
             lnode.pnode = pnode
-            pnode.lnode = lnode
+            pnode.lnodes.append(lnode)
             lnode.schedule_time = timer.now()
             for inp in lnode.input_q:
                 if inp.timestamp == None:
-                    inp.update_time(timer, pnode)
+                    if flows is not None:
+                        flows.start(inp, pnode, i, timer)
+                    else:
+                        inp.update_time(timer, pnode)
             lnode.state = LogicalNodeState.NEED_INPUT
+            self.scheduler.node_assigned(lnode, pnode)
+            heappush(due, i)
+        return due
 
-        for lnode in lnodes:
-            done = True
-            if lnode.state is LogicalNodeState.NEED_INPUT:
-                if (lnode.inputs_present() and all([timer.passed(inp.timestamp) for inp in lnode.input_q])):
-                    if verbose:
-                        print('{} now computing'.format(lnode.id))
-                    if lnode.type is LogicalNodeType.SHUFFLE:
-                        running_time = timer.elapsed_since(lnode.schedule_time)
-                        remaining_computation_time = max(lnode.comp_time - running_time, 0)
-                        lnode.comp_end_time = timer.delta(remaining_computation_time)
-                    else:
-                        lnode.comp_end_time = timer.delta(lnode.comp_time)
-                    lnode.comp_start_time = timer.now()
-                    lnode.state = LogicalNodeState.COMPUTING
-
-            if lnode.state is LogicalNodeState.COMPUTING:
-                if timer.passed(lnode.comp_end_time):
-                    if verbose:
-                        print('{} finished computing'.format(lnode.id))
-                    for node in lnode.out_neighbors:
-                        inp = Input(lnode.output_size, None, lnode.pnode)
-                        if node.pnode is not None:
-                            inp.update_time(timer, node.pnode)
-                        node.input_q.append(inp)
-                    lnode.pnode.lnode = None
-                    lnode.state = LogicalNodeState.COMPLETED
-                    completed_lnodes.append(lnode)
-
-            if lnode.state != LogicalNodeState.COMPLETED:
-                done = False
-
-        if done:
-            if verbose:
-                print('total fails: {}'.format(fail_count))
-            return timer.now()
-
-        failed_nodes = failure(pnodes, timer.elapsed())
-        for pnode in failed_nodes:
-            if pnode.failed:
-                continue
-            if pnode.lnode is not None:
-                for inp in pnode.lnode.input_q:
-                    inp.timestamp = None
-                pnode.lnode.state = LogicalNodeState.FAILED
-                failed_lnodes.append(lnode)
-            pnode.failed = True
-            fail_count += 1
-            if verbose:
-                print('{} failed.'.format(pnode.id))
-                if(pnode.lnode is not None):
-                    print('{} aborted'.format(pnode.lnode.id))
+    def update(self, i, due):
+        '''
+            Function to move the logical node at position `i` on to its next
+            state if it can in the current timestep. Nodes that may change
+            state later in this timestep are pushed onto heap `due`
+        '''
+        timer = self.timer
+        table = self.table
+        lnode = self.lnodes[i]
+
+        if lnode.state is LogicalNodeState.NEED_INPUT:
+            arrival = arrival_time(lnode)
+            if arrival is not None and timer.passed(arrival):
+                self.start(i, lnode)
+            elif table is not None:
+                table.set_arrival(i, arrival)
+            elif arrival is not None:
+                heappush(self.wakeups, (timer.first_passed(arrival), i))
+
+        if lnode.state is LogicalNodeState.COMPUTING:
+            if self.speculation is not None:
+                self.settle_backup(i, lnode)
+            if timer.passed(lnode.comp_end_time):
+                self.complete(i, lnode, due)
+            elif table is None:
+                heappush(self.wakeups, (timer.first_passed(lnode.comp_end_time), i))
+
+    def start(self, i, lnode):
+        '''
+            Function to start computing logical node `lnode` at position `i`,
+            whose inputs all arrived
+        '''
+        timer = self.timer
+        if self.trace is not None:
+            self.trace.record(EventType.COMPUTING, timer.now(), lnode.id, lnode.pnode.id)
+        comp_time = lnode.comp_time
+        if self.options.compute_speeds:
+            comp_time /= compute_speed(lnode.pnode)
+        comp_time += spill_time(lnode, lnode.pnode)
+        if lnode.type is LogicalNodeType.SHUFFLE:
+            running_time = timer.elapsed_since(lnode.schedule_time)
+            remaining_computation_time = max(comp_time - running_time, 0)
+            lnode.comp_end_time = timer.delta(remaining_computation_time)
+        else:
+            lnode.comp_end_time = timer.delta(comp_time)
+        lnode.comp_start_time = timer.now()
+        lnode.state = LogicalNodeState.COMPUTING
+        if self.speculation is not None:
+            self.speculation.started(i, lnode)
 
-        timer.step(len(failed_lnodes) > 0 or len(completed_lnodes) > 0)
+    def settle_backup(self, i, lnode):
+        '''
+            Function to keep the copy of computing logical node `lnode` at
+            position `i` that finished first, if it has a backup, and kill
+            the other one
+        '''
+        speculation = self.speculation
+        backup = speculation.backups.get(i)
+        if backup is None or not self.timer.passed(min(backup.end, lnode.comp_end_time)):
+            return
+        del speculation.backups[i]
+        if backup.end < lnode.comp_end_time:
+            killed = lnode.pnode
+            speculation.won += 1
+            speculation.saved += lnode.comp_end_time - backup.end
+            lnode.pnode = backup.pnode
+            lnode.comp_start_time = backup.start
+            lnode.comp_end_time = backup.end
+        else:
+            killed = backup.pnode
+            speculation.killed += 1
+        killed.lnodes.remove(lnode)
+        if self.trace is not None:
+            self.trace.record(EventType.KILLED, self.timer.now(), lnode.id, killed.id)
+        self.scheduler.pnode_freed(killed)
+
+    def complete(self, i, lnode, due):
+        '''
+            Function to complete logical node `lnode` at position `i`, send its
+            outputs on and free its physical node
+        '''
+        if self.trace is not None:
+            self.trace.record(EventType.FINISHED, self.timer.now(), lnode.id, lnode.pnode.id)
+        self.send_outputs(i, lnode, due)
+        lnode.pnode.lnodes.remove(lnode)
+        lnode.state = LogicalNodeState.COMPLETED
+        self.scheduler.pnode_freed(lnode.pnode)
+        self.scheduler.node_completed(lnode)
+        if self.speculation is not None:
+            self.speculation.completed(lnode, self.lnodes)
+        self.completed_lnodes.append(lnode)
+        self.remaining -= 1
+
+    def send_outputs(self, i, lnode, due):
+        '''
+            Function to send the output of logical node `lnode` at position `i`
+            to its out-neighbors and stage edges, and tell the scheduler about
+            the nodes this makes ready. Receivers after `lnode` whose inputs
+            all arrive right away are pushed onto heap `due`
+        '''
+        timer = self.timer
+        table = self.table
+        flows = self.flows
+        scheduler = self.scheduler
+        position = self.position
+        if self.options.adjacency is not None:
+            targets = self.options.adjacency.out(i)
+            out_neighbors = zip(targets, map(self.lnodes.__getitem__, targets))
+        else:
+            out_neighbors = ((position.get(id(node)), node) for node in lnode.out_neighbors)
+        if lnode.stage_outputs is not None:
+            # Only the targets whose first or last stage input this
+            # is need a look, and their inputs are already sent
+            stage_targets = [(position.get(id(node)), node, False)
+                             for edge in lnode.stage_outputs for node in edge.deliver(lnode, timer)]
+        else:
+            stage_targets = ()
+        output_size = lnode.output_size
+        for j, node, sent in chain(((j, node, True) for j, node in out_neighbors), stage_targets):
+            if sent:
+                # A failed node still points at its failed physical
+                # node; its inputs are sent once it is reassigned
+                target = node.pnode if node.state is not LogicalNodeState.FAILED else None
+                if node.input_summary is not None:
+                    node.input_summary.receive(output_size, lnode.pnode, timer, target)
+                else:
+                    inp = Input(output_size, None, lnode.pnode)
+                    if target is not None and flows is not None and j is not None:
+                        flows.start(inp, target, j, timer)
+                    elif target is not None:
+                        inp.update_time(timer, target)
+                    node.input_q.append(inp)
+            if j is None:
+                continue
+            if table is not None:
+                if sent:
+                    table.input_size[j] += output_size
+                else:
+                    table.input_size[j] = sum(x.size for x in node.input_q)
+            if node.schedulable():
+                scheduler.node_ready(node)
+            if node.state is not LogicalNodeState.NEED_INPUT:
+                continue
+            arrival = arrival_time(node)
+            if table is not None:
+                table.set_arrival(j, arrival)
+            if arrival is None:
+                continue
+            # Nodes after this one still get updated in this timestep
+            wakeup = timer.first_passed(arrival)
+            if j > i and wakeup == timer.now():
+                heappush(due, j)
+            elif table is None:
+                heappush(self.wakeups, (max(wakeup, timer.next()), j))
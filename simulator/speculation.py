@@ -0,0 +1,159 @@
+# Speculative execution, used by simulate(..., speculation=Speculation()).
+#
+# A logical node that has been computing for much longer than the others of
+# its stage (logical nodes of the same type) gets a backup copy on a free
+# physical node. The backup has its inputs sent to it again and computes from
+# scratch; whichever copy finishes first is kept, and the other is killed and
+# its physical node freed. If the physical node of one copy fails, the other
+# carries on alone.
+#
+# Stragglers are spotted from the time a node has been computing only, not
+# from when it will finish: a node is checked once it has been computing for
+# `slowdown` times the median computation time of the completed nodes of its
+# stage, and checked again later if the median has grown in the meantime.
+
+from simulator.nodes import LogicalNode, LogicalNodeState, LogicalNodeType, bandwidth, compute_speed, spill_time
+from heapq import heappush, heappop
+from bisect import insort
+
+# Copy of a logical node computing on another physical node, from `start` to `end`
+class Backup:
+    __slots__ = ('pnode', 'start', 'end')
+
+    def __init__(self, pnode, start, end):
+        self.pnode = pnode
+        self.start = start
+        self.end = end
+
+class Speculation:
+    '''
+        Settings and counts of speculative execution. Backups are launched
+        for logical nodes computing for more than `slowdown` times the median
+        computation time of their stage, once `min_completed` nodes of the
+        stage completed, on the physical node the scheduler's
+        candidate_pnode picks among those left free after assign().
+        Shuffle nodes, which compute while their inputs arrive, and nodes
+        with stage edges or aggregated inputs are not backed up.
+        After a simulation, `launched` counts the backups launched, `won`
+        those that finished first, `killed` those killed because the
+        original finished first, `promoted` those that carried on alone
+        because the physical node of the original failed, and `lost` those
+        whose physical node failed; `saved` is the time by which the backups
+        that won beat the original
+    '''
+    def __init__(self, slowdown=1.5, min_completed=5):
+        self.slowdown = slowdown
+        self.min_completed = min_completed
+        self.reset()
+
+    def reset(self):
+        '''
+            Function to clear the state and counts, before a simulation
+        '''
+        self.launched = 0
+        self.won = 0
+        self.killed = 0
+        self.promoted = 0
+        self.lost = 0
+        self.saved = 0
+        # Backups running, by position of their logical node
+        self.backups = {}
+        # Sorted computation times of the completed nodes of every stage
+        self.durations = {node_type: [] for node_type in LogicalNodeType}
+        # Heap of (time, position, computation start) of nodes to check
+        self.checks = []
+        # Nodes computing before their stage had a median, by stage
+        self.unchecked = {node_type: set() for node_type in LogicalNodeType}
+        # (position, computation start) of stragglers waiting for a free physical node
+        self.candidates = []
+
+    @staticmethod
+    def eligible(lnode: LogicalNode):
+        return (lnode.type is not LogicalNodeType.SHUFFLE and lnode.stage_inputs is None
+                and lnode.input_summary is None)
+
+    # Return the median computation time of the stage, or None if too few
+    # nodes of it completed
+    def median(self, node_type):
+        durations = self.durations[node_type]
+        if len(durations) < max(self.min_completed, 1):
+            return None
+        return durations[len(durations) // 2]
+
+    def started(self, i, lnode: LogicalNode):
+        '''
+            Function to call when the logical node at position `i` starts
+            computing
+        '''
+        if not Speculation.eligible(lnode):
+            return
+        median = self.median(lnode.type)
+        if median is None:
+            self.unchecked[lnode.type].add(i)
+        else:
+            heappush(self.checks, (lnode.comp_start_time + self.slowdown * median, i, lnode.comp_start_time))
+
+    def completed(self, lnode: LogicalNode, lnodes):
+        '''
+            Function to call when a logical node completes, with its final
+            computation start and end times
+        '''
+        if not Speculation.eligible(lnode):
+            return
+        insort(self.durations[lnode.type], lnode.comp_end_time - lnode.comp_start_time)
+        unchecked = self.unchecked[lnode.type]
+        if unchecked and self.median(lnode.type) is not None:
+            for i in sorted(unchecked):
+                if lnodes[i].state is LogicalNodeState.COMPUTING:
+                    self.started(i, lnodes[i])
+            unchecked.clear()
+
+    def next_time(self):
+        '''
+            Function to return the time of the next check, or None
+        '''
+        return self.checks[0][0] if self.checks else None
+
+    def launch(self, lnodes, scheduler, timer, compute_speeds=False):
+        '''
+            Function to check the nodes due and launch backups of the
+            stragglers on free physical nodes. Returns the positions of the
+            logical nodes that got one
+        '''
+        checks = self.checks
+        while checks and timer.passed(checks[0][0]):
+            _, i, start = heappop(checks)
+            lnode = lnodes[i]
+            if lnode.state is not LogicalNodeState.COMPUTING or lnode.comp_start_time != start or i in self.backups:
+                continue
+            due = start + self.slowdown * self.median(lnode.type)
+            if timer.passed(due):
+                self.candidates.append((i, start))
+            else:
+                heappush(checks, (due, i, start))
+
+        launched = []
+        waiting = []
+        for i, start in self.candidates:
+            lnode = lnodes[i]
+            # Skip nodes that finish in this timestep anyway
+            if (lnode.state is not LogicalNodeState.COMPUTING or lnode.comp_start_time != start
+                    or i in self.backups or timer.passed(lnode.comp_end_time)):
+                continue
+            pnode = scheduler.candidate_pnode(lnode) if len(scheduler.free_pnodes) > 0 else None
+            # A free slot next to the original is no use
+            if pnode is None or pnode is lnode.pnode:
+                waiting.append((i, start))
+                continue
+            arrival = max((inp.size * bandwidth(inp.source, pnode) for inp in lnode.input_q), default=0)
+            comp_time = lnode.comp_time
+            if compute_speeds:
+                comp_time /= compute_speed(pnode)
+            comp_time += spill_time(lnode, pnode)
+            self.backups[i] = Backup(pnode, timer.delta(arrival), timer.delta(arrival + comp_time))
+            pnode.lnodes.append(lnode)
+            scheduler.backup_assigned(lnode, pnode)
+            self.launched += 1
+            launched.append(i)
+        self.candidates = waiting
+        return launched
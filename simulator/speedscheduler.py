@@ -0,0 +1,84 @@
+from simulator.nodes import LogicalNode, PhysicalNode, LogicalNodeState, LogicalNodeType, compute_speed
+from simulator.scheduler import Scheduler
+from heapq import heappush, heappop, heapify
+
+class SpeedScheduler(Scheduler):
+    '''
+        Scheduler for physical nodes of different speeds: the ready logical
+        nodes with the highest priority (by default, the largest inputs) go
+        to the free physical nodes with the highest compute power.
+        Both are kept in heaps updated from the notifications; entries are
+        re-checked when popped, so stale ones are fine.
+        Use with simulate(..., compute_speeds=True) so that computation
+        lengths depend on the physical node
+    '''
+    def __init__(self, logical_nodes: list[LogicalNode], physical_nodes: list[PhysicalNode]):
+        super().__init__(logical_nodes, physical_nodes)
+        # Heap of (priority, position) of ready logical nodes. A node is pushed
+        # again whenever it gets new inputs, the entry that comes first wins
+        self.ready_heap = [(self.priority(lnode), self.ready.position[id(lnode)]) for lnode in self.ready]
+        heapify(self.ready_heap)
+        # Heap of (-speed, position) of free physical nodes
+        self.pnode_position = {id(pnode): i for i, pnode in enumerate(physical_nodes)}
+        self.speed_heap = [(-compute_speed(pnode), i) for i, pnode in enumerate(physical_nodes)
+                           if pnode in self.free_pnodes]
+        heapify(self.speed_heap)
+
+    def priority(self, lnode: LogicalNode):
+        '''
+            Function to return the priority of a ready logical node, lowest
+            first. Override to put e.g. critical nodes first
+        '''
+        return -lnode.input_size
+
+    def assign(self):
+        '''
+            Function to assign the ready logical nodes, highest priority
+            first, to the fastest free physical nodes
+        '''
+        scheduled_pairs = []
+        while self.ready_heap and len(self.free_pnodes) > 0:
+            logical_node = self.pop_ready()
+            if logical_node is None:
+                break
+            best_physical_node = self.find_best_physical_node(logical_node)
+            if best_physical_node is None:
+                self.node_ready(logical_node)
+                break
+            scheduled_pairs.append((logical_node, best_physical_node))
+            # Leave no other entry of the node to be popped in this round
+            self.ready.discard(logical_node)
+            self.free_pnodes.take(best_physical_node)
+        return scheduled_pairs
+
+    # Pop the ready logical node with the highest priority, or return None
+    def pop_ready(self):
+        ready_heap = self.ready_heap
+        while ready_heap:
+            lnode = self.logical_nodes[heappop(ready_heap)[1]]
+            if lnode in self.ready:
+                return lnode
+        return None
+
+    def find_best_physical_node(self, logical_node: LogicalNode):
+        '''
+            Function to find the fastest free physical node
+            logical_node: logical node to place
+        '''
+        speed_heap = self.speed_heap
+        while speed_heap and self.physical_nodes[speed_heap[0][1]] not in self.free_pnodes:
+            heappop(speed_heap)
+        if not speed_heap:
+            return None
+        # Left in the heap, for the other free slots of the node
+        return self.physical_nodes[speed_heap[0][1]]
+
+    def node_ready(self, lnode: LogicalNode):
+        super().node_ready(lnode)
+        heappush(self.ready_heap, (self.priority(lnode), self.ready.position[id(lnode)]))
+
+    def pnode_freed(self, pnode: PhysicalNode):
+        was_free = pnode in self.free_pnodes
+        super().pnode_freed(pnode)
+        if not was_free and pnode in self.free_pnodes:
+            heappush(self.speed_heap, (-compute_speed(pnode), self.pnode_position[id(pnode)]))
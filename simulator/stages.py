@@ -0,0 +1,219 @@
+# Stage edges: every logical node of one stage (e.g. all maps) feeds every
+# logical node of another (e.g. all reduces), without a per-pair edge or Input.
+#
+# Instead of M x R Input objects, a StageEdge keeps a few arrays with one entry
+# per target: the bytes received so far, the physical node the target is
+# assigned to and the time by which everything sent to it so far will have
+# arrived. Each target gets a single StageInput in its input queue standing
+# for all of them, so the simulator, schedulers and failure handling treat it
+# like any other input. Arrival times come out exactly as with explicit edges:
+# for inputs sent to an unassigned target, only the largest share sent from
+# each physical node is kept, which is all that is needed to work out their
+# arrival once the target is assigned, whatever the bandwidth between physical
+# nodes. With a partition that sends every target the same size, that is a
+# single number per physical node sources ran on; only partitions returning
+# an array per source need an array per physical node.
+# Bandwidths are worked out when needed from the network model's rack and pod
+# arrays (see TopologyNetwork.multipliers), for all the targets or sources
+# concerned at once, rather than kept per pair of physical nodes.
+#
+# Stage edges are not part of out_neighbors, so schedulers that look at the
+# out-neighbors of completed nodes (like DaskScheduler) do not see them.
+
+from simulator.nodes import LogicalNode, Input, Config, bandwidth
+import numpy as np
+
+# Partition functions take the output size of a source and the number of
+# targets and return the size sent to each target, either one for all of them
+# or an array with one per target
+
+# Send the whole output to every target, as explicit edges do
+def replicate(size, count):
+    return size
+
+# Split the output evenly between the targets
+def split_evenly(size, count):
+    return size / count
+
+class StageEdge:
+    '''
+        Edge from every node of `sources` to every node of `targets`, sending
+        each target the size `partition` assigns it from a source's output
+    '''
+    def __init__(self, sources: list[LogicalNode], targets: list[LogicalNode], partition=replicate):
+        self.sources = list(sources)
+        self.targets = list(targets)
+        self.partition = partition
+        self.delivered = 0
+
+        n = len(self.targets)
+        self.bytes = np.zeros(n)
+        # Physical node each target is assigned to, as an index into
+        # self.pnodes, or -1, and the arrival time of its inputs when assigned
+        self.pnode = np.full(n, -1, dtype=np.int64)
+        self.arrival = np.full(n, np.nan)
+        self.pnodes = []
+        self.pnode_index = {}
+        # Largest share sent to every target from each physical node, by
+        # index, for the shares that were the same for every target, and for
+        # those that were not
+        self.max_share = np.zeros(0)
+        self.max_shares = {}
+        # Network model shared by all the physical nodes seen so far (None for
+        # uniform bandwidth), or self if they do not share one, and their
+        # positions in it, by index
+        self.network = None
+        self.network_positions = np.zeros(0, dtype=np.int64)
+
+        self.inputs = [StageInput(self, row) for row in range(n)]
+        for source in self.sources:
+            if source.stage_outputs is None:
+                source.stage_outputs = []
+            source.stage_outputs.append(self)
+        for target, inp in zip(self.targets, self.inputs):
+            if target.stage_inputs is None:
+                target.stage_inputs = []
+            target.stage_inputs.append(inp)
+
+    def complete(self):
+        return self.delivered == len(self.sources)
+
+    def bind(self, pnodes):
+        '''
+            Index all of `pnodes` up front, so bandwidths are looked up once
+            per pair of physical nodes
+        '''
+        for pnode in pnodes:
+            self.index(pnode)
+
+    def index(self, pnode):
+        index = self.pnode_index.get(id(pnode))
+        if index is None:
+            index = self.pnode_index[id(pnode)] = len(self.pnodes)
+            self.pnodes.append(pnode)
+            if len(self.pnodes) == 1:
+                self.network = pnode.network
+            elif pnode.network is not self.network:
+                self.network = self
+            if index == len(self.max_share):
+                # Grow the arrays by physical node geometrically
+                size = max(2 * index, 16)
+                self.max_share = np.concatenate([self.max_share, np.zeros(size - index)])
+                self.network_positions = np.concatenate([self.network_positions, np.full(size - index, -1, dtype=np.int64)])
+            if self.network is not None and self.network is not self:
+                self.network_positions[index] = self.network.position[id(pnode)]
+        return index
+
+    # Return the bandwidth multipliers from the physical node at index `k` to
+    # those at indices `others`, or to it from them if not `outgoing`
+    def multipliers(self, k, others, outgoing=True):
+        if self.network is None:
+            row = np.full(len(others), float(Config.BANDWIDTH_MULTIPLIER))
+            row[others == k] = 0
+            return row
+        if self.network is not self:
+            # Transfers between physical nodes take as long both ways
+            return self.network.multipliers(self.pnodes[k], self.network_positions[others])
+        pnode = self.pnodes[k]
+        if outgoing:
+            return np.array([bandwidth(pnode, self.pnodes[i]) for i in others.tolist()], dtype=float)
+        return np.array([bandwidth(self.pnodes[i], pnode) for i in others.tolist()], dtype=float)
+
+    def deliver(self, source: LogicalNode, timer):
+        '''
+            Send the output of `source`, which just completed, to every target.
+            Returns the targets whose inputs changed in a way the simulator
+            needs to look at (their first input, or their last), else ()
+        '''
+        share = self.partition(source.output_size, len(self.targets))
+        k = self.index(source.pnode)
+        first = self.delivered == 0
+        self.delivered += 1
+
+        self.bytes += share
+        if np.ndim(share) > 0:
+            max_share = self.max_shares.get(k)
+            if max_share is None:
+                max_share = self.max_shares[k] = np.zeros(len(self.targets))
+            np.maximum(max_share, share, out=max_share)
+        else:
+            self.max_share[k] = max(self.max_share[k], share)
+
+        assigned = np.flatnonzero(self.pnode >= 0)
+        if len(assigned) > 0:
+            shares = share[assigned] if np.ndim(share) > 0 else share
+            sent = timer.now() + shares * self.multipliers(k, self.pnode[assigned])
+            self.arrival[assigned] = np.maximum(self.arrival[assigned], sent)
+
+        if first:
+            for target, inp in zip(self.targets, self.inputs):
+                target.input_q.append(inp)
+            return self.targets
+        if self.complete():
+            return self.targets
+        return ()
+
+    # The target at `row` was assigned to `pnode` at the current time: every
+    # input sent to it so far starts making its way there now
+    def assign(self, row, timer, pnode):
+        p = self.index(pnode)
+        self.pnode[row] = p
+        latest = 0
+        sources = np.flatnonzero(self.max_share[:len(self.pnodes)] > 0)
+        if len(sources) > 0:
+            latest = (self.max_share[sources] * self.multipliers(p, sources, outgoing=False)).max()
+        for k, max_share in self.max_shares.items():
+            if max_share[row] > 0:
+                latest = max(latest, max_share[row] * self.multipliers(k, np.array([p]))[0])
+        self.arrival[row] = timer.delta(float(latest))
+
+    # The target at `row` lost its physical node
+    def unassign(self, row):
+        self.pnode[row] = -1
+        self.arrival[row] = np.nan
+
+class StageInput(Input):
+    '''
+        The inputs of one target of a StageEdge, seen as a single Input: its
+        size is the total received so far, and its timestamp the time by which
+        all of it will have arrived (None while the target is unassigned)
+    '''
+    __slots__ = ('edge', 'row')
+
+    def __init__(self, edge, row):
+        self.edge = edge
+        self.row = row
+
+    def complete(self):
+        return self.edge.complete()
+
+    @property
+    def size(self):
+        return float(self.edge.bytes[self.row])
+
+    @property
+    def source(self):
+        return None
+
+    @property
+    def timestamp(self):
+        if self.edge.pnode[self.row] < 0:
+            return None
+        return float(self.edge.arrival[self.row])
+
+    @timestamp.setter
+    def timestamp(self, timestamp):
+        if timestamp is not None:
+            raise ValueError('The timestamp of a StageInput can only be reset to None')
+        self.edge.unassign(self.row)
+
+    def update_time(self, timer, pnode):
+        self.edge.assign(self.row, timer, pnode)
+
+def connect_stages(sources: list[LogicalNode], targets: list[LogicalNode], partition=replicate):
+    '''
+        Function to make every node of `sources` feed every node of `targets`
+        partition: function of (output size, number of targets) returning the
+            size each target gets, see replicate and split_evenly
+    '''
+    return StageEdge(sources, targets, partition)
@@ -0,0 +1,263 @@
+# State the simulator keeps up to date incrementally as the simulation runs,
+# so that neither it nor the schedulers have to rescan every node each
+# timestep.
+
+from simulator.nodes import LogicalNode, PhysicalNode, LogicalNodeType
+from heapq import heappush, heappop, merge
+
+# Logical nodes of a single type, iterated in order of their position in the
+# simulated list of logical nodes. Removals are lazy: removed positions are
+# skipped while iterating and compacted away once they pile up
+class _ReadyBucket:
+    def __init__(self):
+        self.members = {}
+        self.order = []
+        self.added = []
+        self.listed = set()
+
+    def add(self, position, lnode):
+        self.members[position] = lnode
+        if position not in self.listed:
+            self.listed.add(position)
+            self.added.append(position)
+
+    def discard(self, position):
+        self.members.pop(position, None)
+
+    def positions(self):
+        if self.added:
+            self.order.extend(self.added)
+            self.order.sort()
+            self.added.clear()
+        if len(self.order) > 2 * len(self.members) + 64:
+            self.order = [p for p in self.order if p in self.members]
+            self.listed = set(self.order)
+        return self.order
+
+    def items(self):
+        members = self.members
+        for position in self.positions():
+            lnode = members.get(position)
+            if lnode is not None:
+                yield position, lnode
+
+    def __iter__(self):
+        for _, lnode in self.items():
+            yield lnode
+
+class ReadySet:
+    '''
+        Set of the logical nodes that can currently be scheduled (see
+        LogicalNode.schedulable), updated by the simulator whenever a node gets
+        a new input, is assigned, or has its physical node fail.
+        Iterating yields the nodes in the order of the `lnodes` list given to
+        the constructor, so schedulers see them in the same order as before
+    '''
+    def __init__(self, lnodes: list[LogicalNode]):
+        self.position = {id(lnode): i for i, lnode in enumerate(lnodes)}
+        self.buckets = {node_type: _ReadyBucket() for node_type in LogicalNodeType}
+        self.count = 0
+        for lnode in lnodes:
+            if lnode.schedulable():
+                self.add(lnode)
+
+    def add(self, lnode: LogicalNode):
+        bucket = self.buckets[lnode.type]
+        position = self.position[id(lnode)]
+        if position not in bucket.members:
+            self.count += 1
+        bucket.add(position, lnode)
+
+    def discard(self, lnode: LogicalNode):
+        bucket = self.buckets[lnode.type]
+        position = self.position[id(lnode)]
+        if position in bucket.members:
+            self.count -= 1
+            bucket.discard(position)
+
+    def of_type(self, node_type: LogicalNodeType):
+        '''
+            Iterate over the ready logical nodes of type `node_type`
+        '''
+        return iter(self.buckets[node_type])
+
+    def __contains__(self, lnode: LogicalNode):
+        position = self.position.get(id(lnode))
+        return position is not None and position in self.buckets[lnode.type].members
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        buckets = [bucket for bucket in self.buckets.values() if bucket.members]
+        if len(buckets) == 1:
+            return iter(buckets[0])
+        # Merge lazily so that callers that stop early only pay for what they use
+        return (lnode for _, lnode in merge(*[bucket.items() for bucket in buckets], key=lambda item: item[0]))
+
+class PhysicalNodePool:
+    '''
+        Pool of the physical nodes that can currently be assigned a logical
+        node (see PhysicalNode.schedulable), with how many free slots each
+        has left, updated by the simulator whenever a physical node is
+        assigned, freed, or fails.
+        Free nodes are handed out in the order of the `pnodes` list given to
+        the constructor, lowest position first
+    '''
+    def __init__(self, pnodes: list[PhysicalNode]):
+        self.pnodes = pnodes
+        self.position = {id(pnode): i for i, pnode in enumerate(pnodes)}
+        # Position -> free slots, for the physical nodes with any
+        self.free = {i: pnode.free_slots() for i, pnode in enumerate(pnodes) if pnode.schedulable()}
+        self.heap = sorted(self.free)
+
+    def first(self):
+        '''
+            Return the free physical node with the lowest position without
+            taking it out of the pool, or None if there is none
+        '''
+        heap = self.heap
+        while heap and heap[0] not in self.free:
+            heappop(heap)
+        return self.pnodes[heap[0]] if heap else None
+
+    def take(self, pnode: PhysicalNode):
+        '''
+            Take a slot of a physical node, and the node out of the pool once
+            it has no free slot left
+        '''
+        position = self.position[id(pnode)]
+        slots = self.free.get(position)
+        if slots is None:
+            return
+        if slots > 1:
+            self.free[position] = slots - 1
+        else:
+            del self.free[position]
+
+    def discard(self, pnode: PhysicalNode):
+        '''
+            Take a physical node out of the pool, whatever slots it has left
+        '''
+        self.free.pop(self.position[id(pnode)], None)
+
+    def release(self, pnode: PhysicalNode):
+        '''
+            Put a physical node back into the pool with the slots it has free,
+            if it can be scheduled, or take it out otherwise
+        '''
+        position = self.position[id(pnode)]
+        if not pnode.schedulable():
+            self.free.pop(position, None)
+            return
+        if position not in self.free:
+            heappush(self.heap, position)
+        self.free[position] = pnode.free_slots()
+        # Positions taken and released without a first() in between leave
+        # stale duplicates behind; rebuild once they pile up
+        if len(self.heap) > 2 * len(self.free) + 64:
+            self.heap = sorted(self.free)
+
+    def slots(self, pnode: PhysicalNode):
+        '''
+            Return the number of free slots of a physical node in the pool
+        '''
+        return self.free.get(self.position[id(pnode)], 0)
+
+    def __contains__(self, pnode: PhysicalNode):
+        position = self.position.get(id(pnode))
+        return position is not None and position in self.free
+
+    def __len__(self):
+        return len(self.free)
+
+    def __iter__(self):
+        return iter([self.pnodes[i] for i in sorted(self.free)])
+
+class InputLocality:
+    '''
+        Where the inputs of the ready logical nodes are: for every physical
+        node, the total size of the pending inputs it produced (see
+        Input.source), and for every logical node added, the size of its
+        inputs from each physical node. Inputs from outside or from stage
+        edges are not counted.
+        Logical nodes are added again whenever they get new inputs; only the
+        inputs not seen yet are counted, so a node receiving n inputs one by
+        one costs O(n) in total
+    '''
+    def __init__(self, pnodes: list[PhysicalNode]):
+        self.position = {id(pnode): i for i, pnode in enumerate(pnodes)}
+        self.held = [0] * len(pnodes)
+        # id(lnode) -> [inputs counted, {pnode position: size}, ranking or None]
+        self.sources = {}
+
+    def add(self, lnode: LogicalNode):
+        '''
+            Count the inputs of a logical node not counted yet
+        '''
+        entry = self.sources.get(id(lnode))
+        if entry is None or entry[0] > len(lnode.input_q):
+            self.discard(lnode)
+            entry = self.sources[id(lnode)] = [0, {}, None]
+        inputs = lnode.input_q
+        if entry[0] == len(inputs):
+            return
+        sizes = entry[1]
+        position = self.position
+        held = self.held
+        for k in range(entry[0], len(inputs)):
+            inp = inputs[k]
+            i = position.get(id(inp.source)) if inp.source is not None else None
+            if i is not None and inp.size:
+                sizes[i] = sizes.get(i, 0) + inp.size
+                held[i] += inp.size
+        entry[0] = len(inputs)
+        entry[2] = None
+
+    def discard(self, lnode: LogicalNode):
+        '''
+            Stop counting the inputs of a logical node (it was assigned)
+        '''
+        entry = self.sources.pop(id(lnode), None)
+        if entry is not None:
+            held = self.held
+            for i, size in entry[1].items():
+                held[i] -= size
+
+    def held_by(self, pnode: PhysicalNode):
+        '''
+            Return the total size of the pending inputs produced by the
+            physical node
+        '''
+        return self.held[self.position[id(pnode)]]
+
+    def ranked(self, lnode: LogicalNode):
+        '''
+            Return the (size, physical node position) pairs of the inputs of
+            the logical node, largest first
+        '''
+        entry = self.sources.get(id(lnode))
+        if entry is None:
+            return []
+        if entry[2] is None:
+            entry[2] = InputLocality.rank(entry[1])
+        return entry[2]
+
+    def ranked_inputs(self, lnode: LogicalNode):
+        '''
+            Return the same pairs as ranked, worked out from the inputs of a
+            logical node whether it is counted or not (e.g. one computing),
+            without counting it
+        '''
+        sizes = {}
+        position = self.position
+        for inp in lnode.input_q:
+            i = position.get(id(inp.source)) if inp.source is not None else None
+            if i is not None and inp.size:
+                sizes[i] = sizes.get(i, 0) + inp.size
+        return InputLocality.rank(sizes)
+
+    # Return the (size, position) pairs of `sizes`, largest first
+    @staticmethod
+    def rank(sizes):
+        return sorted(((size, i) for i, size in sizes.items()), key=lambda pair: (-pair[0], pair[1]))
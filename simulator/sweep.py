@@ -0,0 +1,91 @@
+# Sweeps simulations over a set of points, each combining Config fields with
+# parameters of the graph (e.g. the number of physical nodes), for every given
+# scheduler, and collects the total times into a results table.
+#
+# Config is global to a process, so every run applies its own point's Config
+# fields (starting from the defaults) in the process that runs it and puts
+# back the Config it found afterwards; no run sees another's settings, and the
+# sweeping process's Config is never changed, even with workers=1. As with montecarlo.run_replicas,
+# `build_graph` must be a module-level function so it can be sent to workers.
+
+from simulator.nodes import Config
+from simulator.montecarlo import run_replica
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import itertools
+import random
+import csv
+import os
+
+# Return every combination of the values of the given axes, e.g.
+# grid(FAILURE_PROBABILITY=[0, 0.001], num_pnodes=[10, 100]) has 4 points
+def grid(**axes):
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+# Return `count` points drawn at random from the given axes. An axis is either
+# a list of values to pick from, or a function taking a random.Random and
+# returning a value (e.g. lambda rng: rng.uniform(0, 0.01))
+def random_points(count, seed=0, **axes):
+    rng = random.Random(seed)
+    points = []
+    for i in range(count):
+        point = {}
+        for name, axis in axes.items():
+            point[name] = axis(rng) if callable(axis) else rng.choice(axis)
+        points.append(point)
+    return points
+
+# Split a point into its Config fields and the keyword arguments of build_graph
+def split_point(point):
+    fields = Config.fields()
+    config = {name: value for name, value in point.items() if name in fields}
+    graph_args = {name: value for name, value in point.items() if name not in fields}
+    return config, graph_args
+
+def run_sweep(build_graph, points, schedulers, replicas=1, seed=0, workers=None, output=None, **simulate_args):
+    '''
+        Function to simulate every point with every scheduler in parallel
+        build_graph: picklable function returning (logical nodes, physical nodes);
+            keys of a point that are not Config fields are passed to it
+        points: list of dicts, e.g. from grid or random_points
+        schedulers: list of scheduler classes
+        replicas: number of runs of each point and scheduler, seeded seed, seed + 1, ...
+        workers: number of worker processes (default: one per core); 1 runs in this process
+        output: optional path of a CSV file to write the results table to
+        simulate_args: extra keyword arguments for simulate
+        Returns the results table as a list of rows, one per run, each a dict
+        of the point with 'scheduler', 'seed' and 'total_time' added
+    '''
+    rows = []
+    jobs = []
+    for point in points:
+        config, graph_args = split_point(point)
+        for scheduler_class in schedulers:
+            for i in range(replicas):
+                rows.append(dict(point, scheduler=scheduler_class.__name__, seed=seed + i))
+                jobs.append((partial(build_graph, **graph_args), scheduler_class, config, seed + i, simulate_args))
+
+    workers = workers if workers is not None else os.cpu_count()
+    if workers == 1:
+        times = [run_replica(job) for job in jobs]
+    else:
+        chunksize = max(1, len(jobs) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            times = list(pool.map(run_replica, jobs, chunksize=chunksize))
+
+    for row, total_time in zip(rows, times):
+        row['total_time'] = total_time
+    if output is not None:
+        write_table(rows, output)
+    return rows
+
+# Write the rows of a results table to a CSV file
+def write_table(rows, path):
+    columns = []
+    for row in rows:
+        columns.extend(name for name in row if name not in columns)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -1,12 +1,36 @@
+import math
+
 # Implemented as a class for cross-file imports (and so it can be abstracted)
+# A `continuous` timer keeps exact (float) times instead of whole timesteps
 class Timer:
-    def __init__(self):
+    def __init__(self, continuous=False):
         self.time = 0
+        self.last_time = 0
+        self.continuous = continuous
 
     # Step forward in time - if `single`, then require the step be a single
-    # step (helpful to ensure something, like scheduling, happens right away)
-    def step(self, single):
-        self.time += 1
+    # step (helpful to ensure something, like scheduling, happens right away).
+    # Otherwise jump straight to `until` (the next time anything can happen)
+    # when it is given, or fall back to a single step.
+    # In continuous time, a single step stays at the current time, so that
+    # whatever has to happen right away happens at the same instant, and
+    # jumping to `until` lands on it exactly
+    def step(self, single, until=None):
+        self.last_time = self.time
+        if self.continuous:
+            if single:
+                return
+            if until is not None:
+                self.time = max(until, self.time)
+                return
+        if single or until is None:
+            self.time += 1
+        else:
+            self.time = max(until, self.time + 1)
+
+    # Return the earliest time the next step can land on
+    def next(self):
+        return self.time if self.continuous else self.time + 1
 
     # Return the current timestamp plus `delta` time
     def delta(self, delta):
@@ -20,6 +44,12 @@ class Timer:
     def passed(self, time):
         return time <= self.time
 
+    # Return the first timestep at which `time` will have passed
+    def first_passed(self, time):
+        if self.continuous:
+            return max(time, self.time)
+        return max(math.ceil(time), self.time)
+
     # Return the time elapsed since `time`, or 0 if that time has yet to occur
     def elapsed_since(self, time):
         if self.passed(time):
@@ -28,4 +58,4 @@ class Timer:
 
     # Return the time elapsed since the last call to step
     def elapsed(self):
-        return 1
+        return self.time - self.last_time
@@ -0,0 +1,220 @@
+# Structured trace of what happens during a simulation. The simulator records
+# typed events (a timestep starting, a physical node failing, a logical node
+# being assigned, starting or finishing its computation, a backup copy of it
+# being launched or killed, the simulation ending) into a Trace, which buffers them and hands them in batches to any
+# number of writers: JSON lines, a compact binary format, or the old
+# human-readable printout. Traces written to files can be streamed back one
+# event at a time with read_trace.
+#
+# Tracing is off unless a Trace is passed to simulate (or verbose is set); the
+# simulator then only pays for one `is not None` check per event site.
+
+from collections import namedtuple
+from enum import Enum
+import json
+import struct
+
+class EventType(Enum):
+    TIME = 1
+    FAILED = 2
+    ABORTED = 3
+    ASSIGNED = 4
+    COMPUTING = 5
+    FINISHED = 6
+    DONE = 7
+    BACKUP = 8
+    KILLED = 9
+
+# `lnode` and `pnode` are the ids of the nodes involved, or None
+Event = namedtuple('Event', ['type', 'time', 'lnode', 'pnode'])
+
+class Trace:
+    '''
+        Buffer of trace events, flushed to every writer once `buffer_size`
+        events have been recorded, on flush(), and on close(). Can be used as
+        a context manager to close it (and its writers) at the end
+    '''
+    def __init__(self, *writers, buffer_size=4096):
+        self.writers = list(writers)
+        self.buffer_size = buffer_size
+        self.events = []
+
+    def record(self, event_type, time, lnode=None, pnode=None):
+        self.events.append(Event(event_type, time, lnode, pnode))
+        if len(self.events) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.events:
+            for writer in self.writers:
+                writer.write(self.events)
+            self.events = []
+
+    def close(self):
+        self.flush()
+        for writer in self.writers:
+            writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+# Writers take batches of events in write(events) and release what they hold
+# in close(). The file writers below take an open file or a path; they only
+# close files they opened themselves
+
+class ListWriter:
+    '''
+        Writer that keeps every event in `events`, e.g. for tests
+    '''
+    def __init__(self):
+        self.events = []
+
+    def write(self, events):
+        self.events.extend(events)
+
+    def close(self):
+        pass
+
+class PrintWriter:
+    '''
+        Writer that prints events the way simulate(verbose=True) always has
+    '''
+    def __init__(self):
+        self.fail_count = 0
+
+    def write(self, events):
+        lines = []
+        for event in events:
+            if event.type is EventType.TIME:
+                lines.append('Current time: {}'.format(event.time))
+            elif event.type is EventType.FAILED:
+                self.fail_count += 1
+                lines.append('{} failed.'.format(event.pnode))
+            elif event.type is EventType.ABORTED:
+                lines.append('{} aborted'.format(event.lnode))
+            elif event.type is EventType.ASSIGNED:
+                lines.append('Assigned {} to {}; now waiting'.format(event.lnode, event.pnode))
+            elif event.type is EventType.COMPUTING:
+                lines.append('{} now computing'.format(event.lnode))
+            elif event.type is EventType.FINISHED:
+                lines.append('{} finished computing'.format(event.lnode))
+            elif event.type is EventType.BACKUP:
+                lines.append('Launched a backup of {} on {}'.format(event.lnode, event.pnode))
+            elif event.type is EventType.KILLED:
+                lines.append('Killed the copy of {} on {}'.format(event.lnode, event.pnode))
+            elif event.type is EventType.DONE:
+                lines.append('total fails: {}'.format(self.fail_count))
+        print('\n'.join(lines))
+
+    def close(self):
+        pass
+
+class _FileWriter:
+    mode = 'w'
+
+    def __init__(self, file):
+        self.owned = isinstance(file, str)
+        self.file = open(file, self.mode) if self.owned else file
+
+    def close(self):
+        if self.owned:
+            self.file.close()
+        else:
+            self.file.flush()
+
+class JSONLWriter(_FileWriter):
+    '''
+        Writer of one JSON object per line, e.g.
+        {"type": "ASSIGNED", "time": 3, "lnode": "map_0", "pnode": "pnode_1"},
+        leaving out nodes that are None
+    '''
+    def write(self, events):
+        lines = []
+        for event in events:
+            record = {'type': event.type.name, 'time': event.time}
+            if event.lnode is not None:
+                record['lnode'] = event.lnode
+            if event.pnode is not None:
+                record['pnode'] = event.pnode
+            lines.append(json.dumps(record))
+        self.file.write('\n'.join(lines) + '\n')
+
+# The binary format starts with MAGIC, followed by one record per event: the
+# event type (1 byte), the time (8 byte double) and the lnode and pnode ids as
+# 4-byte indices into a table of names. Index 0 means None; the first time a
+# name is used, its record is preceded by a definition of the name (type 0,
+# 2-byte length and its UTF-8 bytes)
+MAGIC = b'SIMTRACE1\n'
+_RECORD = struct.Struct('<BdII')
+_NAME = struct.Struct('<BH')
+
+class BinaryWriter(_FileWriter):
+    '''
+        Writer of the compact binary format described above
+    '''
+    mode = 'wb'
+
+    def __init__(self, file):
+        super().__init__(file)
+        self.names = {None: 0}
+        self.file.write(MAGIC)
+
+    def name_index(self, name, chunks):
+        index = self.names.get(name)
+        if index is None:
+            index = self.names[name] = len(self.names)
+            data = name.encode()
+            chunks.append(_NAME.pack(0, len(data)))
+            chunks.append(data)
+        return index
+
+    def write(self, events):
+        chunks = []
+        for event in events:
+            lnode = self.name_index(event.lnode, chunks)
+            pnode = self.name_index(event.pnode, chunks)
+            chunks.append(_RECORD.pack(event.type.value, event.time, lnode, pnode))
+        self.file.write(b''.join(chunks))
+
+# Return the time as read back from a file, as an int if it is a whole number
+def _time(time):
+    return int(time) if time == int(time) else time
+
+def read_jsonl(path):
+    '''
+        Generator of the events in a JSON lines trace
+    '''
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            yield Event(EventType[record['type']], record['time'], record.get('lnode'), record.get('pnode'))
+
+def read_binary(path):
+    '''
+        Generator of the events in a binary trace
+    '''
+    names = [None]
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError('{} is not a binary trace'.format(path))
+        while True:
+            kind = f.read(1)
+            if not kind:
+                return
+            if kind[0] == 0:
+                length, = struct.unpack('<H', f.read(2))
+                names.append(f.read(length).decode())
+                continue
+            time, lnode, pnode = struct.unpack('<dII', f.read(_RECORD.size - 1))
+            yield Event(EventType(kind[0]), _time(time), names[lnode], names[pnode])
+
+def read_trace(path):
+    '''
+        Generator of the events in a trace written by JSONLWriter or BinaryWriter
+    '''
+    with open(path, 'rb') as f:
+        binary = f.read(len(MAGIC)) == MAGIC
+    return read_binary(path) if binary else read_jsonl(path)
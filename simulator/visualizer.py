@@ -13,6 +13,7 @@ from simplequeuescheduler import SimpleQueueScheduler
 from mrscheduler import MRScheduler
 from nodes import LogicalNode, PhysicalNode, Input, LogicalNodeState, LogicalNodeType, MapNode, ReduceNode, ShuffleNode, failure
 from timer import Timer
+from tracing import Trace, PrintWriter, EventType
 import logging
 import random
 import numpy as np
@@ -21,16 +22,16 @@ import networkx as nx
 from matplotlib.animation import FuncAnimation
 
 
-def iterate(timer, lnodes, pnodes, scheduler_class, verbose=True):
+def iterate(timer, lnodes, pnodes, scheduler_class, trace=None):
     done_ = False
-    if verbose:
-        print('Current time: {}'.format(timer.now()))
+    if trace is not None:
+        trace.record(EventType.TIME, timer.now())
     node_assignments = scheduler_class.schedule(lnodes, pnodes)
     for lnode, pnode in node_assignments:
         assert lnode.schedulable()
         assert pnode.schedulable()
-        if verbose:
-            print('Assigned {} to {}; now waiting'.format(lnode.id, pnode.id))
+        if trace is not None:
+            trace.record(EventType.ASSIGNED, timer.now(), lnode.id, pnode.id)
         lnode.pnode = pnode
         pnode.lnode = lnode
         lnode.schedule_time = timer.now()
@@ -43,8 +44,8 @@ def iterate(timer, lnodes, pnodes, scheduler_class, verbose=True):
         done = True
         if lnode.state is LogicalNodeState.NEED_INPUT:
             if (lnode.inputs_present() and all([timer.passed(inp.timestamp) for inp in lnode.input_q])):
-                if verbose:
-                    print('{} now computing'.format(lnode.id))
+                if trace is not None:
+                    trace.record(EventType.COMPUTING, timer.now(), lnode.id, lnode.pnode.id)
                 if lnode.type is LogicalNodeType.SHUFFLE:
                     running_time = timer.elapsed_since(lnode.schedule_time)
                     remaining_computation_time = max(lnode.comp_time - running_time, 0)
@@ -56,8 +57,8 @@ def iterate(timer, lnodes, pnodes, scheduler_class, verbose=True):
 
         if lnode.state is LogicalNodeState.COMPUTING:
             if timer.passed(lnode.comp_end_time):
-                if verbose:
-                    print('{} finished computing'.format(lnode.id))
+                if trace is not None:
+                    trace.record(EventType.FINISHED, timer.now(), lnode.id, lnode.pnode.id)
                 for node in lnode.out_neighbors:
                     inp = Input(lnode.output_size, None, lnode.pnode)
                     if node.pnode is not None:
@@ -77,6 +78,8 @@ def iterate(timer, lnodes, pnodes, scheduler_class, verbose=True):
 
     failed_nodes = failure(pnodes)
     for pnode in failed_nodes:
+        if trace is not None:
+            trace.record(EventType.FAILED, timer.now(), pnode=pnode.id)
         if pnode.lnode is not None:
             for inp in pnode.lnode.input_q:
                 inp.timestamp = None
@@ -87,13 +90,15 @@ def iterate(timer, lnodes, pnodes, scheduler_class, verbose=True):
     return timer.now(), done_
 
 
-def simulate(lnodes, pnodes, scheduler_class, verbose=True):
+def simulate(lnodes, pnodes, scheduler_class, verbose=True, trace=None):
+    if verbose:
+        trace = Trace(PrintWriter(), *(trace.writers if trace is not None else []))
     timer = Timer()
     done_ = False
     node_colors = [[] for node in pnodes]
     time_steps = 0
     while not done_:
-        time, done_ = iterate(timer, lnodes, pnodes, scheduler_class, verbose=True)
+        time, done_ = iterate(timer, lnodes, pnodes, scheduler_class, trace)
         for i, node in enumerate(pnodes):
             if node.lnode:
                 state = node.lnode.state
@@ -104,6 +109,8 @@ def simulate(lnodes, pnodes, scheduler_class, verbose=True):
                 node_colors[i].append(0)
         time_steps += 1
 
+    if trace is not None:
+        trace.flush()
     return node_colors, time_steps
 
 
@@ -1,12 +1,14 @@
 from simulator.nodes import *
+from simulator.stages import connect_stages
 
 class MRHelperFunctions:
     @staticmethod
-    def create_map_reduce_graph(num_map_nodes, input_map_sizes, num_reduce_nodes):
+    def create_map_reduce_graph(num_map_nodes, input_map_sizes, num_reduce_nodes, stage_edges=False):
         '''
             Function to create map-reduce graph
             num_map_nodes: number of map nodes
             num_reduce_nodes: number of reduce nodes
+            stage_edges: connect the stages with stage edges instead of an edge per pair of nodes
         '''
         # creating map nodes
         map_nodes = MRHelperFunctions.create_map_nodes(num_map_nodes, input_map_sizes)
@@ -14,6 +16,13 @@ class MRHelperFunctions:
         # creating shuffle node
         shuffle_node = ShuffleNode(output_length=MRHelperFunctions.shuffle_output_length)
 
+        if stage_edges:
+            reduce_nodes = MRHelperFunctions.create_reduce_nodes(num_reduce_nodes)
+            connect_stages(map_nodes, [shuffle_node])
+            connect_stages(map_nodes, reduce_nodes)
+            connect_stages([shuffle_node], reduce_nodes)
+            return map_nodes, shuffle_node, reduce_nodes
+
         # connect map nodes to shuffle node
         for map_node in map_nodes:
             map_node.out_neighbors.append(shuffle_node)
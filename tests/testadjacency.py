@@ -0,0 +1,92 @@
+import unittest
+from simulator.nodes import Config, MapNode, ReduceNode, Input
+from simulator.adjacency import Adjacency, AdjacencyBuilder
+from simulator.simulator import simulate
+from simulator.mrscheduler import MRScheduler
+from simulator.daskscheduler import DaskScheduler
+from tests.mrhelperfunctions import MRHelperFunctions
+
+def build_map_reduce_graph(num_map_nodes=12, num_reduce_nodes=3, num_physical_nodes=4):
+    map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(num_map_nodes, list(range(1, num_map_nodes + 1)), num_reduce_nodes)
+    physical_nodes = MRHelperFunctions.create_physical_nodes(
+        num_physical_nodes,
+        [1]*num_physical_nodes,
+        [1]*num_physical_nodes,
+        [1]*num_physical_nodes)
+    return map_nodes + [shuffle_node] + reduce_nodes, physical_nodes
+
+class TestAdjacency(unittest.TestCase):
+
+    def setUp(self):
+        Config.FAILURE_PROBABILITY = 0
+        Config.STRAGGLER_PROBABILITY = 0
+
+    def tearDown(self):
+        Config.reset()
+
+    def test_from_lnodes(self):
+        '''
+            Function to test that the adjacency matches the neighbor lists, in order
+        '''
+        logical_nodes, physical_nodes = build_map_reduce_graph()
+        position = {id(lnode): i for i, lnode in enumerate(logical_nodes)}
+        adjacency = Adjacency.from_lnodes(logical_nodes)
+
+        self.assertEqual(adjacency.nedges, sum(len(lnode.out_neighbors) for lnode in logical_nodes))
+        self.assertEqual(adjacency.indices.itemsize, 4)
+        for i, lnode in enumerate(logical_nodes):
+            self.assertEqual(adjacency.out(i), [position[id(node)] for node in lnode.out_neighbors])
+            self.assertEqual(sorted(adjacency.ins(i)), sorted(position[id(node)] for node in lnode.in_neighbors))
+
+        with self.assertRaises(ValueError):
+            Adjacency.from_lnodes(logical_nodes[:-1])
+
+    def test_simulate(self):
+        '''
+            Function to test that simulating with an adjacency, attached or not, gives the same times
+        '''
+        for scheduler_class in [MRScheduler, DaskScheduler]:
+            logical_nodes, physical_nodes = build_map_reduce_graph()
+            expected = simulate(logical_nodes, physical_nodes, scheduler_class, verbose=False)
+            end_times = [lnode.comp_end_time for lnode in logical_nodes]
+
+            logical_nodes, physical_nodes = build_map_reduce_graph()
+            adjacency = Adjacency.from_lnodes(logical_nodes)
+            self.assertEqual(simulate(logical_nodes, physical_nodes, scheduler_class, verbose=False, adjacency=adjacency), expected)
+            self.assertEqual([lnode.comp_end_time for lnode in logical_nodes], end_times)
+
+            logical_nodes, physical_nodes = build_map_reduce_graph()
+            adjacency = Adjacency.from_lnodes(logical_nodes)
+            adjacency.attach(logical_nodes)
+            self.assertEqual(simulate(logical_nodes, physical_nodes, scheduler_class, verbose=False, adjacency=adjacency), expected)
+            self.assertEqual([lnode.comp_end_time for lnode in logical_nodes], end_times)
+
+    def test_builder(self):
+        '''
+            Function to test building a graph from edges instead of neighbor lists
+        '''
+        num_map_nodes = 50
+        map_nodes = [MapNode(input_q=[Input(1, None, None)]) for i in range(num_map_nodes)]
+        reduce_nodes = [ReduceNode(), ReduceNode()]
+        logical_nodes = map_nodes + reduce_nodes
+
+        builder = AdjacencyBuilder(len(logical_nodes))
+        builder.connect_all(range(num_map_nodes), [num_map_nodes])
+        builder.add_edge(0, num_map_nodes + 1)
+        adjacency = builder.build()
+        adjacency.attach(logical_nodes)
+
+        self.assertEqual(adjacency.nedges, num_map_nodes + 1)
+        self.assertEqual(reduce_nodes[0].ninputs, num_map_nodes)
+        self.assertEqual(reduce_nodes[1].ninputs, 1)
+        self.assertEqual(list(map_nodes[0].out_neighbors), reduce_nodes)
+        self.assertIs(reduce_nodes[0].in_neighbors[3], map_nodes[3])
+        self.assertEqual(reduce_nodes[0].in_neighbors[:2], map_nodes[:2])
+
+        physical_nodes = MRHelperFunctions.create_physical_nodes(8, [1]*8, [1]*8, [1]*8)
+        simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, adjacency=adjacency)
+        self.assertEqual(reduce_nodes[0].input_size, num_map_nodes)
+        self.assertEqual(reduce_nodes[1].input_size, 1)
+
+        with self.assertRaises(ValueError):
+            Adjacency(2, [0], [2])
@@ -1,9 +1,11 @@
 import unittest
+import random
 from mrhelperfunctions import MRHelperFunctions
-from simulator.nodes import Config, straggler_time
+from simulator.nodes import Config, StragglerBatch
 from simulator.simulator import simulate
 from simulator.mrscheduler import MRScheduler
 from simulator.daskscheduler import DaskScheduler
+from simulator.speculation import Speculation
 
 class Benchmarks(unittest.TestCase):
     '''
@@ -36,8 +38,11 @@ class Benchmarks(unittest.TestCase):
         def map_output_size(input_size):
             return 1/1000
         
+        # straggler times for all map nodes, drawn in one go
+        stragglers = StragglerBatch(num_map_nodes)
+
         def map_compute_length(input_size):
-            return (map_input_size*compute_power) + straggler_time(0.5) + map_assign_time
+            return (map_input_size*compute_power) + stragglers(0.5) + map_assign_time
 
         map_nodes = MRHelperFunctions.create_map_nodes(num_map_nodes, [map_input_size]*num_map_nodes)
         
@@ -90,8 +95,11 @@ class Benchmarks(unittest.TestCase):
         def map_output_size(input_size):
             return 1/1000
         
+        # straggler times for all map nodes, drawn in one go
+        stragglers = StragglerBatch(num_map_nodes)
+
         def map_compute_length(input_size):
-            return (map_input_size*compute_power) + straggler_time(0.5) + map_assign_time
+            return (map_input_size*compute_power) + stragglers(0.5) + map_assign_time
 
         map_nodes = MRHelperFunctions.create_map_nodes(num_map_nodes, [map_input_size]*num_map_nodes)
         
@@ -145,8 +153,11 @@ class Benchmarks(unittest.TestCase):
         def map_output_size(input_size):
             return 1/1000
         
+        # straggler times for all map nodes, drawn in one go
+        stragglers = StragglerBatch(num_map_nodes)
+
         def map_compute_length(input_size):
-            return (map_input_size*compute_power) + straggler_time(1) + map_assign_time
+            return (map_input_size*compute_power) + stragglers(1) + map_assign_time
 
         map_nodes = MRHelperFunctions.create_map_nodes(num_map_nodes, [map_input_size]*num_map_nodes)
         
@@ -176,7 +187,65 @@ class Benchmarks(unittest.TestCase):
 
         print("Map Reduce Total time: ",total_time)
 
+    def test_map_reduce_grep_straggler_speculation(self):
+        '''
+            Function to compare the grep benchmark with failures and long stragglers without and with
+            speculative backups of the stragglers, on the same random draws
+        '''
+        num_physical_nodes = 1800
+        compute_power = 1/16
+        memory = 4000
+        bandwidth = 1000
+
+        Config.STRAGGLER_PROBABILITY = 0.001
+        Config.STRAGGLER_LENGTH_MULTIPLIER = 20
+        Config.FAILURE_PROBABILITY = 0.001
+        Config.BANDWIDTH_MULTIPLIER = 1/1000
+
+        num_map_nodes = 15000
+        map_input_size = 64
+        map_assign_time = 1
+
+        def map_output_size(input_size):
+            return 1/1000
+
+        def reduce_comp_length(input_size):
+            return 1
 
+        total_times = []
+        for speculation in [None, Speculation()]:
+            random.seed(0)
+            physical_nodes = MRHelperFunctions.create_physical_nodes(num_physical_nodes, 
+                [compute_power]*num_physical_nodes, 
+                [memory]*num_physical_nodes, 
+                [bandwidth]*num_physical_nodes)
+
+            stragglers = StragglerBatch(num_map_nodes)
+
+            def map_compute_length(input_size):
+                return (map_input_size*compute_power) + stragglers(1) + map_assign_time
+
+            map_nodes = MRHelperFunctions.create_map_nodes(num_map_nodes, [map_input_size]*num_map_nodes)
+            for mnode in map_nodes:
+                mnode.output_length = map_output_size
+                mnode.comp_length = map_compute_length
+
+            reduce_nodes = MRHelperFunctions.create_reduce_nodes(1)
+            for reduce_node in reduce_nodes:
+                reduce_node.comp_length = reduce_comp_length
+                for map_node in map_nodes:
+                    map_node.out_neighbors.append(reduce_node)
+                    reduce_node.in_neighbors.append(map_node)
+
+            total_times.append(simulate(map_nodes + reduce_nodes, physical_nodes, MRScheduler, verbose=False,
+                                        speculation=speculation))
+
+        print("Total time without speculation: ", total_times[0])
+        print("Total time with speculation: ", total_times[1], "backups launched: ", speculation.launched,
+              "won: ", speculation.won, "killed: ", speculation.killed, "promoted: ", speculation.promoted,
+              "lost: ", speculation.lost)
+        print("Makespan saved: ", total_times[0] - total_times[1])
+        self.assertLess(total_times[1], total_times[0])
 
     def test_map_reduce_sort(self):
         num_physical_nodes = 1800*4
@@ -0,0 +1,139 @@
+import unittest
+import os
+import random
+import tempfile
+from simulator.nodes import Config, batched_comp_length
+from simulator.simulator import simulate
+from simulator.mrscheduler import MRScheduler
+from simulator.daskscheduler import DaskScheduler
+from simulator.localityscheduler import LocalityScheduler
+from simulator.memoryscheduler import MemoryScheduler
+from simulator import checkpoint
+from tests.mrhelperfunctions import MRHelperFunctions
+
+def build_map_reduce_graph(slots=1):
+    num_map_nodes = 40
+    num_reduce_nodes = 8
+    num_physical_nodes = 16
+
+    map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(num_map_nodes, [3]*num_map_nodes, num_reduce_nodes)
+    comp_length = batched_comp_length(num_map_nodes)
+    for map_node in map_nodes:
+        map_node.comp_length = comp_length
+    physical_nodes = MRHelperFunctions.create_physical_nodes(
+        num_physical_nodes,
+        [1]*num_physical_nodes,
+        [1]*num_physical_nodes,
+        [1]*num_physical_nodes)
+    for pnode in physical_nodes:
+        pnode.slots = slots
+
+    logical_nodes = []
+    logical_nodes.extend(map_nodes)
+    logical_nodes.append(shuffle_node)
+    logical_nodes.extend(reduce_nodes)
+    return logical_nodes, physical_nodes
+
+class TestCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        Config.FAILURE_PROBABILITY = 0.001
+        Config.STRAGGLER_PROBABILITY = 0.2
+        Config.STRAGGLER_LENGTH_MULTIPLIER = 4
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        Config.reset()
+        self.directory.cleanup()
+
+    def run_and_resume(self, scheduler_class, slots=1, **kwargs):
+        '''
+            Function to run a simulation with checkpoints, then resume it from
+            each checkpoint and check it ends exactly the same way
+        '''
+        # a directory of its own, for the checkpoints of this run only
+        directory = tempfile.mkdtemp(dir=self.directory.name)
+        path = os.path.join(directory, 'checkpoint_{time}')
+        random.seed(7)
+        logical_nodes, physical_nodes = build_map_reduce_graph(slots)
+        total_time = simulate(logical_nodes, physical_nodes, scheduler_class, verbose=False,
+                              checkpoint_path=path, checkpoint_every=4, **kwargs)
+        end_times = [lnode.comp_end_time for lnode in logical_nodes]
+        failed = [pnode.failed for pnode in physical_nodes]
+
+        checkpoints = sorted(int(name.split('_')[1]) for name in os.listdir(directory))
+        self.assertGreater(len(checkpoints), 2)
+        for time in checkpoints:
+            random.seed(time)
+            logical_nodes, physical_nodes = build_map_reduce_graph(slots)
+            resumed_time = simulate(logical_nodes, physical_nodes, scheduler_class, verbose=False,
+                                    resume_from=path.format(time=time), **kwargs)
+            self.assertEqual(resumed_time, total_time)
+            self.assertEqual([lnode.comp_end_time for lnode in logical_nodes], end_times)
+            self.assertEqual([pnode.failed for pnode in physical_nodes], failed)
+        return total_time
+
+    def test_resume_event_driven(self):
+        '''
+            Function to test resuming event-driven simulations
+        '''
+        self.run_and_resume(MRScheduler)
+        self.run_and_resume(DaskScheduler)
+
+    def test_resume_tick(self):
+        '''
+            Function to test resuming simulations that visit every timestep
+        '''
+        self.run_and_resume(MRScheduler, event_driven=False)
+
+    def test_resume_node_table(self):
+        '''
+            Function to test resuming simulations that use a node table
+        '''
+        self.run_and_resume(MRScheduler, node_table=True)
+
+    def test_resume_slots(self):
+        '''
+            Function to test resuming simulations on physical nodes with several slots
+        '''
+        self.run_and_resume(MRScheduler, slots=3)
+
+    def test_resume_scheduler_state(self):
+        '''
+            Function to test resuming simulations with schedulers keeping state of their own
+        '''
+        self.run_and_resume(LocalityScheduler.with_delay(3))
+        Config.MEMORY_MULTIPLIER = 1
+        self.run_and_resume(MemoryScheduler)
+
+    def test_fork(self):
+        '''
+            Function to test starting several runs from one loaded checkpoint
+        '''
+        path = os.path.join(self.directory.name, 'checkpoint')
+        random.seed(3)
+        logical_nodes, physical_nodes = build_map_reduce_graph()
+        simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, checkpoint_path=path, checkpoint_every=10)
+
+        state = checkpoint.load(path)
+        times = []
+        for multiplier in [1, 3]:
+            Config.BANDWIDTH_MULTIPLIER = multiplier
+            logical_nodes, physical_nodes = build_map_reduce_graph()
+            times.append(simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, resume_from=state))
+        self.assertLessEqual(times[0], times[1])
+        self.assertEqual(state['time'], checkpoint.load(path)['time'])
+
+    def test_mismatched_graph(self):
+        '''
+            Function to test that a checkpoint cannot be resumed on a different graph or mode
+        '''
+        path = os.path.join(self.directory.name, 'checkpoint')
+        logical_nodes, physical_nodes = build_map_reduce_graph()
+        simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, checkpoint_path=path, checkpoint_every=5)
+
+        logical_nodes, physical_nodes = build_map_reduce_graph()
+        with self.assertRaises(ValueError):
+            simulate(logical_nodes[:-1], physical_nodes, MRScheduler, verbose=False, resume_from=path)
+        with self.assertRaises(ValueError):
+            simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, event_driven=False, resume_from=path)
@@ -1,13 +1,49 @@
 import unittest
+import time
 import networkx as nx
 from mrhelperfunctions import MRHelperFunctions
 from testbenchmark import Benchmarks
 from simulator.nodes import LogicalNode, PhysicalNode, MapNode, Input
 from simulator.daskscheduler import DaskScheduler
+from simulator.mrscheduler import MRScheduler
+from simulator.localityscheduler import LocalityScheduler
 from simulator.simulator import simulate
 from simulator.nodes import Config
 from testdaskscheduler import TestDaskScheduler
 
+# DaskScheduler as it was written against lists: the ready logical nodes and
+# free physical nodes are filtered out of every node each timestep, and
+# searched and removed from linearly
+class ListDaskScheduler:
+    @staticmethod
+    def schedule(logical_nodes, physical_nodes, completed_lnodes, failed_lnodes, ready_lnodes=None, free_pnodes=None):
+        scheduled_pairs = []
+
+        remaining_physical_nodes = list(filter(lambda x: x.schedulable(), physical_nodes))
+        ready_logical_nodes = list(filter(lambda x: x.schedulable(), logical_nodes))
+
+        for logical_node in completed_lnodes:
+            if logical_node.pnode not in remaining_physical_nodes:
+                continue
+            picked_neighbor = None
+            for neighbor in logical_node.out_neighbors:
+                if neighbor in ready_logical_nodes:
+                    picked_neighbor = neighbor
+                    break
+            if picked_neighbor is not None:
+                scheduled_pairs.append((picked_neighbor, logical_node.pnode))
+                remaining_physical_nodes.remove(logical_node.pnode)
+                ready_logical_nodes.remove(picked_neighbor)
+
+        for logical_node in ready_logical_nodes:
+            if len(remaining_physical_nodes) == 0:
+                break
+            best_physical_node = remaining_physical_nodes[0]
+            scheduled_pairs.append((logical_node, best_physical_node))
+            remaining_physical_nodes.remove(best_physical_node)
+
+        return scheduled_pairs
+
 class TestDaskBenchmark(unittest.TestCase):
     def setUp(self):
         Config.FAILURE_PROBABILITY = 0
@@ -17,20 +53,95 @@ class TestDaskBenchmark(unittest.TestCase):
         Config.reset()
 
     def test_dask_sort(self):
-        num_physical_nodes = 1800*4
-        compute_power = 1/2
-        memory = 4000
-        bandwidth = 1000
+        Config.STRAGGLER_LENGTH_MULTIPLIER = 2
+        Config.BANDWIDTH_MULTIPLIER = 1/1000
+
+        logical_nodes, physical_nodes = TestDaskBenchmark.create_sort_graph(15000, 1800, 1800*4)
+
+        total_time = simulate(logical_nodes, physical_nodes, DaskScheduler)
 
+        print("Total time: ",total_time)
+
+    def test_dask_sort_scheduler_lookups(self):
+        '''
+            Function to compare DaskScheduler, which keeps ready logical nodes and free physical nodes
+            in indexed sets, with the same scheduling done on lists rebuilt and searched every timestep
+        '''
         Config.STRAGGLER_LENGTH_MULTIPLIER = 2
         Config.BANDWIDTH_MULTIPLIER = 1/1000
 
+        total_times = []
+        for scheduler_class in [ListDaskScheduler, DaskScheduler]:
+            logical_nodes, physical_nodes = TestDaskBenchmark.create_sort_graph(15000, 1800, 1800*4)
+            start = time.perf_counter()
+            total_times.append(simulate(logical_nodes, physical_nodes, scheduler_class, verbose=False))
+            print(scheduler_class.__name__, "total time: ", total_times[-1], "simulated in {:.2f}s".format(time.perf_counter() - start))
+
+        self.assertEqual(total_times[0], total_times[1])
+
+    def test_sort_delay_scheduling(self):
+        '''
+            Function to measure the makespan and the fraction of input data read locally in the sort
+            benchmark with locality-aware placement, without and with delay scheduling, on a busy cluster
+        '''
+        Config.STRAGGLER_LENGTH_MULTIPLIER = 2
+        Config.BANDWIDTH_MULTIPLIER = 1/1000
+
+        total_times = []
+        local_fractions = []
+        # MAX_DELAY=0 places on the first free physical node, 10 rounds lets most nodes wait for their input
+        for scheduler_class in [MRScheduler, LocalityScheduler.with_delay(0), LocalityScheduler.with_delay(10)]:
+            logical_nodes, physical_nodes = TestDaskBenchmark.create_sort_graph(15000, 1800, 1800)
+            total_times.append(simulate(logical_nodes, physical_nodes, scheduler_class, verbose=False))
+            inputs = [(inp, lnode) for lnode in logical_nodes for inp in lnode.input_q if inp.source is not None]
+            local_fractions.append(sum(inp.size for inp, lnode in inputs if inp.source is lnode.pnode)
+                                   / sum(inp.size for inp, lnode in inputs))
+            print(scheduler_class.__name__, "total time: ", total_times[-1],
+                  "local input fraction: {:.3f}".format(local_fractions[-1]))
+
+        self.assertGreaterEqual(local_fractions[1], local_fractions[0])
+        self.assertGreater(local_fractions[2], local_fractions[1])
+        self.assertLessEqual(total_times[2], total_times[1])
+
+    def test_sort_slots(self):
+        '''
+            Function to compare the sort benchmark on 1800 physical nodes of 4 slots with the same
+            cores as 1800*4 physical nodes of one slot
+        '''
+        Config.STRAGGLER_LENGTH_MULTIPLIER = 2
+        Config.BANDWIDTH_MULTIPLIER = 1/1000
+
+        total_times = []
+        for num_physical_nodes, slots in [(1800*4, 1), (1800, 4)]:
+            logical_nodes, physical_nodes = TestDaskBenchmark.create_sort_graph(15000, 1800, num_physical_nodes, slots)
+            start = time.perf_counter()
+            total_times.append(simulate(logical_nodes, physical_nodes, DaskScheduler, verbose=False))
+            print(num_physical_nodes, "physical nodes of", slots, "slots, total time: ", total_times[-1],
+                  "simulated in {:.2f}s".format(time.perf_counter() - start))
+
+        # inputs from a logical node on another slot of the same physical node arrive right away
+        self.assertLessEqual(total_times[1], total_times[0])
+
+    @staticmethod
+    def create_sort_graph(num_map_nodes, num_shuffle_nodes, num_physical_nodes, slots=1):
+        '''
+            Function to create the logical and physical nodes of the sort benchmark
+            num_map_nodes: number of map nodes
+            num_shuffle_nodes: number of shuffle nodes, and of reduce nodes
+            num_physical_nodes: number of physical nodes
+            slots: number of logical nodes each physical node runs at once
+        '''
+        compute_power = 1/2
+        memory = 4000
+        bandwidth = 1000
+
         physical_nodes = MRHelperFunctions.create_physical_nodes(num_physical_nodes, 
             [compute_power]*num_physical_nodes, 
             [memory]*num_physical_nodes, 
             [bandwidth]*num_physical_nodes)
+        for pnode in physical_nodes:
+            pnode.slots = slots
 
-        num_map_nodes = 15000
         map_input_size = 64
         map_assign_time = 1
 
@@ -45,8 +156,6 @@ class TestDaskBenchmark(unittest.TestCase):
         for mnode in map_nodes:
             mnode.output_length = map_output_size
             mnode.comp_length = map_compute_length
-        
-        num_shuffle_nodes = 1800
 
         def shuffle_comp_length(input_size):
             return (input_size*compute_power)
@@ -81,9 +190,7 @@ class TestDaskBenchmark(unittest.TestCase):
         logical_nodes.extend(shuffle_nodes)
         logical_nodes.extend(reduce_nodes)
 
-        total_time = simulate(logical_nodes, physical_nodes, DaskScheduler)
-
-        print("Total time: ",total_time)
+        return logical_nodes, physical_nodes
 
     @staticmethod
     def create_logical_nodes(logical_graph: nx.DiGraph):
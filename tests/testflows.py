@@ -0,0 +1,105 @@
+import unittest
+import random
+import numpy as np
+from simulator.nodes import Config
+from simulator.flows import max_min_rates
+from simulator.network import TopologyNetwork
+from simulator.simulator import simulate
+from simulator.mrscheduler import MRScheduler
+from tests.mrhelperfunctions import MRHelperFunctions
+
+class TestFlows(unittest.TestCase):
+
+    def setUp(self):
+        Config.FAILURE_PROBABILITY = 0
+        Config.STRAGGLER_PROBABILITY = 0
+
+    def tearDown(self):
+        Config.reset()
+
+    def test_max_min_rates(self):
+        '''
+            Function to test max-min fair rates on small sets of links
+        '''
+        # three flows through link 0, one of them also through the slower link 1
+        links = np.array([[0, -1], [0, -1], [0, 1]])
+        rates = max_min_rates(links, [9, 1], np.full(3, np.inf))
+        self.assertEqual(list(rates), [4, 4, 1])
+
+        # a flow capped on its own leaves the rest to the others
+        rates = max_min_rates(np.array([[0], [0]]), [10], np.array([2, np.inf]))
+        self.assertEqual(list(rates), [2, 8])
+
+        # flows through no limited link go as fast as their caps
+        rates = max_min_rates(np.array([[-1], [0]]), [np.inf], np.array([3, np.inf]))
+        self.assertEqual(list(rates), [3, np.inf])
+
+    def create_shuffle(self, map_count, stage_edges=False):
+        map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(
+            map_count, [10]*map_count, 1, stage_edges)
+        physical_nodes = MRHelperFunctions.create_physical_nodes(map_count + 1, [1]*(map_count + 1),
+                                                                 [1]*(map_count + 1), [1]*(map_count + 1))
+        return map_nodes + [shuffle_node] + reduce_nodes, physical_nodes
+
+    def test_shared_nic(self):
+        '''
+            Function to test that the outputs of several maps share the NIC of the reducer they go to
+        '''
+        # the reducer runs where the first map ran, so the outputs of the
+        # other three (10 units each) take 30 timesteps through its NIC
+        # instead of 10
+        for continuous_time, expected in [(False, [112, 132]), (True, [110, 130])]:
+            total_times = []
+            for contention in [False, True]:
+                logical_nodes, physical_nodes = self.create_shuffle(4)
+                total_times.append(simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False,
+                                            contention=contention, continuous_time=continuous_time))
+            self.assertEqual(total_times, expected)
+
+    def test_rack_uplink(self):
+        '''
+            Function to test that transfers between racks share the racks' links
+        '''
+        total_times = {}
+        for contention in [False, True]:
+            for inter_rack in [None, 20, 5]:
+                map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(8, [10]*8, 8)
+                physical_nodes = MRHelperFunctions.create_physical_nodes(8, [1]*8, [1]*8, [10]*8)
+                TopologyNetwork.evenly(physical_nodes, 4, inter_rack=inter_rack)
+                total_times[contention, inter_rack] = simulate(map_nodes + [shuffle_node] + reduce_nodes,
+                                                               physical_nodes, MRScheduler, verbose=False,
+                                                               contention=contention)
+        # a link as fast as the NICs only slows transfers down once they share it
+        self.assertEqual(total_times[False, 20], total_times[False, None])
+        self.assertGreater(total_times[True, 20], total_times[True, None])
+        self.assertGreater(total_times[True, 5] - total_times[True, None],
+                           total_times[False, 5] - total_times[False, None])
+
+    def test_failures(self):
+        '''
+            Function to test that flows to failed physical nodes are dropped and the job still completes
+        '''
+        Config.FAILURE_PROBABILITY = 0.005
+        for seed in range(3):
+            random.seed(seed)
+            map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(20, [5]*20, 5)
+            physical_nodes = MRHelperFunctions.create_physical_nodes(30, [1]*30, [1]*30, [1]*30)
+            logical_nodes = map_nodes + [shuffle_node] + reduce_nodes
+            total_time = simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, contention=True)
+            self.assertGreater(total_time, 0)
+            self.assertTrue(all(lnode.comp_end_time is not None for lnode in logical_nodes))
+
+    def test_unsupported(self):
+        '''
+            Function to test that contention is refused where it is not modeled
+        '''
+        logical_nodes, physical_nodes = self.create_shuffle(2)
+        for options in [{'node_table': True}, {'aggregate_inputs': True}, {'checkpoint_path': 'unused'}]:
+            with self.assertRaises(ValueError):
+                simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, contention=True, **options)
+        logical_nodes, physical_nodes = self.create_shuffle(2, stage_edges=True)
+        with self.assertRaises(ValueError):
+            simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, contention=True)
+
+if __name__ == '__main__':
+    unittest.main()
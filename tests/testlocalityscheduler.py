@@ -0,0 +1,143 @@
+import unittest
+import random
+from simulator.nodes import Config, LogicalNode, MapNode, Input
+from simulator.network import TopologyNetwork
+from simulator.simulator import simulate
+from simulator.mrscheduler import MRScheduler
+from simulator.localityscheduler import LocalityScheduler
+from tests.mrhelperfunctions import MRHelperFunctions
+
+class TestLocalityScheduler(unittest.TestCase):
+
+    def setUp(self):
+        Config.FAILURE_PROBABILITY = 0
+        Config.STRAGGLER_PROBABILITY = 0
+
+    def tearDown(self):
+        Config.reset()
+
+    def create_chains(self, count):
+        # `count` map nodes, each sending its output to a logical node of its own
+        map_nodes = [MapNode(input_q=[Input(10 + i % 7, None, None)]) for i in range(count)]
+        next_nodes = []
+        for map_node in map_nodes:
+            next_node = LogicalNode(in_neighbors=[map_node])
+            map_node.out_neighbors.append(next_node)
+            next_nodes.append(next_node)
+        return map_nodes, next_nodes
+
+    def test_find_best_physical_node(self):
+        '''
+            Function to test placing on the physical node, then the rack, holding the most input data
+        '''
+        physical_nodes = MRHelperFunctions.create_physical_nodes(8, [1]*8, [1]*8, [1]*8)
+        TopologyNetwork.evenly(physical_nodes, 4)
+        reduce_node = LogicalNode(in_neighbors=[LogicalNode() for i in range(3)])
+        reduce_node.input_q = [Input(1, 0, physical_nodes[0]), Input(2, 0, physical_nodes[6]), Input(2, 0, physical_nodes[6])]
+        scheduler = LocalityScheduler([reduce_node], physical_nodes)
+        self.assertIs(scheduler.find_best_physical_node(reduce_node), physical_nodes[6])
+
+        scheduler.free_pnodes.take(physical_nodes[6])
+        self.assertIs(scheduler.find_best_physical_node(reduce_node), physical_nodes[0])
+
+        # the best rack's first free physical node, over the first free physical node overall
+        scheduler.free_pnodes.take(physical_nodes[0])
+        self.assertIs(scheduler.find_best_physical_node(reduce_node), physical_nodes[4])
+
+        for pnode in physical_nodes[4:]:
+            scheduler.pnode_lost(pnode)
+        self.assertIs(scheduler.find_best_physical_node(reduce_node), physical_nodes[1])
+
+    def test_delay(self):
+        '''
+            Function to test that delay scheduling skips a node for MAX_DELAY rounds while its local physical node is busy
+        '''
+        physical_nodes = MRHelperFunctions.create_physical_nodes(4, [1]*4, [1]*4, [1]*4)
+        reduce_node = LogicalNode(in_neighbors=[LogicalNode()])
+        reduce_node.input_q = [Input(1, 0, physical_nodes[2])]
+        scheduler_class = LocalityScheduler.with_delay(2)
+        self.assertEqual(scheduler_class.MAX_DELAY, 2)
+        self.assertEqual(LocalityScheduler.MAX_DELAY, 0)
+
+        scheduler = scheduler_class([reduce_node], physical_nodes)
+        scheduler.free_pnodes.take(physical_nodes[2])
+        self.assertEqual(scheduler.assign(), [])
+        self.assertEqual(scheduler.assign(), [])
+        self.assertEqual(scheduler.assign(), [(reduce_node, physical_nodes[0])])
+
+        # the local physical node frees up while waiting
+        scheduler = scheduler_class([reduce_node], physical_nodes)
+        scheduler.free_pnodes.take(physical_nodes[2])
+        self.assertEqual(scheduler.assign(), [])
+        scheduler.pnode_freed(physical_nodes[2])
+        self.assertEqual(scheduler.assign(), [(reduce_node, physical_nodes[2])])
+
+        # no waiting for a physical node that failed
+        scheduler = scheduler_class([reduce_node], physical_nodes)
+        physical_nodes[2].failed = True
+        scheduler.pnode_lost(physical_nodes[2])
+        self.assertEqual(scheduler.assign(), [(reduce_node, physical_nodes[0])])
+
+    def test_candidate_pnode(self):
+        '''
+            Function to test that looking for a physical node for a backup neither skips nor counts the node
+        '''
+        physical_nodes = MRHelperFunctions.create_physical_nodes(4, [1]*4, [1]*4, [1]*4)
+        reduce_node = LogicalNode(in_neighbors=[LogicalNode()])
+        reduce_node.input_q = [Input(1, 0, physical_nodes[2])]
+        scheduler = LocalityScheduler.with_delay(2)([reduce_node], physical_nodes)
+        self.assertIs(scheduler.candidate_pnode(reduce_node), physical_nodes[2])
+
+        # once assigned elsewhere, the node is still placed by its inputs
+        scheduler.free_pnodes.take(physical_nodes[0])
+        physical_nodes[0].lnode = reduce_node
+        reduce_node.pnode = physical_nodes[0]
+        scheduler.node_assigned(reduce_node, physical_nodes[0])
+        self.assertIs(scheduler.candidate_pnode(reduce_node), physical_nodes[2])
+        scheduler.free_pnodes.take(physical_nodes[2])
+        self.assertIs(scheduler.candidate_pnode(reduce_node), physical_nodes[1])
+        self.assertEqual(scheduler.skips, {})
+
+    def test_simulate(self):
+        '''
+            Function to test that following the data saves transfer time
+        '''
+        total_times = []
+        placements = []
+        for scheduler_class in [MRScheduler, LocalityScheduler]:
+            map_nodes, next_nodes = self.create_chains(40)
+            physical_nodes = MRHelperFunctions.create_physical_nodes(40, [1]*40, [1]*40, [1]*40)
+            total_times.append(simulate(map_nodes + next_nodes, physical_nodes, scheduler_class, verbose=False))
+            placements.append(sum(map_node.pnode is next_node.pnode for map_node, next_node in zip(map_nodes, next_nodes)))
+        self.assertLess(total_times[1], total_times[0])
+        self.assertEqual(placements[1], 40)
+
+        # on a busy cluster, waiting for the physical node holding the input places more nodes locally,
+        # and a node waiting too long for its physical node still gets placed
+        total_times = []
+        placements = []
+        for rounds in (0, 10):
+            map_nodes, next_nodes = self.create_chains(40)
+            physical_nodes = MRHelperFunctions.create_physical_nodes(12, [1]*12, [1]*12, [1]*12)
+            total_times.append(simulate(map_nodes + next_nodes, physical_nodes, LocalityScheduler.with_delay(rounds), verbose=False))
+            placements.append(sum(map_node.pnode is next_node.pnode for map_node, next_node in zip(map_nodes, next_nodes)))
+            self.assertTrue(all(lnode.comp_end_time is not None for lnode in map_nodes + next_nodes))
+        self.assertGreater(placements[1], placements[0])
+        self.assertLessEqual(total_times[1], total_times[0])
+
+    def test_failures(self):
+        '''
+            Function to test that a map-reduce job with failures completes
+        '''
+        Config.FAILURE_PROBABILITY = 0.005
+        for seed in range(3):
+            random.seed(seed)
+            map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(20, [5]*20, 5)
+            physical_nodes = MRHelperFunctions.create_physical_nodes(16, [1]*16, [1]*16, [1]*16)
+            TopologyNetwork.evenly(physical_nodes, 4)
+            logical_nodes = map_nodes + [shuffle_node] + reduce_nodes
+            simulate(logical_nodes, physical_nodes, LocalityScheduler, verbose=False)
+            self.assertTrue(all(lnode.comp_end_time is not None for lnode in logical_nodes))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import random
+from simulator.nodes import Config, LogicalNode, Input, LogicalNodeType
+from simulator.simulator import simulate
+from simulator.mrscheduler import MRScheduler
+from simulator.memoryscheduler import MemoryScheduler
+from tests.mrhelperfunctions import MRHelperFunctions
+
+class TestMemoryScheduler(unittest.TestCase):
+
+    def setUp(self):
+        Config.FAILURE_PROBABILITY = 0
+        Config.STRAGGLER_PROBABILITY = 0
+        Config.MEMORY_MULTIPLIER = 1
+
+    def tearDown(self):
+        Config.reset()
+
+    def create_graph(self):
+        map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(20, [i % 10 + 1 for i in range(20)], 4)
+        physical_nodes = MRHelperFunctions.create_physical_nodes(8, [1]*8, [2, 4, 8, 16, 32, 64, 128, 1000], [1]*8)
+        return map_nodes + [shuffle_node] + reduce_nodes, physical_nodes
+
+    def test_find_best_physical_node(self):
+        '''
+            Function to test picking the free physical node with the least memory that fits
+        '''
+        physical_nodes = MRHelperFunctions.create_physical_nodes(4, [1]*4, [16, 2, 8, 4], [1]*4)
+        logical_node = LogicalNode(input_q=[Input(5, 0, None)])
+        scheduler = MemoryScheduler([logical_node], physical_nodes)
+        self.assertIs(scheduler.find_best_physical_node(logical_node), physical_nodes[2])
+        self.assertEqual(scheduler.picked, {2: 3})
+
+        # looking for a physical node for a backup records nothing
+        logical_node.input_q.append(Input(20, 0, None))
+        self.assertIs(scheduler.candidate_pnode(logical_node), physical_nodes[0])
+        self.assertEqual((scheduler.picked, scheduler.spilled), ({2: 3}, []))
+        logical_node.input_q.pop()
+
+        # taken during assign, without a notification yet
+        scheduler.free_pnodes.take(physical_nodes[2])
+        self.assertIs(scheduler.find_best_physical_node(logical_node), physical_nodes[0])
+        physical_nodes[0].lnode = logical_node
+        scheduler.node_assigned(logical_node, physical_nodes[0])
+        self.assertIsNone(scheduler.find_best_physical_node(logical_node))
+        scheduler.pnode_freed(physical_nodes[2])
+        self.assertIs(scheduler.find_best_physical_node(logical_node), physical_nodes[2])
+        self.assertEqual(scheduler.spilled, [])
+
+        # too large for any physical node: spills on the largest free one
+        logical_node.input_q.append(Input(20, 0, None))
+        self.assertIs(scheduler.find_best_physical_node(logical_node), physical_nodes[2])
+        self.assertEqual(scheduler.spilled, [logical_node])
+
+        # without the physical node it fitted on, a node spills
+        logical_node.input_q = [Input(10, 0, None)]
+        self.assertIsNone(scheduler.find_best_physical_node(logical_node))
+        physical_nodes[0].failed = True
+        scheduler.pnode_lost(physical_nodes[0])
+        self.assertIs(scheduler.find_best_physical_node(logical_node), physical_nodes[2])
+
+    def test_simulate(self):
+        '''
+            Function to test that packing by memory avoids spilling and its slowdown
+        '''
+        Config.SPILL_LENGTH_MULTIPLIER = 5
+        total_times = []
+        for scheduler_class in [MRScheduler, MemoryScheduler]:
+            logical_nodes, physical_nodes = self.create_graph()
+            total_times.append(simulate(logical_nodes, physical_nodes, scheduler_class, verbose=False))
+            # the shuffle node is placed before it has all its inputs
+            spilled = [lnode for lnode in logical_nodes
+                       if lnode.type is not LogicalNodeType.SHUFFLE and lnode.memory_size > lnode.pnode.memory]
+            if scheduler_class is MemoryScheduler:
+                self.assertEqual(spilled, [])
+            else:
+                self.assertGreater(len(spilled), 0)
+        self.assertLess(total_times[1], total_times[0])
+
+    def test_spill(self):
+        '''
+            Function to test that a node too large for every physical node is reported and computes for longer
+        '''
+        Config.SPILL_LENGTH_MULTIPLIER = 2
+        logical_nodes, physical_nodes = self.create_graph()
+        physical_nodes = physical_nodes[:6]
+        created = []
+
+        class RecordingMemoryScheduler(MemoryScheduler):
+            def __init__(self, lnodes, pnodes):
+                super().__init__(lnodes, pnodes)
+                created.append(self)
+
+        simulate(logical_nodes, physical_nodes, RecordingMemoryScheduler, verbose=False)
+        reduce_nodes = logical_nodes[-4:]
+        self.assertEqual(created[0].spilled, reduce_nodes)
+        # the first one gets the largest physical node
+        self.assertEqual(reduce_nodes[0].pnode.memory, 64)
+        for reduce_node in reduce_nodes:
+            self.assertEqual(reduce_node.comp_end_time - reduce_node.comp_start_time,
+                             reduce_node.input_size + 2 * (reduce_node.input_size - reduce_node.pnode.memory))
+
+    def test_failures(self):
+        '''
+            Function to test that a job with failures completes
+        '''
+        Config.FAILURE_PROBABILITY = 0.002
+        for seed in range(3):
+            random.seed(seed)
+            logical_nodes, physical_nodes = self.create_graph()
+            try:
+                simulate(logical_nodes, physical_nodes, MemoryScheduler, verbose=False)
+            except RuntimeError:
+                continue
+            self.assertTrue(all(lnode.comp_end_time is not None for lnode in logical_nodes))
+
+if __name__ == '__main__':
+    unittest.main()
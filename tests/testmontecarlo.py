@@ -0,0 +1,75 @@
+import unittest
+from simulator.nodes import Config
+from simulator.montecarlo import run_replicas, ReplicaStats
+from simulator.mrscheduler import MRScheduler
+from tests.mrhelperfunctions import MRHelperFunctions
+
+def build_map_reduce_graph():
+    num_map_nodes = 20
+    num_reduce_nodes = 4
+    num_physical_nodes = 10
+
+    map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(num_map_nodes, [2]*num_map_nodes, num_reduce_nodes)
+    physical_nodes = MRHelperFunctions.create_physical_nodes(
+        num_physical_nodes,
+        [1]*num_physical_nodes,
+        [1]*num_physical_nodes,
+        [1]*num_physical_nodes)
+
+    logical_nodes = []
+    logical_nodes.extend(map_nodes)
+    logical_nodes.append(shuffle_node)
+    logical_nodes.extend(reduce_nodes)
+    return logical_nodes, physical_nodes
+
+class TestMonteCarlo(unittest.TestCase):
+
+    def test_replicas_deterministic(self):
+        '''
+            Function to test that replicas without randomness all take the same time
+        '''
+        stats = run_replicas(build_map_reduce_graph, MRScheduler, 4, config={'FAILURE_PROBABILITY': 0, 'STRAGGLER_PROBABILITY': 0}, workers=1)
+        print(stats)
+        self.assertEqual(stats.replicas, 4)
+        self.assertEqual(stats.std, 0)
+        self.assertEqual(stats.ci, (stats.mean, stats.mean))
+        self.assertEqual(stats.percentiles[50], stats.mean)
+
+    def test_replicas_parallel(self):
+        '''
+            Function to test that running replicas in worker processes is reproducible and matches running them in process
+        '''
+        config = {'FAILURE_PROBABILITY': 0.002, 'STRAGGLER_PROBABILITY': 0.1, 'STRAGGLER_LENGTH_MULTIPLIER': 3}
+        serial = run_replicas(build_map_reduce_graph, MRScheduler, 8, config=config, seed=5, workers=1)
+        parallel = run_replicas(build_map_reduce_graph, MRScheduler, 8, config=config, seed=5, workers=2)
+        print(parallel)
+
+        self.assertEqual(serial.times, parallel.times)
+        self.assertLessEqual(parallel.ci[0], parallel.mean)
+        self.assertLessEqual(parallel.mean, parallel.ci[1])
+        self.assertLessEqual(parallel.min, parallel.percentiles[50])
+        self.assertLessEqual(parallel.percentiles[99], parallel.max)
+        # the overrides do not leak out of the replicas
+        self.assertEqual(Config.STRAGGLER_LENGTH_MULTIPLIER, 1)
+
+    def test_unknown_config_field(self):
+        '''
+            Function to test that misspelled Config overrides are rejected
+        '''
+        Config.BANDWIDTH_MULTIPLIER = 5
+        try:
+            with self.assertRaises(ValueError):
+                run_replicas(build_map_reduce_graph, MRScheduler, 1, config={'FAILURE_PROB': 0}, workers=1)
+            # the Config of this process is left as it was
+            self.assertEqual(Config.BANDWIDTH_MULTIPLIER, 5)
+        finally:
+            Config.reset()
+
+    def test_replica_stats(self):
+        '''
+            Function to test the summary statistics of replica times
+        '''
+        stats = ReplicaStats([1, 2, 3, 4, 5], percentiles=(50,), confidence=0.95)
+        self.assertEqual(stats.mean, 3)
+        self.assertEqual(stats.percentiles[50], 3)
+        self.assertAlmostEqual(stats.ci[1] - stats.mean, 1.96 * (2.5 ** 0.5) / (5 ** 0.5), places=2)
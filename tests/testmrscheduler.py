@@ -1,5 +1,6 @@
 import unittest
-from simulator.nodes import LogicalNode, PhysicalNode, Input, MapNode, ReduceNode, ShuffleNode
+import random
+from simulator.nodes import LogicalNode, PhysicalNode, Input, MapNode, ReduceNode, ShuffleNode, LogicalNodeState
 from simulator.mrscheduler import MRScheduler
 from simulator.simulator import simulate
 from simulator.nodes import Config
@@ -154,3 +155,148 @@ class TestMRScheduler(unittest.TestCase):
 
         print("Total time: ",total_time)
         self.assertEqual(total_time, 65)
+
+    def test_map_reduce_sch_event_driven(self):
+        '''
+            Function to test that skipping idle timesteps gives the same total time as visiting every timestep
+        '''
+        num_map_nodes = 30
+        num_reduce_nodes = 8
+        num_physical_nodes = 8
+
+        total_times = []
+        for event_driven in [False, True]:
+            map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(num_map_nodes, list(range(1, num_map_nodes + 1)), num_reduce_nodes)
+            physical_nodes = MRHelperFunctions.create_physical_nodes(
+                num_physical_nodes,
+                [1]*num_physical_nodes,
+                [1]*num_physical_nodes,
+                [1]*num_physical_nodes)
+
+            logical_nodes = []
+            logical_nodes.extend(map_nodes)
+            logical_nodes.append(shuffle_node)
+            logical_nodes.extend(reduce_nodes)
+
+            total_times.append(simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, event_driven=event_driven))
+
+        print("Total times: ",total_times)
+        self.assertEqual(total_times[0], total_times[1])
+
+    def test_map_reduce_sch_event_driven_failures(self):
+        '''
+            Function to test that the event-driven simulator recovers from physical node failures
+        '''
+        random.seed(1)
+        num_map_nodes = 30
+        num_reduce_nodes = 8
+        num_physical_nodes = 16
+
+        map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(num_map_nodes, [1]*num_map_nodes, num_reduce_nodes)
+        physical_nodes = MRHelperFunctions.create_physical_nodes(
+            num_physical_nodes,
+            [1]*num_physical_nodes,
+            [1]*num_physical_nodes,
+            [1]*num_physical_nodes)
+
+        logical_nodes = []
+        logical_nodes.extend(map_nodes)
+        logical_nodes.append(shuffle_node)
+        logical_nodes.extend(reduce_nodes)
+
+        Config.FAILURE_PROBABILITY = 0.005
+        total_time = simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False)
+
+        print("Total time: ",total_time)
+        self.assertTrue(any(pnode.failed for pnode in physical_nodes))
+        self.assertTrue(all(lnode.state is LogicalNodeState.COMPLETED for lnode in logical_nodes))
+        self.assertGreaterEqual(total_time, 65)
+
+    def test_map_reduce_sch_aggregate_inputs(self):
+        '''
+            Function to test that aggregating inputs gives the same schedule as an input per edge
+        '''
+        Config.FAILURE_PROBABILITY = 0.001
+        Config.BANDWIDTH_MULTIPLIER = 2
+        for seed in range(4):
+            runs = []
+            for aggregate_inputs in [False, True]:
+                random.seed(seed)
+                map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(40, [1 + i % 3 for i in range(40)], 8)
+                physical_nodes = MRHelperFunctions.create_physical_nodes(16, [1]*16, [1]*16, [1]*16)
+                logical_nodes = map_nodes + [shuffle_node] + reduce_nodes
+
+                total_time = simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, aggregate_inputs=aggregate_inputs)
+                runs.append((total_time, [(lnode.comp_start_time, lnode.comp_end_time, lnode.input_size) for lnode in logical_nodes]))
+            self.assertEqual(runs[0], runs[1])
+            self.assertEqual(len(reduce_nodes[0].input_q), 1)
+
+    def test_map_reduce_sch_aggregate_inputs_failures(self):
+        '''
+            Function to test that aggregating inputs gives the same schedule as an input per edge when
+            shuffle nodes, which are assigned while their inputs are still coming, lose their physical node
+        '''
+        Config.FAILURE_PROBABILITY = 0.003
+        Config.BANDWIDTH_MULTIPLIER = 3
+        failed = 0
+        for seed in range(3):
+            runs = []
+            for aggregate_inputs in [False, True]:
+                random.seed(seed)
+                map_nodes = MRHelperFunctions.create_map_nodes(40, [1 + i % 5 for i in range(40)])
+                shuffle_nodes = MRHelperFunctions.create_shuffle_nodes(6, MRHelperFunctions.shuffle_output_length)
+                reduce_nodes = MRHelperFunctions.create_reduce_nodes(6)
+                for shuffle_node, reduce_node in zip(shuffle_nodes, reduce_nodes):
+                    for map_node in map_nodes:
+                        map_node.out_neighbors.append(shuffle_node)
+                        shuffle_node.in_neighbors.append(map_node)
+                    shuffle_node.out_neighbors.append(reduce_node)
+                    reduce_node.in_neighbors.append(shuffle_node)
+                physical_nodes = MRHelperFunctions.create_physical_nodes(12, [1]*12, [1]*12, [1]*12)
+                logical_nodes = map_nodes + shuffle_nodes + reduce_nodes
+
+                total_time = simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, aggregate_inputs=aggregate_inputs)
+                runs.append((total_time, [(lnode.comp_start_time, lnode.comp_end_time, lnode.input_size) for lnode in logical_nodes]))
+            self.assertEqual(runs[0], runs[1])
+            failed += sum(pnode.failed for pnode in physical_nodes)
+        self.assertGreater(failed, 10)
+
+    def test_map_reduce_sch_continuous_time(self):
+        '''
+            Function to test that continuous time does not round transfer times up to whole timesteps
+        '''
+        Config.BANDWIDTH_MULTIPLIER = 0.5
+        map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(1, [1], 1)
+        physical_nodes = MRHelperFunctions.create_physical_nodes(1, [1], [1], [1])
+        logical_nodes = map_nodes + [shuffle_node] + reduce_nodes
+
+        # the map's input arrives at 0.5, after which everything runs on the same physical node
+        total_time = simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, continuous_time=True)
+        self.assertEqual(total_time, 3.5)
+        self.assertEqual(map_nodes[0].comp_start_time, 0.5)
+        self.assertEqual(reduce_nodes[0].schedule_time, 2.5)
+
+        with self.assertRaises(ValueError):
+            simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, event_driven=False, continuous_time=True)
+
+    def test_map_reduce_sch_continuous_time_failures(self):
+        '''
+            Function to test that continuous time recovers from the same failures as whole timesteps and finishes sooner
+        '''
+        Config.FAILURE_PROBABILITY = 0.001
+        failed = 0
+        for seed in range(4):
+            runs = []
+            for continuous_time in [False, True]:
+                random.seed(seed)
+                map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(30, [1]*30, 8)
+                physical_nodes = MRHelperFunctions.create_physical_nodes(16, [1]*16, [1]*16, [1]*16)
+                logical_nodes = map_nodes + [shuffle_node] + reduce_nodes
+                total_time = simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, continuous_time=continuous_time)
+                self.assertTrue(all(lnode.state is LogicalNodeState.COMPLETED for lnode in logical_nodes))
+                runs.append((total_time, sum(pnode.failed for pnode in physical_nodes)))
+            # the same physical nodes fail, and nothing waits for the end of a timestep
+            self.assertEqual(runs[0][1], runs[1][1])
+            self.assertLess(runs[1][0], runs[0][0])
+            failed += runs[0][1]
+        self.assertGreater(failed, 0)
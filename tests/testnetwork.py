@@ -0,0 +1,98 @@
+import unittest
+import random
+import numpy as np
+from simulator.nodes import Config, Input, MapNode, bandwidth
+from simulator.network import TopologyNetwork
+from simulator.simulator import simulate
+from simulator.mrscheduler import MRScheduler
+from simulator.timer import Timer
+from tests.mrhelperfunctions import MRHelperFunctions
+
+class TestNetwork(unittest.TestCase):
+
+    def setUp(self):
+        Config.FAILURE_PROBABILITY = 0
+        Config.STRAGGLER_PROBABILITY = 0
+
+    def tearDown(self):
+        Config.reset()
+
+    def create_network(self, nics=None):
+        # 2 pods of 2 racks of 2 physical nodes
+        nics = nics if nics is not None else [50]*8
+        physical_nodes = MRHelperFunctions.create_physical_nodes(8, [1]*8, [1]*8, nics)
+        network = TopologyNetwork.evenly(physical_nodes, 2, 2, intra_rack=100, inter_rack=10, inter_pod=1, external=20)
+        return physical_nodes, network
+
+    def test_multiplier(self):
+        '''
+            Function to test transfer times within a rack, within a pod, between pods and from outside
+        '''
+        physical_nodes, network = self.create_network()
+        self.assertEqual(list(network.rack), [0, 0, 1, 1, 2, 2, 3, 3])
+        self.assertEqual(list(network.pod), [0, 0, 0, 0, 1, 1, 1, 1])
+
+        self.assertEqual(bandwidth(physical_nodes[0], physical_nodes[0]), 0)
+        self.assertEqual(bandwidth(physical_nodes[0], physical_nodes[1]), 1/50)
+        self.assertEqual(bandwidth(physical_nodes[0], physical_nodes[3]), 1/10)
+        self.assertEqual(bandwidth(physical_nodes[0], physical_nodes[5]), 1)
+        self.assertEqual(bandwidth(None, physical_nodes[5]), 1/20)
+
+        # the slowest NIC of the two ends limits the transfer
+        physical_nodes, network = self.create_network([50, 5] + [50]*5 + [None])
+        self.assertEqual(bandwidth(physical_nodes[0], physical_nodes[1]), 1/5)
+        self.assertEqual(bandwidth(physical_nodes[1], physical_nodes[2]), 1/5)
+        self.assertEqual(bandwidth(physical_nodes[6], physical_nodes[7]), 1/50)
+        self.assertEqual(bandwidth(None, physical_nodes[7]), 1/20)
+
+        # without a network model, bandwidth stays uniform
+        other_nodes = MRHelperFunctions.create_physical_nodes(2, [1]*2, [1]*2, [50]*2)
+        self.assertEqual(bandwidth(other_nodes[0], other_nodes[1]), Config.BANDWIDTH_MULTIPLIER)
+
+    def test_multipliers(self):
+        '''
+            Function to test that the vectorized transfer times match the single ones
+        '''
+        physical_nodes, network = self.create_network([50, 5, 200, 50, 1, 50, None, 50])
+        targets = network.positions(physical_nodes)
+        for source in physical_nodes:
+            expected = [bandwidth(source, target) for target in physical_nodes]
+            self.assertEqual(list(network.multipliers(source, targets)), expected)
+
+        with self.assertRaises(ValueError):
+            TopologyNetwork(physical_nodes, [0, 1])
+
+    def test_update_time(self):
+        '''
+            Function to test that input arrival times go through the network model
+        '''
+        physical_nodes, network = self.create_network()
+        timer = Timer()
+        inp = Input(10, None, physical_nodes[0])
+        inp.update_time(timer, physical_nodes[4])
+        self.assertEqual(inp.timestamp, 10)
+        inp.update_time(timer, physical_nodes[1])
+        self.assertEqual(inp.timestamp, 10/50)
+
+    def test_simulate(self):
+        '''
+            Function to test that a faster network shortens a map-reduce job, with explicit and stage edges alike
+        '''
+        total_times = []
+        for inter_pod in [1, 10, None]:
+            runs = []
+            for stage_edges in [False, True]:
+                map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(
+                    24, [1 + i % 5 for i in range(24)], 6, stage_edges)
+                physical_nodes = MRHelperFunctions.create_physical_nodes(16, [1]*16, [1]*16, [100]*16)
+                TopologyNetwork.evenly(physical_nodes, 4, 2, intra_rack=100, inter_rack=10, inter_pod=inter_pod)
+                logical_nodes = map_nodes + [shuffle_node] + reduce_nodes
+                total_time = simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False)
+                runs.append((total_time, [(lnode.schedule_time, lnode.comp_start_time, lnode.comp_end_time) for lnode in logical_nodes]))
+            self.assertEqual(runs[0], runs[1])
+            total_times.append(runs[0][0])
+        self.assertGreater(total_times[0], total_times[1])
+        self.assertGreaterEqual(total_times[1], total_times[2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+import unittest
+import random
+from simulator.nodes import LogicalNode, PhysicalNode, MapNode, ShuffleNode, Input, InputSummary, Config, StragglerBatch, failure, failure_times, batched_comp_length, compute_speed, spill_time
+from simulator.timer import Timer
+
+class TestFailure(unittest.TestCase):
+
+    def tearDown(self):
+        Config.reset()
+
+    def test_failure_time_distribution(self):
+        '''
+            Function to test that sampled failure times follow the per-timestep coin flips of failure()
+        '''
+        Config.FAILURE_PROBABILITY = 0.05
+        random.seed(0)
+        samples = 20000
+
+        sampled = failure_times(samples).tolist()
+
+        # count the timesteps until failure() first fails a node
+        stepped = []
+        for i in range(samples):
+            pnode = PhysicalNode()
+            time = 1
+            while not failure([pnode], 1):
+                time += 1
+            stepped.append(time)
+
+        mean = 1 / Config.FAILURE_PROBABILITY
+        self.assertAlmostEqual(sum(sampled) / samples, mean, delta=0.05 * mean)
+        self.assertAlmostEqual(sum(stepped) / samples, mean, delta=0.05 * mean)
+        for t in [1, 5, 20, 60]:
+            expected = (1 - Config.FAILURE_PROBABILITY) ** t
+            self.assertAlmostEqual(sum(1 for x in sampled if x > t) / samples, expected, delta=0.02)
+            self.assertAlmostEqual(sum(1 for x in stepped if x > t) / samples, expected, delta=0.02)
+        self.assertTrue(all(x >= 1 for x in sampled))
+
+    def test_failure_time_edge_cases(self):
+        '''
+            Function to test failure times when nodes never or always fail
+        '''
+        Config.FAILURE_PROBABILITY = 0
+        self.assertIsNone(failure_times(10))
+        Config.FAILURE_PROBABILITY = 1
+        self.assertEqual(failure_times(3).tolist(), [1, 1, 1])
+
+    def test_continuous_failure_times(self):
+        '''
+            Function to test that continuous failure times give the same chance of lasting past a time as failure()
+        '''
+        Config.FAILURE_PROBABILITY = 0.05
+        random.seed(0)
+        sampled = failure_times(20000, continuous=True)
+
+        for time in [1, 5, 20]:
+            self.assertAlmostEqual((sampled > time).mean(), (1 - 0.05) ** time, delta=0.01)
+        Config.FAILURE_PROBABILITY = 1
+        self.assertEqual(list(failure_times(3, continuous=True)), [0, 0, 0])
+
+    def test_failure_over_several_timesteps(self):
+        '''
+            Function to test that failure() scales with the length of the time step
+        '''
+        Config.FAILURE_PROBABILITY = 0.01
+        random.seed(0)
+        pnodes = [PhysicalNode() for i in range(20000)]
+
+        failed = len(failure(pnodes, 10))
+        expected = 1 - (1 - Config.FAILURE_PROBABILITY) ** 10
+        self.assertAlmostEqual(failed / len(pnodes), expected, delta=0.01)
+
+        # failed physical nodes never fail again
+        for pnode in pnodes[:10000]:
+            pnode.failed = True
+        self.assertTrue(all(pn in pnodes[10000:] for pn in failure(pnodes, 10)))
+
+class TestLogicalNode(unittest.TestCase):
+
+    def tearDown(self):
+        Config.reset()
+
+    def test_compute_speed(self):
+        '''
+            Function to test the compute speed of physical nodes, with and without a compute power
+        '''
+        self.assertEqual(compute_speed(PhysicalNode(compute_power=4)), 4)
+        self.assertEqual(compute_speed(PhysicalNode(compute_power=0.5)), 0.5)
+        self.assertEqual(compute_speed(PhysicalNode()), 1)
+        self.assertEqual(compute_speed(PhysicalNode(compute_power=4, slots=2)), 4)
+        self.assertEqual(compute_speed(PhysicalNode(compute_power=4, slots=2, share_compute=True)), 2)
+
+    def test_spill_time(self):
+        '''
+            Function to test the memory needed by logical nodes and the time they spill for without enough of it
+        '''
+        node = LogicalNode(input_q=[Input(30, 0, None)])
+        self.assertEqual(node.memory_size, 0)
+        self.assertEqual(spill_time(node, PhysicalNode(memory=10)), 0)
+
+        Config.MEMORY_MULTIPLIER = 2
+        Config.SPILL_LENGTH_MULTIPLIER = 0.5
+        self.assertEqual(node.memory_size, 60)
+        self.assertEqual(spill_time(node, PhysicalNode(memory=10)), 25)
+        self.assertEqual(spill_time(node, PhysicalNode(memory=100)), 0)
+        self.assertEqual(spill_time(node, PhysicalNode()), 0)
+
+        node.memory_length = lambda size: 15
+        self.assertEqual(spill_time(node, PhysicalNode(memory=10)), 2.5)
+
+    def test_cached_sizes(self):
+        '''
+            Function to test that cached input and output sizes follow changes to the inputs
+        '''
+        node = LogicalNode(input_q=[Input(2, 0, None)])
+        self.assertEqual(node.input_size, 2)
+        self.assertEqual(node.output_size, 2)
+
+        node.input_q.append(Input(3, 0, None))
+        self.assertEqual(node.input_size, 5)
+        node.input_q += [Input(1, 0, None)]
+        self.assertEqual(node.input_size, 6)
+        node.input_q.pop()
+        self.assertEqual(node.input_size, 5)
+        node.input_q[0] = Input(4, 0, None)
+        self.assertEqual(node.input_size, 7)
+
+        node.output_length = lambda size: size * 10
+        self.assertEqual(node.output_size, 70)
+        node.input_q = [Input(1, 0, None)]
+        self.assertEqual(node.input_size, 1)
+        self.assertEqual(node.output_size, 10)
+
+    def test_slots(self):
+        '''
+            Function to test that nodes do not carry a per-object dictionary
+        '''
+        for node in [LogicalNode(), MapNode(), PhysicalNode(), Input(1, 0, None)]:
+            self.assertFalse(hasattr(node, '__dict__'))
+
+    def test_input_summary(self):
+        '''
+            Function to test that an input summary arrives when the inputs it stands for would
+        '''
+        timer = Timer()
+        sources = [PhysicalNode(compute_power=1, memory=1, bandwidth=1) for i in range(3)]
+        node = ShuffleNode(in_neighbors=[MapNode() for i in range(4)])
+        node.input_summary = InputSummary(node)
+        self.assertFalse(node.schedulable())
+
+        # inputs received before the node has a physical node
+        node.input_summary.receive(5, sources[0], timer, None)
+        node.input_summary.receive(2, sources[1], timer, None)
+        self.assertEqual(node.input_count, 2)
+        self.assertEqual(len(node.input_q), 1)
+        self.assertTrue(node.schedulable())
+        self.assertFalse(node.inputs_present())
+        self.assertIsNone(node.input_q[0].timestamp)
+
+        # from the node's own physical node, the largest input arrives right away
+        timer.time = 3
+        node.pnode = sources[0]
+        node.input_q[0].update_time(timer, sources[0])
+        self.assertEqual(node.input_q[0].timestamp, 5)
+
+        # inputs received afterwards go straight to it
+        timer.time = 4
+        node.input_summary.receive(1, sources[2], timer, sources[0])
+        node.input_summary.receive(9, sources[0], timer, sources[0])
+        self.assertTrue(node.inputs_present())
+        self.assertEqual(node.input_size, 17)
+        self.assertEqual(node.input_q[0].timestamp, 5)
+
+        # after a failure, everything is sent again
+        node.input_q[0].timestamp = None
+        timer.time = 10
+        node.input_q[0].update_time(timer, sources[1])
+        self.assertEqual(node.input_q[0].timestamp, 19)
+
+class TestStragglers(unittest.TestCase):
+
+    def tearDown(self):
+        Config.reset()
+
+    def test_straggler_batch(self):
+        '''
+            Function to test that batched straggler times match the probability and length of straggler_time
+        '''
+        Config.STRAGGLER_PROBABILITY = 0.1
+        Config.STRAGGLER_LENGTH_MULTIPLIER = 2
+        random.seed(0)
+
+        # more calls than the batch holds, so it has to draw again
+        stragglers = StragglerBatch(1000)
+        extras = [stragglers(3) for i in range(20000)]
+
+        self.assertTrue(all(x in (0, 6) for x in extras))
+        self.assertAlmostEqual(extras.count(6) / len(extras), 0.1, delta=0.01)
+
+    def test_batched_comp_length(self):
+        '''
+            Function to test computation lengths with batched stragglers
+        '''
+        Config.STRAGGLER_PROBABILITY = 0
+        comp_length = batched_comp_length(10)
+        self.assertEqual([comp_length(4) for i in range(15)], [4] * 15)
+
+        Config.STRAGGLER_PROBABILITY = 1
+        comp_length = batched_comp_length(10)
+        self.assertEqual(comp_length(4), 4 + 4 * Config.STRAGGLER_LENGTH_MULTIPLIER)
@@ -0,0 +1,96 @@
+import unittest
+import random
+from simulator.nodes import LogicalNode, PhysicalNode, Input, MapNode, LogicalNodeState, Config
+from simulator.nodetable import LogicalNodeTable
+from simulator.simulator import simulate
+from simulator.mrscheduler import MRScheduler
+from simulator.daskscheduler import DaskScheduler
+from tests.mrhelperfunctions import MRHelperFunctions
+
+class TestLogicalNodeTable(unittest.TestCase):
+
+    def setUp(self):
+        Config.FAILURE_PROBABILITY = 0
+        Config.STRAGGLER_PROBABILITY = 0
+
+    def tearDown(self):
+        Config.reset()
+
+    def test_bind_unbind(self):
+        '''
+            Function to test that bound logical nodes read and write the table and get their values back afterwards
+        '''
+        physical_node = PhysicalNode(compute_power=1, memory=1, bandwidth=1)
+        map_node = MapNode(input_q=[Input(3, 0, None)])
+        other_node = LogicalNode()
+        other_node.schedule_time = 0
+
+        table = LogicalNodeTable([map_node, other_node], [physical_node])
+        table.bind()
+        self.assertIsInstance(map_node, MapNode)
+        self.assertEqual(type(map_node).__name__, 'MapNodeView')
+        self.assertEqual(map_node.input_size, 3)
+
+        map_node.state = LogicalNodeState.COMPUTING
+        map_node.pnode = physical_node
+        map_node.comp_end_time = 5
+        self.assertEqual(table.state[0], LogicalNodeState.COMPUTING.value)
+        self.assertEqual(table.pnode[0], 0)
+        self.assertEqual(list(table.finished(4)), [])
+        self.assertEqual(list(table.finished(5)), [0])
+        self.assertEqual(table.next_time(), 5)
+        self.assertEqual(list(table.pending_rows()), [0])
+
+        other_node.state = LogicalNodeState.NEED_INPUT
+        table.set_arrival(1, 2.5)
+        self.assertEqual(list(table.arrived(3)), [1])
+        self.assertEqual(table.next_time(), 2.5)
+        other_node.comp_start_time = 2.5
+
+        # only the rows with a time to wait for are scanned
+        map_node.state = LogicalNodeState.COMPLETED
+        self.assertEqual(list(table.pending_rows()), [1])
+        self.assertEqual(list(table.finished(5)), [])
+
+        table.unbind()
+        self.assertIs(type(map_node), MapNode)
+        self.assertIs(map_node.pnode, physical_node)
+        self.assertIs(map_node.state, LogicalNodeState.COMPLETED)
+        self.assertIs(type(map_node.comp_end_time), int)
+        self.assertEqual(map_node.comp_end_time, 5)
+        self.assertIsNone(map_node.schedule_time)
+        self.assertIs(type(other_node.schedule_time), int)
+        self.assertEqual(other_node.schedule_time, 0)
+        self.assertEqual(other_node.comp_start_time, 2.5)
+        self.assertIsNone(other_node.pnode)
+
+    def test_node_table_total_time(self):
+        '''
+            Function to test that simulating with the node table gives the same total times
+        '''
+        for scheduler in [MRScheduler, DaskScheduler]:
+            for seed in range(3):
+                total_times = []
+                for node_table in [False, True]:
+                    random.seed(seed)
+                    num_map_nodes = random.randint(5, 30)
+                    num_reduce_nodes = random.randint(1, 8)
+                    num_physical_nodes = random.randint(2, 10)
+                    map_sizes = [random.randint(1, 5) for i in range(num_map_nodes)]
+
+                    map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(num_map_nodes, map_sizes, num_reduce_nodes)
+                    physical_nodes = MRHelperFunctions.create_physical_nodes(
+                        num_physical_nodes,
+                        [1]*num_physical_nodes,
+                        [1]*num_physical_nodes,
+                        [1]*num_physical_nodes)
+
+                    logical_nodes = []
+                    logical_nodes.extend(map_nodes)
+                    logical_nodes.append(shuffle_node)
+                    logical_nodes.extend(reduce_nodes)
+
+                    total_times.append(simulate(logical_nodes, physical_nodes, scheduler, verbose=False, node_table=node_table))
+                    self.assertTrue(all(lnode.state is LogicalNodeState.COMPLETED for lnode in logical_nodes))
+
+                self.assertEqual(total_times[0], total_times[1])
@@ -0,0 +1,73 @@
+import unittest
+from simulator.nodes import Config
+from simulator.options import SimulationOptions
+from simulator.speculation import Speculation
+from simulator.simulator import simulate
+from simulator.mrscheduler import MRScheduler
+from tests.mrhelperfunctions import MRHelperFunctions
+
+class TestSimulationOptions(unittest.TestCase):
+
+    def setUp(self):
+        Config.FAILURE_PROBABILITY = 0
+        Config.STRAGGLER_PROBABILITY = 0
+
+    def tearDown(self):
+        Config.reset()
+
+    def create_graph(self):
+        map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(6, [1, 2, 3, 4, 5, 6], 2)
+        physical_nodes = MRHelperFunctions.create_physical_nodes(4, [1]*4, [1]*4, [1]*4)
+        return map_nodes + [shuffle_node] + reduce_nodes, physical_nodes
+
+    def test_validate(self):
+        '''
+            Function to test that options which cannot be used together are refused when built
+        '''
+        for switches in [{'continuous_time': True, 'event_driven': False},
+                         {'speculation': Speculation(), 'node_table': True},
+                         {'speculation': Speculation(), 'resume_from': 'unused'},
+                         {'contention': True, 'aggregate_inputs': True},
+                         {'contention': True, 'checkpoint_path': 'unused', 'checkpoint_every': 5},
+                         {'checkpoint_path': 'unused'}]:
+            with self.assertRaises(ValueError):
+                SimulationOptions(**switches)
+        options = SimulationOptions(contention=True, continuous_time=True, compute_speeds=True)
+        self.assertTrue(options.enabled('contention'))
+        self.assertFalse(options.enabled('speculation'))
+        self.assertFalse(options.checkpoints)
+
+    def test_simulate(self):
+        '''
+            Function to test that simulating with options gives the same total time as with keyword arguments
+        '''
+        total_times = []
+        for use_options in [False, True]:
+            logical_nodes, physical_nodes = self.create_graph()
+            switches = {'continuous_time': True, 'aggregate_inputs': True}
+            if use_options:
+                total_times.append(simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False,
+                                            options=SimulationOptions(**switches)))
+            else:
+                total_times.append(simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, **switches))
+        self.assertEqual(total_times[0], total_times[1])
+
+        logical_nodes, physical_nodes = self.create_graph()
+        with self.assertRaises(TypeError):
+            simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False,
+                     options=SimulationOptions(), node_table=True)
+        with self.assertRaises(TypeError):
+            simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, unknown=True)
+
+    def test_check(self):
+        '''
+            Function to test that options which cannot be used with the graph are refused by simulate
+        '''
+        logical_nodes, physical_nodes = self.create_graph()
+        physical_nodes[0].share_compute = True
+        with self.assertRaises(ValueError):
+            SimulationOptions().check(logical_nodes, physical_nodes)
+        SimulationOptions(compute_speeds=True).check(logical_nodes, physical_nodes)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,187 @@
+import unittest
+import random
+from simulator.nodes import LogicalNodeState, Config
+from simulator.scheduler import Scheduler, StaticScheduler, create_scheduler
+from simulator.mrscheduler import MRScheduler
+from simulator.simplequeuescheduler import SimpleQueueScheduler
+from simulator.simulator import simulate
+from tests.mrhelperfunctions import MRHelperFunctions
+
+# Scheduler written against the static schedule function protocol
+class StaticFirstFitScheduler:
+    @staticmethod
+    def schedule(logical_nodes, physical_nodes, completed_nodes=[], failed_nodes=[], ready_nodes=None, free_pnodes=None):
+        scheduled_pairs = []
+        for logical_node in ready_nodes:
+            physical_node = free_pnodes.first()
+            if physical_node is None:
+                break
+            scheduled_pairs.append((logical_node, physical_node))
+            free_pnodes.take(physical_node)
+        return scheduled_pairs
+
+# MRScheduler that checks and counts the notifications it gets
+class RecordingScheduler(MRScheduler):
+    def __init__(self, logical_nodes, physical_nodes):
+        super().__init__(logical_nodes, physical_nodes)
+        self.counts = {'assigned': 0, 'completed': 0, 'failed': 0, 'freed': 0, 'lost': 0}
+
+    def node_ready(self, lnode):
+        assert lnode.schedulable()
+        super().node_ready(lnode)
+
+    def node_assigned(self, lnode, pnode):
+        assert lnode.pnode is pnode and lnode in pnode.lnodes and len(pnode.lnodes) <= pnode.slots
+        self.counts['assigned'] += 1
+        super().node_assigned(lnode, pnode)
+
+    def node_completed(self, lnode):
+        assert lnode.state is LogicalNodeState.COMPLETED
+        self.counts['completed'] += 1
+        super().node_completed(lnode)
+
+    def node_failed(self, lnode):
+        assert lnode.state is LogicalNodeState.FAILED and lnode.pnode.failed
+        self.counts['failed'] += 1
+        super().node_failed(lnode)
+
+    def pnode_freed(self, pnode):
+        assert pnode.schedulable()
+        self.counts['freed'] += 1
+        super().pnode_freed(pnode)
+
+    def pnode_lost(self, pnode):
+        assert pnode.failed
+        self.counts['lost'] += 1
+        super().pnode_lost(pnode)
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        Config.FAILURE_PROBABILITY = 0
+        Config.STRAGGLER_PROBABILITY = 0
+
+    def tearDown(self):
+        Config.reset()
+
+    def create_graph(self):
+        map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(40, [1]*40, 10)
+        physical_nodes = MRHelperFunctions.create_physical_nodes(12, [1]*12, [1]*12, [1]*12)
+        return map_nodes + [shuffle_node] + reduce_nodes, physical_nodes
+
+    def test_create_scheduler(self):
+        '''
+            Function to test that scheduler classes are created and static ones wrapped
+        '''
+        logical_nodes, physical_nodes = self.create_graph()
+        scheduler = create_scheduler(MRScheduler, logical_nodes, physical_nodes)
+        self.assertIsInstance(scheduler, MRScheduler)
+        self.assertEqual(len(scheduler.ready), 40)
+        self.assertEqual(len(scheduler.free_pnodes), 12)
+
+        scheduler = create_scheduler(StaticFirstFitScheduler, logical_nodes, physical_nodes)
+        self.assertIsInstance(scheduler, StaticScheduler)
+        self.assertEqual([pair[0] for pair in scheduler.assign()], logical_nodes[:12])
+
+        with self.assertRaises(NotImplementedError):
+            Scheduler(logical_nodes, physical_nodes).assign()
+
+    def test_notification_counts(self):
+        '''
+            Function to test the number of notifications of each kind in a simulation with failures
+        '''
+        Config.FAILURE_PROBABILITY = 0.005
+        random.seed(1)
+        logical_nodes, physical_nodes = self.create_graph()
+        created = []
+
+        class CountingScheduler(RecordingScheduler):
+            def __init__(self, lnodes, pnodes):
+                super().__init__(lnodes, pnodes)
+                created.append(self)
+
+        simulate(logical_nodes, physical_nodes, CountingScheduler, verbose=False)
+        self.assertEqual(len(created), 1)
+        counts = created[0].counts
+        lost = sum(pnode.failed for pnode in physical_nodes)
+        self.assertGreater(counts['failed'], 0)
+        self.assertEqual(counts['lost'], lost)
+        self.assertEqual(counts['completed'], len(logical_nodes))
+        self.assertEqual(counts['freed'], len(logical_nodes))
+        self.assertEqual(counts['assigned'], len(logical_nodes) + counts['failed'])
+        self.assertEqual(len(created[0].ready), 0)
+        self.assertEqual(len(created[0].free_pnodes), len(physical_nodes) - lost)
+
+    def test_slots(self):
+        '''
+            Function to test physical nodes running several logical nodes at once, with failures and shared compute power
+        '''
+        total_times = {}
+        for slots, share_compute, probability in [(1, False, 0), (4, False, 0), (4, True, 0), (4, False, 0.005)]:
+            Config.FAILURE_PROBABILITY = probability
+            random.seed(1)
+            created = []
+
+            class CountingScheduler(RecordingScheduler):
+                def __init__(self, lnodes, pnodes):
+                    super().__init__(lnodes, pnodes)
+                    created.append(self)
+
+            logical_nodes, physical_nodes = self.create_graph()
+            for pnode in physical_nodes[3:]:
+                pnode.failed = True
+            for pnode in physical_nodes:
+                pnode.slots = slots
+                pnode.share_compute = share_compute
+            total_times[slots, share_compute, probability] = simulate(
+                logical_nodes, physical_nodes, CountingScheduler, verbose=False, compute_speeds=True)
+            counts = created[0].counts
+            self.assertEqual(counts['completed'], len(logical_nodes))
+            self.assertEqual(counts['assigned'], len(logical_nodes) + counts['failed'])
+            live = [pnode for pnode in physical_nodes if not pnode.failed]
+            self.assertTrue(all(pnode.lnodes == [] for pnode in live))
+            self.assertEqual(len(created[0].free_pnodes), len(live))
+            self.assertEqual(sum(created[0].free_pnodes.slots(pnode) for pnode in live), slots * len(live))
+            if probability > 0:
+                # a failure aborts every logical node running on the physical node
+                self.assertGreater(counts['failed'], counts['lost'])
+
+        # 3 physical nodes of 4 slots beat 3 of one slot, unless the slots
+        # share the compute power of one
+        self.assertLess(total_times[4, False, 0], total_times[1, False, 0])
+        self.assertGreater(total_times[4, True, 0], total_times[4, False, 0])
+
+        # sharing the compute power only means something with compute speeds
+        logical_nodes, physical_nodes = self.create_graph()
+        physical_nodes[0].share_compute = True
+        with self.assertRaises(ValueError):
+            simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False)
+
+    def test_static_scheduler(self):
+        '''
+            Function to test that a static scheduler gives the same schedule as the scheduler it mirrors
+        '''
+        Config.FAILURE_PROBABILITY = 0.002
+        for seed in range(3):
+            total_times = []
+            schedules = []
+            for scheduler_class in [StaticFirstFitScheduler, SimpleQueueScheduler]:
+                random.seed(seed)
+                logical_nodes, physical_nodes = self.create_graph()
+                total_times.append(simulate(logical_nodes, physical_nodes, scheduler_class, verbose=False))
+                schedules.append([(lnode.schedule_time, physical_nodes.index(lnode.pnode)) for lnode in logical_nodes])
+            self.assertEqual(total_times[0], total_times[1])
+            self.assertEqual(schedules[0], schedules[1])
+
+    def test_schedule_once(self):
+        '''
+            Function to test scheduling once from scratch with the schedule class method
+        '''
+        logical_nodes, physical_nodes = self.create_graph()
+        scheduled_pairs = MRScheduler.schedule(logical_nodes, physical_nodes)
+        self.assertEqual(scheduled_pairs, list(zip(logical_nodes[:12], physical_nodes)))
+        # nothing is kept between calls
+        self.assertEqual(MRScheduler.schedule(logical_nodes, physical_nodes), scheduled_pairs)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+import random
+from simulator.nodes import Config, LogicalNodeType
+from simulator.simulator import simulate
+from simulator.mrscheduler import MRScheduler
+from simulator.speculation import Speculation
+from simulator.tracing import Trace, ListWriter, EventType
+from tests.mrhelperfunctions import MRHelperFunctions
+from tests.testscheduler import RecordingScheduler
+
+class TestSpeculation(unittest.TestCase):
+
+    def setUp(self):
+        Config.FAILURE_PROBABILITY = 0
+        Config.STRAGGLER_PROBABILITY = 0
+
+    def tearDown(self):
+        Config.reset()
+
+    def create_graph(self, slow_length, slow_calls=1):
+        # 20 maps of length 5 into a reduce node; map 3 takes `slow_length`
+        # the first `slow_calls` times its length is asked for
+        map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(20, [5]*20, 1)
+        calls = []
+
+        def slow_comp_length(size):
+            calls.append(size)
+            return slow_length if len(calls) <= slow_calls else size
+
+        map_nodes[3].comp_length = slow_comp_length
+        for map_node in map_nodes:
+            map_node.output_length = lambda size: 0
+        physical_nodes = MRHelperFunctions.create_physical_nodes(24, [1]*24, [1]*24, [1]*24)
+        return map_nodes + [shuffle_node] + reduce_nodes, physical_nodes
+
+    def test_backup_wins(self):
+        '''
+            Function to test that a backup of a straggler finishing first shortens the job
+        '''
+        for continuous_time, expected, saved in [(False, [56, 24], 32), (True, [55, 22.5], 32.5)]:
+            total_times = []
+            for speculation in [None, Speculation()]:
+                logical_nodes, physical_nodes = self.create_graph(50)
+                writer = ListWriter()
+                total_times.append(simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, trace=Trace(writer),
+                                            continuous_time=continuous_time, speculation=speculation))
+            self.assertEqual(total_times, expected)
+            self.assertEqual((speculation.launched, speculation.won, speculation.killed, speculation.lost), (1, 1, 0, 0))
+            self.assertEqual(speculation.saved, saved)
+
+            # the original copy is killed, and the node finishes where its backup ran
+            events = [(event.type, event.lnode, event.pnode) for event in writer.events
+                      if event.type in (EventType.BACKUP, EventType.KILLED)]
+            straggler = logical_nodes[3]
+            self.assertEqual(events, [(EventType.BACKUP, straggler.id, straggler.pnode.id),
+                                      (EventType.KILLED, straggler.id, physical_nodes[3].id)])
+            self.assertTrue(all(pnode.lnode is None for pnode in physical_nodes))
+
+    def test_original_wins(self):
+        '''
+            Function to test that a backup slower than the original is killed
+        '''
+        total_times = []
+        for speculation in [None, Speculation()]:
+            logical_nodes, physical_nodes = self.create_graph(50, slow_calls=2)
+            total_times.append(simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, speculation=speculation))
+        self.assertEqual(total_times[0], total_times[1])
+        self.assertEqual((speculation.launched, speculation.won, speculation.killed), (1, 0, 1))
+        self.assertEqual(logical_nodes[3].pnode, physical_nodes[3])
+        self.assertTrue(all(pnode.lnode is None for pnode in physical_nodes))
+
+    def test_median(self):
+        '''
+            Function to test that nodes are only checked once enough of their stage completed
+        '''
+        for min_completed, launched in [(5, 1), (20, 0)]:
+            logical_nodes, physical_nodes = self.create_graph(50)
+            speculation = Speculation(min_completed=min_completed)
+            simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, speculation=speculation)
+            self.assertEqual(speculation.launched, launched)
+            self.assertEqual(speculation.median(LogicalNodeType.MAP), 5)
+
+    def test_failures(self):
+        '''
+            Function to test that jobs with stragglers and failures complete, with every backup accounted for
+        '''
+        Config.FAILURE_PROBABILITY = 0.003
+        Config.STRAGGLER_PROBABILITY = 0.2
+        Config.STRAGGLER_LENGTH_MULTIPLIER = 5
+        launched = 0
+        promoted = 0
+        for seed in range(10):
+            random.seed(seed)
+            map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(40, [3 + i % 4 for i in range(40)], 6)
+            physical_nodes = MRHelperFunctions.create_physical_nodes(40, [1]*40, [1]*40, [1]*40)
+            logical_nodes = map_nodes + [shuffle_node] + reduce_nodes
+            speculation = Speculation(slowdown=1.3, min_completed=3)
+            try:
+                simulate(logical_nodes, physical_nodes, RecordingScheduler, verbose=False, speculation=speculation)
+            except RuntimeError:
+                continue
+            self.assertTrue(all(lnode.comp_end_time is not None for lnode in logical_nodes))
+            self.assertTrue(all(pnode.lnode is None for pnode in physical_nodes if not pnode.failed))
+            self.assertEqual(speculation.launched,
+                             speculation.won + speculation.killed + speculation.promoted + speculation.lost)
+            self.assertEqual(speculation.backups, {})
+            launched += speculation.launched
+            promoted += speculation.promoted
+        self.assertGreater(launched, 0)
+        # backups whose original lost its physical node are not counted as won
+        self.assertGreater(promoted, 0)
+
+    def test_unsupported(self):
+        '''
+            Function to test that speculation is refused where it is not modeled
+        '''
+        logical_nodes, physical_nodes = self.create_graph(50)
+        for options in [{'node_table': True}, {'contention': True}, {'checkpoint_path': 'unused'}]:
+            with self.assertRaises(ValueError):
+                simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, speculation=Speculation(), **options)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import random
+from simulator.nodes import MapNode, Input, LogicalNodeState, Config
+from simulator.speedscheduler import SpeedScheduler
+from simulator.mrscheduler import MRScheduler
+from simulator.simulator import simulate
+from tests.mrhelperfunctions import MRHelperFunctions
+
+class TestSpeedScheduler(unittest.TestCase):
+
+    def setUp(self):
+        Config.FAILURE_PROBABILITY = 0
+        Config.STRAGGLER_PROBABILITY = 0
+
+    def tearDown(self):
+        Config.reset()
+
+    def test_compute_speeds(self):
+        '''
+            Function to test that computation lengths are divided by the compute power of the physical node
+        '''
+        for compute_power, expected in [(1, 4), (2, 2), (4, 1), (0.5, 8)]:
+            map_node = MapNode(input_q=[Input(4, 0, None)])
+            physical_nodes = MRHelperFunctions.create_physical_nodes(1, [compute_power], [1], [1])
+            self.assertEqual(simulate([map_node], physical_nodes, MRScheduler, verbose=False, compute_speeds=True), expected)
+            self.assertEqual(map_node.comp_end_time - map_node.comp_start_time, expected)
+
+            # without compute_speeds, compute power is ignored
+            map_node = MapNode(input_q=[Input(4, 0, None)])
+            self.assertEqual(simulate([map_node], physical_nodes, MRScheduler, verbose=False), 4)
+
+    def test_largest_on_fastest(self):
+        '''
+            Function to test that the largest logical nodes go to the fastest physical nodes
+        '''
+        sizes = [2, 8, 1, 4]
+        map_nodes = [MapNode(input_q=[Input(size, 0, None)]) for size in sizes]
+        physical_nodes = MRHelperFunctions.create_physical_nodes(4, [1, 4, 2, 8], [1]*4, [1]*4)
+
+        scheduled_pairs = SpeedScheduler.schedule(map_nodes, physical_nodes)
+        placement = {lnode.id: pnode.compute_power for lnode, pnode in scheduled_pairs}
+        self.assertEqual([placement[lnode.id] for lnode in map_nodes], [2, 8, 1, 4])
+
+        # every map node takes a single timestep on its physical node
+        total_time = simulate(map_nodes, physical_nodes, SpeedScheduler, verbose=False, compute_speeds=True)
+        self.assertEqual(total_time, 1)
+
+    def test_fewer_physical_nodes(self):
+        '''
+            Function to test that the fastest physical nodes are reused as they become free
+        '''
+        sizes = [1, 8, 1, 1]
+        map_nodes = [MapNode(input_q=[Input(size, 0, None)]) for size in sizes]
+        physical_nodes = MRHelperFunctions.create_physical_nodes(2, [1, 8], [1]*2, [1]*2)
+
+        total_time = simulate(map_nodes, physical_nodes, SpeedScheduler, verbose=False, compute_speeds=True)
+        # the large map goes to the fast node first, then the small ones use both once
+        # they are free again, in the timestep after
+        self.assertEqual(map_nodes[1].pnode.compute_power, 8)
+        self.assertEqual(map_nodes[1].schedule_time, 0)
+        self.assertEqual(total_time, 3)
+
+    def test_map_reduce_heterogeneous(self):
+        '''
+            Function to test a map-reduce graph on a mixed fleet, with failures
+        '''
+        Config.FAILURE_PROBABILITY = 0.002
+        speeds = [0.5, 1, 2, 4] * 4
+        for seed in range(3):
+            total_times = []
+            for scheduler_class in [MRScheduler, SpeedScheduler]:
+                random.seed(seed)
+                map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(40, [1, 4] * 20, 8)
+                physical_nodes = MRHelperFunctions.create_physical_nodes(16, speeds, [1]*16, [1]*16)
+                logical_nodes = map_nodes + [shuffle_node] + reduce_nodes
+                total_times.append(simulate(logical_nodes, physical_nodes, scheduler_class, verbose=False, compute_speeds=True))
+                self.assertTrue(all(lnode.state is LogicalNodeState.COMPLETED for lnode in logical_nodes))
+            self.assertLessEqual(total_times[1], total_times[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import unittest
+import random
+import time
+import numpy as np
+from simulator.nodes import Config, MapNode, ReduceNode, Input
+from simulator.simulator import simulate
+from simulator.mrscheduler import MRScheduler
+from simulator.network import TopologyNetwork
+from simulator.stages import connect_stages, split_evenly
+from tests.mrhelperfunctions import MRHelperFunctions
+
+def build_map_reduce_graph(num_map_nodes, num_reduce_nodes, num_physical_nodes, stage_edges):
+    map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(
+        num_map_nodes, [1 + i % 5 for i in range(num_map_nodes)], num_reduce_nodes, stage_edges)
+    physical_nodes = MRHelperFunctions.create_physical_nodes(
+        num_physical_nodes,
+        [1]*num_physical_nodes,
+        [1]*num_physical_nodes,
+        [1]*num_physical_nodes)
+    return map_nodes + [shuffle_node] + reduce_nodes, physical_nodes
+
+class TestStages(unittest.TestCase):
+
+    def setUp(self):
+        Config.FAILURE_PROBABILITY = 0
+        Config.STRAGGLER_PROBABILITY = 0
+
+    def tearDown(self):
+        Config.reset()
+
+    def assert_same_schedule(self, num_map_nodes, num_reduce_nodes, num_physical_nodes, seed=0, rack_size=None, **kwargs):
+        '''
+            Function to check that stage edges give exactly the schedule explicit edges give
+        '''
+        runs = []
+        for stage_edges in [False, True]:
+            random.seed(seed)
+            logical_nodes, physical_nodes = build_map_reduce_graph(num_map_nodes, num_reduce_nodes, num_physical_nodes, stage_edges)
+            if rack_size is not None:
+                for i, pnode in enumerate(physical_nodes):
+                    pnode.bandwidth = 2 + i % 3
+                TopologyNetwork.evenly(physical_nodes, rack_size, 2, intra_rack=4, inter_rack=1, inter_pod=0.5)
+            total_time = simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, **kwargs)
+            runs.append((total_time,
+                         [(lnode.schedule_time, lnode.comp_start_time, lnode.comp_end_time, lnode.input_size) for lnode in logical_nodes],
+                         [pnode.failed for pnode in physical_nodes]))
+        self.assertEqual(runs[0], runs[1])
+        return runs[0][0]
+
+    def test_same_schedule(self):
+        '''
+            Function to test stage edges against explicit edges
+        '''
+        self.assert_same_schedule(1, 1, 1)
+        self.assert_same_schedule(10, 3, 4)
+        self.assert_same_schedule(30, 7, 16)
+        Config.BANDWIDTH_MULTIPLIER = 3
+        self.assert_same_schedule(30, 7, 5)
+        self.assert_same_schedule(30, 7, 5, node_table=True)
+
+    def test_same_schedule_network(self):
+        '''
+            Function to test stage edges against explicit edges with racks and pods of physical nodes
+        '''
+        self.assert_same_schedule(30, 7, 16, rack_size=2)
+        Config.FAILURE_PROBABILITY = 0.001
+        for seed in range(3):
+            self.assert_same_schedule(40, 8, 16, seed, rack_size=4)
+
+    def test_same_schedule_failures(self):
+        '''
+            Function to test stage edges against explicit edges when physical nodes fail
+        '''
+        Config.FAILURE_PROBABILITY = 0.001
+        for seed in range(5):
+            self.assert_same_schedule(40, 8, 16, seed)
+            self.assert_same_schedule(40, 8, 16, seed, event_driven=False)
+
+    def test_partition(self):
+        '''
+            Function to test splitting the outputs of a stage between its targets
+        '''
+        map_nodes = [MapNode(input_q=[Input(8, None, None)]) for i in range(3)]
+        reduce_nodes = [ReduceNode() for i in range(4)]
+        edge = connect_stages(map_nodes, reduce_nodes, split_evenly)
+        physical_nodes = MRHelperFunctions.create_physical_nodes(2, [1]*2, [1]*2, [1]*2)
+
+        self.assertEqual(reduce_nodes[0].ninputs, 1)
+        self.assertFalse(reduce_nodes[0].schedulable())
+        simulate(map_nodes + reduce_nodes, physical_nodes, MRScheduler, verbose=False)
+        self.assertTrue(edge.complete())
+        self.assertEqual([reduce_node.input_size for reduce_node in reduce_nodes], [6] * 4)
+
+        # or a different size to each target
+        map_nodes = [MapNode(input_q=[Input(8, None, None)]) for i in range(3)]
+        reduce_nodes = [ReduceNode() for i in range(4)]
+        edge = connect_stages(map_nodes, reduce_nodes, lambda size, count: np.arange(count) * size / 8)
+        simulate(map_nodes + reduce_nodes, physical_nodes, MRScheduler, verbose=False)
+        self.assertEqual([reduce_node.input_size for reduce_node in reduce_nodes], [0, 3, 6, 9])
+        self.assertEqual(len(edge.max_shares), 2)
+
+    def test_large(self):
+        '''
+            Function to test that large all-to-all stages stay cheap
+        '''
+        start = time.time()
+        logical_nodes, physical_nodes = build_map_reduce_graph(2000, 2000, 100, True)
+        total_time = simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False)
+        print("Total time: ", total_time, "in {:.2f}s".format(time.time() - start))
+        self.assertLess(time.time() - start, 30)
+
+        # a number per physical node, not an array of targets
+        edge = logical_nodes[-1].stage_inputs[0].edge
+        self.assertEqual(edge.max_shares, {})
+        self.assertLessEqual(len(edge.max_share), 2 * len(physical_nodes))
@@ -0,0 +1,145 @@
+import unittest
+from simulator.nodes import LogicalNode, PhysicalNode, Input, LogicalNodeType, MapNode
+from simulator.state import ReadySet, PhysicalNodePool, InputLocality
+
+class TestReadySet(unittest.TestCase):
+
+    def test_ready_set_order(self):
+        '''
+            Function to test that ready nodes are returned in the order of the logical node list
+        '''
+        map_nodes = [MapNode(input_q=[Input(1, 0, None)]) for i in range(4)]
+        other_node = LogicalNode(in_neighbors=[map_nodes[0]])
+        logical_nodes = [other_node] + map_nodes
+
+        ready = ReadySet(logical_nodes)
+        self.assertEqual(list(ready), map_nodes)
+        self.assertEqual(len(ready), 4)
+        self.assertNotIn(other_node, ready)
+
+        # nodes come back in list order regardless of when they became ready
+        ready.discard(map_nodes[1])
+        other_node.input_q.append(Input(1, 0, None))
+        ready.add(other_node)
+        ready.add(map_nodes[1])
+        self.assertEqual(list(ready), [other_node] + map_nodes)
+        self.assertEqual(list(ready.of_type(LogicalNodeType.MAP)), map_nodes)
+        self.assertEqual(list(ready.of_type(LogicalNodeType.OTHER)), [other_node])
+
+    def test_ready_set_discard(self):
+        '''
+            Function to test removing ready nodes, including adding them back
+        '''
+        map_nodes = [MapNode(input_q=[Input(1, 0, None)]) for i in range(100)]
+        ready = ReadySet(map_nodes)
+
+        for map_node in map_nodes[:90]:
+            ready.discard(map_node)
+            ready.discard(map_node)
+        ready.add(map_nodes[0])
+
+        self.assertEqual(len(ready), 11)
+        self.assertEqual(list(ready), [map_nodes[0]] + map_nodes[90:])
+        self.assertEqual(list(ready.of_type(LogicalNodeType.SHUFFLE)), [])
+
+class TestPhysicalNodePool(unittest.TestCase):
+
+    def test_physical_node_pool(self):
+        '''
+            Function to test taking physical nodes out of the pool and putting them back
+        '''
+        physical_nodes = [PhysicalNode(compute_power=1, memory=1, bandwidth=1) for i in range(4)]
+        physical_nodes[2].failed = True
+        pool = PhysicalNodePool(physical_nodes)
+
+        self.assertEqual(len(pool), 3)
+        self.assertEqual(list(pool), [physical_nodes[0], physical_nodes[1], physical_nodes[3]])
+        self.assertEqual(pool.first(), physical_nodes[0])
+
+        # the lowest free physical node is always handed out first
+        pool.take(physical_nodes[0])
+        pool.take(physical_nodes[1])
+        self.assertEqual(pool.first(), physical_nodes[3])
+        pool.release(physical_nodes[1])
+        self.assertEqual(pool.first(), physical_nodes[1])
+        self.assertNotIn(physical_nodes[0], pool)
+
+        # failed or busy physical nodes are not put back
+        pool.release(physical_nodes[2])
+        physical_nodes[0].lnode = LogicalNode()
+        pool.release(physical_nodes[0])
+        self.assertEqual(len(pool), 2)
+        self.assertNotIn(physical_nodes[2], pool)
+
+    def test_physical_node_pool_slots(self):
+        '''
+            Function to test that physical nodes with several slots stay in the pool until all are taken
+        '''
+        physical_nodes = [PhysicalNode(slots=3), PhysicalNode(slots=2, failed=True), PhysicalNode()]
+        physical_nodes[0].lnodes.append(LogicalNode())
+        pool = PhysicalNodePool(physical_nodes)
+        self.assertEqual(list(pool), [physical_nodes[0], physical_nodes[2]])
+        self.assertEqual(pool.slots(physical_nodes[0]), 2)
+        self.assertEqual(pool.slots(physical_nodes[1]), 0)
+
+        pool.take(physical_nodes[0])
+        self.assertEqual(pool.first(), physical_nodes[0])
+        pool.take(physical_nodes[0])
+        self.assertEqual(pool.first(), physical_nodes[2])
+
+        # releasing goes by the logical nodes actually running
+        physical_nodes[0].lnodes.append(LogicalNode())
+        pool.release(physical_nodes[0])
+        self.assertEqual(pool.slots(physical_nodes[0]), 1)
+        pool.discard(physical_nodes[0])
+        self.assertNotIn(physical_nodes[0], pool)
+        physical_nodes[0].lnodes.pop()
+        pool.release(physical_nodes[0])
+        self.assertEqual(pool.slots(physical_nodes[0]), 2)
+        self.assertEqual(pool.first(), physical_nodes[0])
+
+    def test_physical_node_pool_churn(self):
+        '''
+            Function to test that taking and releasing physical nodes over and over keeps the pool small
+        '''
+        physical_nodes = [PhysicalNode(compute_power=1, memory=1, bandwidth=1) for i in range(4)]
+        pool = PhysicalNodePool(physical_nodes)
+
+        for i in range(1000):
+            pool.take(physical_nodes[1])
+            pool.release(physical_nodes[1])
+
+        self.assertLessEqual(len(pool.heap), 2 * len(physical_nodes) + 64)
+        self.assertEqual(list(pool), physical_nodes)
+        self.assertEqual(pool.first(), physical_nodes[0])
+
+class TestInputLocality(unittest.TestCase):
+
+    def test_input_locality(self):
+        '''
+            Function to test the input sizes counted per physical node as inputs arrive and nodes are assigned
+        '''
+        pnodes = [PhysicalNode() for i in range(3)]
+        reduce_node = LogicalNode()
+        reduce_node.input_q.append(Input(5, 0, pnodes[0]))
+        reduce_node.input_q.append(Input(2, 0, None))
+        locality = InputLocality(pnodes)
+        locality.add(reduce_node)
+        self.assertEqual(locality.held_by(pnodes[0]), 5)
+        self.assertEqual(locality.ranked(reduce_node), [(5, 0)])
+
+        # only the new inputs are counted when the node is added again
+        reduce_node.input_q.append(Input(3, 0, pnodes[2]))
+        reduce_node.input_q.append(Input(4, 0, pnodes[2]))
+        locality.add(reduce_node)
+        locality.add(reduce_node)
+        self.assertEqual([locality.held_by(pnode) for pnode in pnodes], [5, 0, 7])
+        self.assertEqual(locality.ranked(reduce_node), [(7, 2), (5, 0)])
+
+        other_node = LogicalNode()
+        other_node.input_q.append(Input(1, 0, pnodes[0]))
+        locality.add(other_node)
+        self.assertEqual(locality.held_by(pnodes[0]), 6)
+        locality.discard(reduce_node)
+        self.assertEqual([locality.held_by(pnode) for pnode in pnodes], [1, 0, 0])
+        self.assertEqual(locality.ranked(reduce_node), [])
@@ -0,0 +1,103 @@
+import unittest
+import csv
+import os
+import tempfile
+from simulator.nodes import Config
+from simulator.simulator import simulate
+from simulator.sweep import grid, random_points, run_sweep
+from simulator.mrscheduler import MRScheduler
+from simulator.daskscheduler import DaskScheduler
+from tests.mrhelperfunctions import MRHelperFunctions
+
+def build_map_reduce_graph(num_physical_nodes=10):
+    num_map_nodes = 20
+    num_reduce_nodes = 4
+
+    map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(num_map_nodes, [2]*num_map_nodes, num_reduce_nodes)
+    physical_nodes = MRHelperFunctions.create_physical_nodes(
+        num_physical_nodes,
+        [1]*num_physical_nodes,
+        [1]*num_physical_nodes,
+        [1]*num_physical_nodes)
+
+    logical_nodes = []
+    logical_nodes.extend(map_nodes)
+    logical_nodes.append(shuffle_node)
+    logical_nodes.extend(reduce_nodes)
+    return logical_nodes, physical_nodes
+
+class TestSweep(unittest.TestCase):
+
+    def test_grid(self):
+        '''
+            Function to test that a grid has every combination of its axes
+        '''
+        points = grid(FAILURE_PROBABILITY=[0, 0.001], num_physical_nodes=[5, 10, 20])
+        self.assertEqual(len(points), 6)
+        self.assertIn({'FAILURE_PROBABILITY': 0.001, 'num_physical_nodes': 20}, points)
+
+    def test_random_points(self):
+        '''
+            Function to test that random points are reproducible and stay within their axes
+        '''
+        axes = {'BANDWIDTH_MULTIPLIER': [1, 2, 4], 'FAILURE_PROBABILITY': lambda rng: rng.uniform(0, 0.01)}
+        points = random_points(20, seed=3, **axes)
+        self.assertEqual(points, random_points(20, seed=3, **axes))
+        for point in points:
+            self.assertIn(point['BANDWIDTH_MULTIPLIER'], [1, 2, 4])
+            self.assertTrue(0 <= point['FAILURE_PROBABILITY'] <= 0.01)
+
+    def test_sweep(self):
+        '''
+            Function to test sweeping Config fields and graph parameters across schedulers
+        '''
+        points = grid(BANDWIDTH_MULTIPLIER=[1, 3], num_physical_nodes=[5, 10],
+                      FAILURE_PROBABILITY=[0], STRAGGLER_PROBABILITY=[0])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.csv')
+            rows = run_sweep(build_map_reduce_graph, points, [MRScheduler, DaskScheduler], workers=2, output=path)
+            with open(path) as f:
+                table = list(csv.DictReader(f))
+
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(len(table), 8)
+        self.assertEqual(float(table[0]['total_time']), rows[0]['total_time'])
+
+        # without randomness, each run matches a plain run with the same settings
+        serial = run_sweep(build_map_reduce_graph, points, [MRScheduler, DaskScheduler], workers=1)
+        self.assertEqual(rows, serial)
+        for row in rows[:2]:
+            Config.BANDWIDTH_MULTIPLIER = row['BANDWIDTH_MULTIPLIER']
+            Config.FAILURE_PROBABILITY = 0
+            Config.STRAGGLER_PROBABILITY = 0
+            logical_nodes, physical_nodes = build_map_reduce_graph(row['num_physical_nodes'])
+            scheduler_class = MRScheduler if row['scheduler'] == 'MRScheduler' else DaskScheduler
+            self.assertEqual(row['total_time'], simulate(logical_nodes, physical_nodes, scheduler_class, verbose=False))
+            Config.reset()
+        # slower links never make a run faster
+        by_point = {(r['scheduler'], r['num_physical_nodes'], r['BANDWIDTH_MULTIPLIER']): r['total_time'] for r in rows}
+        for (scheduler, num_physical_nodes, multiplier), total_time in by_point.items():
+            if multiplier == 3:
+                self.assertGreaterEqual(total_time, by_point[(scheduler, num_physical_nodes, 1)])
+        self.assertEqual(Config.BANDWIDTH_MULTIPLIER, 1)
+
+    def test_caller_config(self):
+        '''
+            Function to test that runs in this process leave its Config as it was
+        '''
+        Config.BANDWIDTH_MULTIPLIER = 5
+        Config.FAILURE_PROBABILITY = 0
+        try:
+            points = grid(BANDWIDTH_MULTIPLIER=[1], FAILURE_PROBABILITY=[0.002], num_physical_nodes=[5])
+            run_sweep(build_map_reduce_graph, points, [MRScheduler], workers=1)
+            self.assertEqual(Config.BANDWIDTH_MULTIPLIER, 5)
+            self.assertEqual(Config.FAILURE_PROBABILITY, 0)
+        finally:
+            Config.reset()
+
+    def test_unknown_graph_parameter(self):
+        '''
+            Function to test that keys that are neither Config fields nor graph parameters are rejected
+        '''
+        with self.assertRaises(TypeError):
+            run_sweep(build_map_reduce_graph, [{'FAILURE_PROB': 0}], [MRScheduler], workers=1)
@@ -0,0 +1,68 @@
+import unittest
+from simulator.timer import Timer
+
+class TestTimer(unittest.TestCase):
+
+    def test_single_step(self):
+        '''
+            Function to test that a single step always advances by one timestep
+        '''
+        timer = Timer()
+        self.assertEqual(timer.elapsed(), 0)
+        timer.step(True, 10)
+        self.assertEqual(timer.now(), 1)
+        self.assertEqual(timer.elapsed(), 1)
+        timer.step(False)
+        self.assertEqual(timer.now(), 2)
+        self.assertEqual(timer.elapsed(), 1)
+
+    def test_jump(self):
+        '''
+            Function to test jumping ahead to the next time anything can happen
+        '''
+        timer = Timer()
+        timer.step(False, 7)
+        self.assertEqual(timer.now(), 7)
+        self.assertEqual(timer.elapsed(), 7)
+        self.assertTrue(timer.passed(7))
+        self.assertEqual(timer.elapsed_since(3), 4)
+
+        # never jump backwards or stand still
+        timer.step(False, 5)
+        self.assertEqual(timer.now(), 8)
+        self.assertEqual(timer.elapsed(), 1)
+
+    def test_first_passed(self):
+        '''
+            Function to test finding the first timestep at which a time has passed
+        '''
+        timer = Timer()
+        timer.step(False, 4)
+        self.assertEqual(timer.first_passed(4), 4)
+        self.assertEqual(timer.first_passed(4.064), 5)
+        self.assertEqual(timer.first_passed(64 * 1/1000), 4)
+        self.assertEqual(timer.first_passed(9.5), 10)
+        self.assertFalse(timer.passed(4.064))
+
+    def test_continuous(self):
+        '''
+            Function to test that continuous time lands exactly on the next event
+        '''
+        timer = Timer(continuous=True)
+        timer.step(False, 0.25)
+        self.assertEqual(timer.now(), 0.25)
+        self.assertEqual(timer.first_passed(4.064), 4.064)
+        self.assertEqual(timer.first_passed(0.1), 0.25)
+        self.assertEqual(timer.next(), 0.25)
+
+        # a single step stays put so the scheduler can react at the same instant
+        timer.step(True, 3)
+        self.assertEqual(timer.now(), 0.25)
+        self.assertEqual(timer.elapsed(), 0)
+        timer.step(False, 4.064)
+        self.assertEqual(timer.now(), 4.064)
+        self.assertAlmostEqual(timer.elapsed(), 3.814)
+
+        # with nothing to jump to, fall back to a whole timestep
+        timer.step(False)
+        self.assertAlmostEqual(timer.now(), 5.064)
@@ -0,0 +1,82 @@
+import unittest
+import io
+import os
+import random
+import tempfile
+from contextlib import redirect_stdout
+from simulator.nodes import Config
+from simulator.simulator import simulate
+from simulator.mrscheduler import MRScheduler
+from simulator.tracing import Trace, ListWriter, JSONLWriter, BinaryWriter, EventType, Event, read_trace
+from tests.mrhelperfunctions import MRHelperFunctions
+
+def build_map_reduce_graph(num_map_nodes, num_reduce_nodes, num_physical_nodes):
+    map_nodes, shuffle_node, reduce_nodes = MRHelperFunctions.create_map_reduce_graph(num_map_nodes, [2]*num_map_nodes, num_reduce_nodes)
+    physical_nodes = MRHelperFunctions.create_physical_nodes(
+        num_physical_nodes,
+        [1]*num_physical_nodes,
+        [1]*num_physical_nodes,
+        [1]*num_physical_nodes)
+    return map_nodes + [shuffle_node] + reduce_nodes, physical_nodes
+
+class TestTracing(unittest.TestCase):
+
+    def setUp(self):
+        Config.FAILURE_PROBABILITY = 0
+        Config.STRAGGLER_PROBABILITY = 0
+
+    def tearDown(self):
+        Config.reset()
+
+    def test_trace_events(self):
+        '''
+            Function to test that every logical node is assigned, computes and finishes once
+        '''
+        logical_nodes, physical_nodes = build_map_reduce_graph(4, 2, 2)
+        writer = ListWriter()
+        total_time = simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, trace=Trace(writer, buffer_size=8))
+
+        events = writer.events
+        self.assertEqual(events[0], Event(EventType.TIME, 0, None, None))
+        self.assertEqual(events[-1], Event(EventType.DONE, total_time, None, None))
+        for event_type in [EventType.ASSIGNED, EventType.COMPUTING, EventType.FINISHED]:
+            self.assertEqual(sorted(e.lnode for e in events if e.type is event_type), sorted(l.id for l in logical_nodes))
+        for lnode in logical_nodes:
+            finished = [e for e in events if e.type is EventType.FINISHED and e.lnode == lnode.id][0]
+            self.assertEqual(finished.time, lnode.comp_end_time)
+            self.assertEqual(finished.pnode, lnode.pnode.id)
+        self.assertEqual([e.time for e in events], sorted(e.time for e in events))
+
+    def test_trace_files(self):
+        '''
+            Function to test that JSON lines and binary traces read back the events written to them
+        '''
+        Config.FAILURE_PROBABILITY = 0.005
+        random.seed(2)
+        logical_nodes, physical_nodes = build_map_reduce_graph(20, 4, 8)
+        with tempfile.TemporaryDirectory() as directory:
+            jsonl = os.path.join(directory, 'trace.jsonl')
+            binary = os.path.join(directory, 'trace.bin')
+            writer = ListWriter()
+            with Trace(writer, JSONLWriter(jsonl), BinaryWriter(binary), buffer_size=16) as trace:
+                simulate(logical_nodes, physical_nodes, MRScheduler, verbose=False, trace=trace)
+
+            self.assertIn(EventType.FAILED, [e.type for e in writer.events])
+            self.assertEqual(list(read_trace(jsonl)), writer.events)
+            self.assertEqual(list(read_trace(binary)), writer.events)
+            self.assertLess(os.path.getsize(binary), os.path.getsize(jsonl))
+
+    def test_verbose(self):
+        '''
+            Function to test that verbose output is printed as before
+        '''
+        logical_nodes, physical_nodes = build_map_reduce_graph(1, 1, 1)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            total_time = simulate(logical_nodes, physical_nodes, MRScheduler)
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[:4], ['Current time: 0', 'Assigned {} to {}; now waiting'.format(logical_nodes[0].id, physical_nodes[0].id),
+                                     'Current time: 2', '{} now computing'.format(logical_nodes[0].id)])
+        self.assertEqual(lines[-1], 'total fails: 0')
+        self.assertEqual(total_time, 10)